@@ -0,0 +1,111 @@
+"""
+Benchmarks for pytest-ethereum. They are not part of the test suite, run them with
+``pytest benchmarks``, and use ``--bench-json`` / ``--bench-compare`` to store and
+compare results between runs.
+"""
+import datetime
+import json
+from pathlib import Path
+import platform
+import statistics
+import time
+
+import pytest
+
+BENCHMARKS_DIR = Path(__file__).parent
+
+_results = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--bench-rounds",
+        type=int,
+        default=10,
+        help="Number of timed rounds of every benchmark.",
+    )
+    group.addoption(
+        "--bench-json",
+        metavar="PATH",
+        default=None,
+        help="Write the benchmark results as json to PATH.",
+    )
+    group.addoption(
+        "--bench-compare",
+        metavar="PATH",
+        default=None,
+        help="Compare the benchmark results against the json results found at PATH.",
+    )
+
+
+class Bench:
+    def __init__(self, name, rounds):
+        self.name = name
+        self.rounds = rounds
+
+    def __call__(self, fn, setup=None):
+        """
+        Time ``rounds`` calls of fn, after calling setup (which is not timed) before
+        every round. Returns the result of the last call.
+        """
+        timings = []
+        for _ in range(self.rounds):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+        _results[self.name] = {
+            "rounds": len(timings),
+            "min": min(timings),
+            "max": max(timings),
+            "mean": statistics.mean(timings),
+            "median": statistics.median(timings),
+        }
+        return result
+
+
+@pytest.fixture
+def manifest_dir():
+    return BENCHMARKS_DIR.parent / "tests" / "manifests"
+
+
+@pytest.fixture
+def bench(request):
+    return Bench(request.node.name, request.config.getoption("bench_rounds"))
+
+
+def pytest_sessionfinish(session):
+    json_path = session.config.getoption("bench_json")
+    if json_path and _results:
+        results = {
+            "datetime": datetime.datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "benchmarks": _results,
+        }
+        Path(json_path).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _results:
+        return
+    compare_path = config.getoption("bench_compare")
+    previous = {}
+    if compare_path:
+        previous = json.loads(Path(compare_path).read_text())["benchmarks"]
+    terminalreporter.write_sep("=", "benchmarks")
+    header = f"{'name':<52} {'median (ms)':>12} {'min (ms)':>10} {'max (ms)':>10}"
+    if previous:
+        header += f" {'vs previous':>12}"
+    terminalreporter.write_line(header)
+    for name, result in _results.items():
+        line = (
+            f"{name:<52} {result['median'] * 1000:>12.3f} "
+            f"{result['min'] * 1000:>10.3f} {result['max'] * 1000:>10.3f}"
+        )
+        if name in previous:
+            ratio = result["median"] / previous[name]["median"]
+            line += f" {ratio:>11.2f}x"
+        terminalreporter.write_line(line)
@@ -0,0 +1,62 @@
+import logging
+
+from ethpm import ASSETS_DIR
+import pytest
+
+from pytest_ethereum import deployer as deployer_module
+from pytest_ethereum.linker import deploy, link, linker
+
+logging.getLogger("evm").setLevel(logging.INFO)
+
+ASSETS = {
+    "Owned": (ASSETS_DIR / "owned" / "1.0.1.json", ()),
+    "StandardToken": (ASSETS_DIR / "standard-token" / "1.0.1.json", (100,)),
+    "SafeMathLib": (ASSETS_DIR / "safe-math-lib" / "1.0.1.json", ()),
+    "Escrow": (ASSETS_DIR / "escrow" / "1.0.3.json", None),
+}
+
+
+@pytest.fixture(params=tuple(ASSETS))
+def asset_deployer(request, deployer, w3):
+    # Deployments cached by a previous benchmark were made on a different timeline
+    # of the chain, so they would not be restored correctly
+    deployer_module._deployment_cache.pop(w3.provider, None)
+    contract_type = request.param
+    path, args = ASSETS[contract_type]
+    asset_deployer = deployer(path)
+    asset_deployer.cache_deployments = True
+    if args is None:
+        args = (w3.eth.accounts[1],)
+        asset_deployer.register_strategy(
+            "Escrow",
+            linker(
+                deploy("SafeSendLib"),
+                link("Escrow", "SafeSendLib"),
+                deploy("Escrow", *args),
+            ),
+        )
+    return asset_deployer, contract_type, args
+
+
+def test_cold_deploy(bench, asset_deployer, w3):
+    asset_deployer, contract_type, args = asset_deployer
+    snapshot_id = w3.testing.snapshot()
+
+    def setup():
+        w3.testing.revert(snapshot_id)
+        deployer_module._deployment_cache.pop(w3.provider, None)
+
+    package = bench(lambda: asset_deployer.deploy(contract_type, *args), setup)
+    assert package.deployments.get_instance(contract_type)
+
+
+def test_warm_deploy(bench, asset_deployer, w3):
+    asset_deployer, contract_type, args = asset_deployer
+    snapshot_id = w3.testing.snapshot()
+    asset_deployer.deploy(contract_type, *args)
+
+    package = bench(
+        lambda: asset_deployer.deploy(contract_type, *args),
+        lambda: w3.testing.revert(snapshot_id),
+    )
+    assert package.deployments.get_instance(contract_type)
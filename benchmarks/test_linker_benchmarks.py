@@ -0,0 +1,29 @@
+import logging
+
+from ethpm import ASSETS_DIR
+import pytest
+
+from pytest_ethereum.linker import deploy, link, linker
+
+logging.getLogger("evm").setLevel(logging.INFO)
+
+
+@pytest.mark.parametrize("depth", (3, 10, 30))
+def test_linker_pipeline(bench, deployer, w3, depth):
+    escrow_deployer = deployer(ASSETS_DIR / "escrow" / "1.0.3.json")
+    # Every additional operation deploys another Escrow, for a different recipient
+    strategy = linker(
+        deploy("SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+        *(
+            deploy("Escrow", w3.eth.accounts[index % len(w3.eth.accounts)])
+            for index in range(depth - 2)
+        ),
+    )
+    snapshot_id = w3.testing.snapshot()
+
+    package = bench(
+        lambda: strategy(escrow_deployer.package),
+        lambda: w3.testing.revert(snapshot_id),
+    )
+    assert package.deployments.get_instance("Escrow")
@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+from web3.datastructures import AttributeDict
+
+from pytest_ethereum import testing
+from pytest_ethereum.testing import Log
+
+logging.getLogger("evm").setLevel(logging.INFO)
+
+
+@pytest.fixture
+def ping(deployer, manifest_dir):
+    ping_package = deployer(manifest_dir / "ping" / "1.0.0.json").deploy("ping")
+    return ping_package.deployments.get_instance("ping")
+
+
+def create_receipt(ping, w3, num_logs):
+    """
+    Return a single receipt containing num_logs logs, cycling through the logs of a
+    few ping transactions.
+    """
+    receipts = [
+        w3.eth.waitForTransactionReceipt(
+            ping.functions.ping(str(index).encode(), b"2").transact()
+        )
+        for index in range(10)
+    ]
+    return AttributeDict(
+        dict(
+            receipts[0],
+            transactionHash=num_logs.to_bytes(32, "big"),
+            logs=[
+                AttributeDict(
+                    dict(receipts[log_index % 10]["logs"][0], logIndex=log_index)
+                )
+                for log_index in range(num_logs)
+            ],
+        )
+    )
+
+
+@pytest.mark.parametrize("num_logs", (10, 100, 1000))
+def test_log_matching_cold(bench, ping, w3, num_logs):
+    receipt = create_receipt(ping, w3, num_logs)
+    log = Log(ping.events.Ping, b"1".ljust(32, b"\00"))
+
+    count = bench(lambda: log.count(receipt), testing._decoded_receipts.clear)
+    assert count == num_logs // 10
+
+
+@pytest.mark.parametrize("num_logs", (10, 100, 1000))
+def test_log_matching_warm(bench, ping, w3, num_logs):
+    receipt = create_receipt(ping, w3, num_logs)
+    log = Log(ping.events.Ping, b"1".ljust(32, b"\00"))
+    log.count(receipt)
+
+    count = bench(lambda: log.count(receipt))
+    assert count == num_logs // 10
@@ -0,0 +1,31 @@
+import pytest
+
+NUM_TRANSFERS = 20
+
+
+def send_transfers(w3):
+    sender, *recipients = w3.eth.accounts
+    return [
+        w3.eth.sendTransaction(
+            {"from": sender, "to": recipients[index % len(recipients)], "value": 1}
+        )
+        for index in range(NUM_TRANSFERS)
+    ]
+
+
+@pytest.mark.parametrize("batched", (False, True))
+def test_transfers(bench, block_batch, w3, batched):
+    snapshot_id = w3.testing.snapshot()
+
+    def transfer():
+        if not batched:
+            return [
+                w3.eth.waitForTransactionReceipt(tx_hash)
+                for tx_hash in send_transfers(w3)
+            ]
+        with block_batch() as batch:
+            send_transfers(w3)
+        return batch.receipts
+
+    receipts = bench(transfer, lambda: w3.testing.revert(snapshot_id))
+    assert len(receipts) == NUM_TRANSFERS
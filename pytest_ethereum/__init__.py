@@ -1 +1,11 @@
-from .testing import tx_fail  # noqa: F401
+from typing import Any
+
+
+def tx_fail(*args: Any, **kwargs: Any) -> Any:
+    """
+    Returns ``pytest.raises(TransactionFailed, ...)``. Imports ``testing`` lazily, so
+    that importing pytest_ethereum (i.e. loading the plugin) doesn't import web3.
+    """
+    from pytest_ethereum.testing import tx_fail
+
+    return tx_fail(*args, **kwargs)
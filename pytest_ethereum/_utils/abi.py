@@ -1,5 +1,183 @@
 import itertools
-from typing import Any, Dict, Tuple
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple  # noqa: F401
+
+from eth_abi import decode_abi, decode_single
+from eth_utils import (
+    event_abi_to_log_topic,
+    function_abi_to_4byte_selector,
+    hexstr_if_str,
+    keccak,
+    to_bytes,
+)
+from web3._utils.abi import map_abi_data, normalize_event_input_types
+from web3._utils.events import get_event_abi_types_for_decoding
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.datastructures import AttributeDict
+
+INDEXES_BY_ID_SIZE = 4096
+
+
+class EventIndex:
+    """
+    Precomputed introspection data (i.e. argument positions, topic & decoder types)
+    for an event ABI, so that it is only computed once per event.
+    """
+
+    def __init__(self, event_abi: Dict[str, Any]) -> None:
+        self.abi = event_abi
+        # Unlike the topic, which is shared by events with the same signature (even if
+        # they index different arguments), identifies how the event is decoded
+        self.abi_hash = get_abi_hash(event_abi)
+        self.name = event_abi.get("name")
+        self.arg_names = tuple(arg_abi["name"] for arg_abi in event_abi["inputs"])
+        self.arg_positions = {
+            name: position for position, name in enumerate(self.arg_names)
+        }
+        if event_abi.get("anonymous"):
+            self.topic = None  # type: Optional[bytes]
+        else:
+            self.topic = event_abi_to_log_topic(event_abi)
+
+        topic_inputs = [arg for arg in event_abi["inputs"] if arg.get("indexed")]
+        data_inputs = [arg for arg in event_abi["inputs"] if not arg.get("indexed")]
+        self.topic_names = tuple(arg["name"] for arg in topic_inputs)
+        self.topic_types = tuple(
+            get_event_abi_types_for_decoding(normalize_event_input_types(topic_inputs))
+        )
+        self.data_names = tuple(arg["name"] for arg in data_inputs)
+        self.data_types = tuple(
+            get_event_abi_types_for_decoding(normalize_event_input_types(data_inputs))
+        )
+
+    def decode(self, log_entry: Dict[str, Any]) -> Optional[AttributeDict]:
+        """
+        Return the decoded log entry, in the same format as web3's ``get_event_data``,
+        or None if the log entry was not emitted by this event.
+        """
+        topics = log_entry["topics"]
+        if self.topic is None:
+            log_topics = topics
+        elif not topics or topics[0] != self.topic:
+            return None
+        else:
+            log_topics = topics[1:]
+        if len(log_topics) != len(self.topic_types):
+            return None
+
+        log_data = hexstr_if_str(to_bytes, log_entry["data"])
+        decoded_data = map_abi_data(
+            BASE_RETURN_NORMALIZERS,
+            self.data_types,
+            decode_abi(self.data_types, log_data),
+        )
+        decoded_topics = map_abi_data(
+            BASE_RETURN_NORMALIZERS,
+            self.topic_types,
+            [
+                decode_single(topic_type, topic)
+                for topic_type, topic in zip(self.topic_types, log_topics)
+            ],
+        )
+        event_args = dict(
+            itertools.chain(
+                zip(self.topic_names, decoded_topics),
+                zip(self.data_names, decoded_data),
+            )
+        )
+        return AttributeDict.recursive(
+            {
+                "args": event_args,
+                "event": self.name,
+                "logIndex": log_entry["logIndex"],
+                "transactionIndex": log_entry["transactionIndex"],
+                "transactionHash": log_entry["transactionHash"],
+                "address": log_entry["address"],
+                "blockHash": log_entry["blockHash"],
+                "blockNumber": log_entry["blockNumber"],
+            }
+        )
+
+
+class ABIIndex:
+    """
+    Precomputed introspection data for a contract ABI: its events by name & topic, and
+    its functions by name & selector.
+    """
+
+    def __init__(self, abi: Sequence[Dict[str, Any]]) -> None:
+        self.abi = abi
+        self.events = {}  # type: Dict[str, EventIndex]
+        self.events_by_topic = {}  # type: Dict[bytes, EventIndex]
+        self.functions = {}  # type: Dict[str, List[Dict[str, Any]]]
+        self.functions_by_selector = {}  # type: Dict[bytes, Dict[str, Any]]
+        self.function_arg_positions = {}  # type: Dict[bytes, Dict[str, int]]
+        for item_abi in abi:
+            if item_abi.get("type") == "event":
+                event_index = get_event_index(item_abi)
+                self.events[item_abi["name"]] = event_index
+                if event_index.topic is not None:
+                    self.events_by_topic[event_index.topic] = event_index
+            elif item_abi.get("type", "function") == "function":
+                selector = function_abi_to_4byte_selector(item_abi)
+                self.functions.setdefault(item_abi["name"], []).append(item_abi)
+                self.functions_by_selector[selector] = item_abi
+                self.function_arg_positions[selector] = {
+                    arg_abi["name"]: position
+                    for position, arg_abi in enumerate(item_abi.get("inputs", []))
+                }
+
+    def decode_log(self, log_entry: Dict[str, Any]) -> Optional[AttributeDict]:
+        """
+        Return the decoded log entry, or None if it was not emitted by any
+        (non-anonymous) event in the ABI.
+        """
+        topics = log_entry["topics"]
+        if not topics or topics[0] not in self.events_by_topic:
+            return None
+        return self.events_by_topic[topics[0]].decode(log_entry)
+
+
+_abi_indexes = {}  # type: Dict[bytes, ABIIndex]
+_event_indexes = {}  # type: Dict[bytes, EventIndex]
+# Indexes are also looked up by the id of the ABI objects they have been requested for
+# (i.e. the ABI of a contract factory), to skip hashing the same ABI object again. A
+# reference to each ABI object is kept, so that its id is never reused.
+_indexes_by_id = {}  # type: Dict[int, Tuple[Any, Any]]
+
+
+def get_abi_hash(abi: Any) -> bytes:
+    """
+    Return the keccak hash of the canonical json representation of an ABI.
+    """
+    return keccak(text=json.dumps(abi, sort_keys=True, separators=(",", ":")))
+
+
+def get_abi_index(abi: Sequence[Dict[str, Any]]) -> ABIIndex:
+    """
+    Return the ABIIndex of a contract ABI, which is only built once per ABI.
+    """
+    return _get_index(abi, _abi_indexes, ABIIndex)
+
+
+def get_event_index(event_abi: Dict[str, Any]) -> EventIndex:
+    """
+    Return the EventIndex of an event ABI, which is only built once per event ABI.
+    """
+    return _get_index(event_abi, _event_indexes, EventIndex)
+
+
+def _get_index(abi: Any, indexes: Dict[bytes, Any], index_class: Any) -> Any:
+    indexed_abi, index = _indexes_by_id.get(id(abi), (None, None))
+    if indexed_abi is abi and isinstance(index, index_class):
+        return index
+    abi_hash = get_abi_hash(abi)
+    if abi_hash not in indexes:
+        indexes[abi_hash] = index_class(abi)
+    if len(_indexes_by_id) >= INDEXES_BY_ID_SIZE:
+        _indexes_by_id.clear()
+    _indexes_by_id[id(abi)] = (abi, indexes[abi_hash])
+    return indexes[abi_hash]
 
 
 def merge_args_and_kwargs(
@@ -22,9 +200,8 @@ def merge_args_and_kwargs(
     if not kwargs:
         return args
 
-    args_as_kwargs = {
-        arg_abi["name"]: arg for arg_abi, arg in zip(event_abi["inputs"], args)
-    }
+    event_index = get_event_index(event_abi)
+    args_as_kwargs = dict(zip(event_index.arg_names, args))
     duplicate_keys = set(args_as_kwargs).intersection(kwargs.keys())
     if duplicate_keys:
         raise TypeError(
@@ -33,9 +210,9 @@ def merge_args_and_kwargs(
             )
         )
 
-    sorted_arg_names = [arg_abi["name"] for arg_abi in event_abi["inputs"]]
+    arg_positions = event_index.arg_positions
 
-    unknown_kwargs = {key for key in kwargs.keys() if key not in sorted_arg_names}
+    unknown_kwargs = {key for key in kwargs.keys() if key not in arg_positions}
     if unknown_kwargs:
         if event_abi.get("name"):
             raise TypeError(
@@ -50,15 +227,8 @@ def merge_args_and_kwargs(
             )
         )
 
-    sorted_args = list(
-        zip(
-            *sorted(
-                itertools.chain(kwargs.items(), args_as_kwargs.items()),
-                key=lambda kv: sorted_arg_names.index(kv[0]),
-            )
-        )
+    sorted_args = sorted(
+        itertools.chain(kwargs.items(), args_as_kwargs.items()),
+        key=lambda kv: arg_positions[kv[0]],
     )
-    if sorted_args:
-        return sorted_args[1]
-    else:
-        return tuple()
+    return tuple(arg for _, arg in sorted_args)
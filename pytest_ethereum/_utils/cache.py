@@ -0,0 +1,93 @@
+import json
+import types
+from typing import Any, Hashable
+
+from eth_typing import Manifest
+from eth_utils import keccak
+from eth_utils.toolz import curry
+
+
+def freeze(value: Any) -> Hashable:
+    """
+    Return a hashable representation of ``value``, suitable for use in a cache key.
+    Curried functions (i.e. linker operations & strategies) are frozen by their
+    underlying function and arguments, so that two equivalent strategies share a key.
+    Every value is tagged with its type, so that equal values of different types (e.g.
+    ``1`` and ``True``, or a list and a tuple) don't share a key. Raises a
+    ``TypeError`` if ``value`` contains an unhashable object.
+    """
+    if isinstance(value, curry):
+        return (curry, value.func, freeze(value.args), freeze(value.keywords))
+    if isinstance(value, dict):
+        return (
+            type(value),
+            tuple(sorted((freeze(key), freeze(val)) for key, val in value.items())),
+        )
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(freeze(item) for item in value))
+    hash(value)
+    return (type(value), value)
+
+
+def freeze_stable(value: Any) -> Hashable:
+    """
+    Like ``freeze``, but functions are represented by their qualified name, code and
+    defaults, so that the result can be compared between processes (and changes once
+    a function is edited). Containers are tagged with their type name, while builtin
+    values are told apart by their repr (see ``get_deployment_cache_key``). Raises a
+    ``TypeError`` if value contains a function without a unique qualified name (e.g.
+    a lambda or a closure), or any object other than a builtin value.
+    """
+    if isinstance(value, curry):
+        return (
+            freeze_stable(value.func),
+            freeze_stable(value.args),
+            freeze_stable(value.keywords),
+        )
+    if isinstance(value, dict):
+        return (
+            type(value).__name__,
+            tuple(sorted((key, freeze_stable(val)) for key, val in value.items())),
+        )
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(freeze_stable(item) for item in value))
+    if isinstance(value, types.BuiltinFunctionType):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, types.FunctionType):
+        if "<" in value.__qualname__:
+            raise TypeError(f"{value.__qualname__} has no unique qualified name.")
+        return (
+            f"{value.__module__}.{value.__qualname__}",
+            _freeze_code(value.__code__),
+            freeze_stable(value.__defaults__),
+            freeze_stable(value.__kwdefaults__),
+        )
+    if isinstance(value, frozenset):
+        return tuple(sorted((freeze_stable(item) for item in value), key=repr))
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    raise TypeError(f"{value!r} has no stable representation.")
+
+
+def _freeze_code(code: types.CodeType) -> Hashable:
+    """
+    Return the bytecode of code, with the names and constants it refers to (including
+    the code of nested functions).
+    """
+    return (
+        code.co_code,
+        code.co_names,
+        tuple(
+            _freeze_code(const)
+            if isinstance(const, types.CodeType)
+            else freeze_stable(const)
+            for const in code.co_consts
+        ),
+    )
+
+
+def get_manifest_hash(manifest: Manifest) -> bytes:
+    """
+    Return the keccak hash of the canonical json representation of a manifest.
+    """
+    return keccak(text=json.dumps(manifest, sort_keys=True, separators=(",", ":")))
@@ -0,0 +1,107 @@
+from pathlib import Path
+from typing import Dict, Set  # noqa: F401
+
+from eth.db.schema import SchemaV1
+from eth_tester import PyEVMBackend
+from eth_typing import Hash32
+import rlp
+from web3 import Web3
+from web3.providers.eth_tester import EthereumTesterProvider
+
+from pytest_ethereum.exceptions import PytestEthereumError
+
+
+def get_pyevm_backend(w3: Web3) -> PyEVMBackend:
+    if not isinstance(w3.provider, EthereumTesterProvider) or not isinstance(
+        w3.provider.ethereum_tester.backend, PyEVMBackend
+    ):
+        raise PytestEthereumError(
+            "Accessing chain state directly is only supported by an EthereumTesterProvider "
+            f"with a PyEVMBackend, not {w3.provider.__repr__()}."
+        )
+    return w3.provider.ethereum_tester.backend
+
+
+def dump_chain_state(w3: Web3, path: Path) -> None:
+    """
+    Write the entire database of the eth-tester chain that w3 is connected to (i.e.
+    every block, including those of reverted branches, and every state) to path.
+    """
+    kv_store = get_pyevm_backend(w3).chain.chaindb.db.wrapped_db.kv_store
+    path.write_bytes(rlp.encode([[key, value] for key, value in kv_store.items()]))
+
+
+def load_chain_state(w3: Web3, path: Path) -> None:
+    """
+    Replace the database of the eth-tester chain that w3 is connected to with the
+    database written to path by ``dump_chain_state``. The chain head is restored
+    as well, but any snapshots taken on w3 are no longer valid.
+    """
+    backend = get_pyevm_backend(w3)
+    base_db = backend.chain.chaindb.db
+    base_db.wrapped_db.kv_store = {
+        key: value for key, value in rlp.decode(path.read_bytes())
+    }
+    backend.chain = type(backend.chain)(base_db)
+
+
+def take_snapshot_at(w3: Web3, block_hash: Hash32) -> int:
+    """
+    Return the id of a snapshot of the (possibly non-canonical) block with
+    block_hash, without changing the chain head.
+    """
+    head_snapshot_id = w3.testing.snapshot()
+    get_pyevm_backend(w3).revert_to_snapshot(block_hash)
+    snapshot_id = w3.testing.snapshot()
+    w3.testing.revert(head_snapshot_id)
+    return snapshot_id
+
+
+def _get_kv_store(w3: Web3) -> Dict[bytes, bytes]:
+    return get_pyevm_backend(w3).chain.chaindb.db.wrapped_db.kv_store
+
+
+def get_chain_db_keys(w3: Web3) -> Set[bytes]:
+    return set(_get_kv_store(w3))
+
+
+def get_new_chain_entries(
+    w3: Web3, old_keys: Set[bytes], from_block_number: int
+) -> Dict[bytes, bytes]:
+    """
+    Return the database entries written since old_keys were read, along with the
+    transaction lookups of every block mined since from_block_number (which may have
+    been overwritten, rather than written). The canonical chain index is excluded,
+    since it depends on every other block in the database.
+    """
+    kv_store = _get_kv_store(w3)
+    entries = {
+        key: value
+        for key, value in kv_store.items()
+        if key not in old_keys and not _is_canonical_index_key(key)
+    }
+    for block_number in range(from_block_number + 1, w3.eth.blockNumber + 1):
+        for transaction_hash in w3.eth.getBlock(block_number)["transactions"]:
+            key = SchemaV1.make_transaction_hash_to_block_lookup_key(
+                bytes(transaction_hash)
+            )
+            entries[key] = kv_store[key]
+    return entries
+
+
+def _is_canonical_index_key(key: bytes) -> bool:
+    return key == SchemaV1.make_canonical_head_hash_lookup_key() or key.startswith(
+        b"block-number-to-hash:"
+    )
+
+
+def restore_chain_entries(
+    w3: Web3, entries: Dict[bytes, bytes], block_hash: Hash32
+) -> None:
+    """
+    Add the entries returned by ``get_new_chain_entries`` to the database, and make
+    the block with block_hash the chain head. The entries must have been read from
+    a chain with the same head as the current chain.
+    """
+    _get_kv_store(w3).update(entries)
+    get_pyevm_backend(w3).revert_to_snapshot(block_hash)
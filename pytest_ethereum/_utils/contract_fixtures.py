@@ -0,0 +1,118 @@
+from importlib import import_module
+import json
+from pathlib import Path
+import re
+from typing import Any, Callable, Iterable, List, Optional, Tuple  # noqa: F401
+
+from pytest_ethereum.exceptions import PytestEthereumError
+
+CONTRACT_FIXTURE_OPTIONS = ("name", "scope", "strategy")
+
+
+class ContractFixture:
+    """
+    A fixture, declared in the ``ethereum_contract_fixtures`` ini option, which
+    deploys contract_type from the manifest at manifest_path.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        manifest_path: Path,
+        contract_type: str,
+        args: Tuple[Any, ...],
+        scope: str,
+        strategy: Optional[str],
+    ) -> None:
+        self.name = name
+        self.manifest_path = manifest_path
+        self.contract_type = contract_type
+        self.args = args
+        self.scope = scope
+        self.strategy = strategy
+
+    def load_strategy(self) -> Callable[..., Any]:
+        """
+        Import the strategy, which is declared as "<module>:<name>".
+        """
+        module_name, _, strategy_name = self.strategy.partition(":")
+        try:
+            return getattr(import_module(module_name), strategy_name)
+        except (ImportError, AttributeError) as exc:
+            raise PytestEthereumError(
+                f"Unable to import strategy: {self.strategy} of the {self.name} "
+                f"fixture: {exc}"
+            )
+
+
+def parse_contract_fixtures(
+    lines: Iterable[str], rootdir: Path
+) -> List[ContractFixture]:
+    """
+    Parse lines of "<manifest path> <contract type> [<option>=<value> ...]
+    [<constructor arg> ...]", where manifest paths are relative to rootdir, options
+    are any of name, scope & strategy, and every arg is parsed as json if possible
+    (e.g. an int), or else used as a string (e.g. an address).
+    """
+    contract_fixtures = []  # type: List[ContractFixture]
+    for line in lines:
+        try:
+            manifest_path, contract_type, *tokens = line.split()
+        except ValueError:
+            raise PytestEthereumError(
+                f"Invalid contract fixture: {line}. Must provide a manifest path and "
+                "a contract type."
+            )
+        options = {}
+        args = []
+        for token in tokens:
+            option, separator, value = token.partition("=")
+            if separator and option in CONTRACT_FIXTURE_OPTIONS:
+                options[option] = value
+            else:
+                args.append(parse_arg(token))
+        contract_fixture = ContractFixture(
+            options.get("name", _to_fixture_name(contract_type)),
+            rootdir / manifest_path,
+            contract_type,
+            tuple(args),
+            options.get("scope", "function"),
+            options.get("strategy"),
+        )
+        _validate_contract_fixture(contract_fixture, contract_fixtures)
+        contract_fixtures.append(contract_fixture)
+    return contract_fixtures
+
+
+def parse_arg(arg: str) -> Any:
+    """
+    Parse arg as json if possible (e.g. an int), or else return it as a string.
+    """
+    try:
+        return json.loads(arg)
+    except ValueError:
+        return arg
+
+
+def _to_fixture_name(contract_type: str) -> str:
+    """
+    Return the snake case name of contract_type (i.e. "safe_send_lib").
+    """
+    return re.sub(
+        r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "_", contract_type
+    ).lower()
+
+
+def _validate_contract_fixture(
+    contract_fixture: ContractFixture, contract_fixtures: Iterable[ContractFixture]
+) -> None:
+    if contract_fixture.strategy is not None and ":" not in contract_fixture.strategy:
+        raise PytestEthereumError(
+            f"Invalid strategy: {contract_fixture.strategy} of the "
+            f"{contract_fixture.name} fixture. Must be <module>:<name>."
+        )
+    if any(other.name == contract_fixture.name for other in contract_fixtures):
+        raise PytestEthereumError(
+            f"Duplicate contract fixture: {contract_fixture.name}. Use the name "
+            "option to declare another fixture of the same contract type."
+        )
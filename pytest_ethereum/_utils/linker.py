@@ -1,54 +1,244 @@
-from typing import Any, Dict, Iterable, List, Tuple
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from functools import partial
+import threading
+from typing import (  # noqa: F401
+    Any,
+    ContextManager,
+    DefaultDict,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+from weakref import WeakKeyDictionary
 
-from eth_typing import URI, Address, Manifest
-from eth_utils import to_canonical_address, to_dict, to_hex, to_list
-from eth_utils.toolz import assoc, assoc_in, dissoc
+from eth_tester import PyEVMBackend
+from eth_typing import URI, Address, Hash32, HexStr, Manifest
+from eth_utils import (
+    is_checksum_address,
+    keccak,
+    to_bytes,
+    to_canonical_address,
+    to_dict,
+    to_hex,
+    to_list,
+)
 from ethpm import Package
+from ethpm.contract import LinkableContract, apply_all_link_refs
+from ethpm.deployments import Deployments
 from ethpm.utils.chains import (
     check_if_chain_matches_chain_uri,
     create_block_uri,
     get_genesis_block_hash,
+    is_BIP122_block_uri,
+    parse_BIP122_uri,
 )
+from ethpm.utils.contract import validate_w3_instance
+import rlp
 from web3 import Web3
+from web3.providers.base import BaseProvider  # noqa: F401
+from web3.providers.eth_tester import EthereumTesterProvider
 
+from pytest_ethereum._utils.cache import freeze
+from pytest_ethereum._utils.package import create_linked_package
 from pytest_ethereum.exceptions import LinkerError
+from pytest_ethereum.providers import prefetch
 from pytest_ethereum.typing import TxReceipt
 
 
+class ChainCache:
+    """
+    Chain identity data (i.e. genesis hash and which blockchain uris match the chain)
+    for a w3 instance, which can only change if the chain is reset.
+    """
+
+    def __init__(self) -> None:
+        self.genesis_hash = None  # type: Optional[HexStr]
+        self.matching_uris = {}  # type: Dict[URI, bool]
+
+
+# Keyed by provider, which is shared by every w3 instance connected to the same chain
+_chain_caches = WeakKeyDictionary()  # type: WeakKeyDictionary[BaseProvider, ChainCache]
+
+
+def get_chain_cache(w3: Web3) -> ChainCache:
+    if w3.provider not in _chain_caches:
+        _chain_caches[w3.provider] = ChainCache()
+    return _chain_caches[w3.provider]
+
+
+def clear_chain_cache(w3: Web3) -> None:
+    """
+    Must be called after resetting (or reverting) the chain that w3 is connected to.
+    """
+    _chain_caches.pop(w3.provider, None)
+
+
+def get_genesis_hash(w3: Web3) -> HexStr:
+    chain_cache = get_chain_cache(w3)
+    if chain_cache.genesis_hash is None:
+        chain_cache.genesis_hash = to_hex(get_genesis_block_hash(w3))
+    return chain_cache.genesis_hash
+
+
+def check_if_chain_matches_uri(w3: Web3, uri: URI) -> bool:
+    matching_uris = get_chain_cache(w3).matching_uris
+    if uri not in matching_uris:
+        matching_uris[uri] = check_if_chain_matches_chain_uri(w3, uri)
+    return matching_uris[uri]
+
+
+def prefetch_chain_uris(w3: Web3, uris: Iterable[URI]) -> ContextManager[None]:
+    """
+    Prefetch the blocks looked up to check whether any of uris (which isn't cached)
+    matches the w3-connected chain, in a single batch request on a node backend.
+    """
+    matching_uris = get_chain_cache(w3).matching_uris
+    block_hashes = [
+        parse_BIP122_uri(uri)[2]
+        for uri in uris
+        if uri not in matching_uris and is_BIP122_block_uri(uri)
+    ]
+    if not block_hashes:
+        return prefetch(w3)
+    block_lookups = [
+        partial(w3.eth.getBlock, block_hash) for block_hash in block_hashes
+    ]
+    return prefetch(w3, partial(w3.eth.getBlock, "earliest"), *block_lookups)
+
+
 def pluck_matching_uri(deployment_data: Dict[URI, Dict[str, str]], w3: Web3) -> URI:
     """
     Return any blockchain uri that matches w3-connected chain, if one
     is present in the deployment data keys.
     """
-    for uri in deployment_data.keys():
-        if check_if_chain_matches_chain_uri(w3, uri):
-            return uri
+    with prefetch_chain_uris(w3, deployment_data.keys()):
+        for uri in deployment_data.keys():
+            if check_if_chain_matches_uri(w3, uri):
+                return uri
     raise LinkerError(
         f"No matching blockchain URI found in deployment_data: {list(deployment_data.keys())}, "
         "for w3 instance: {w3.__repr__()}."
     )
 
 
-def contains_matching_uri(deployment_data: Dict[str, Dict[str, str]], w3: Web3) -> bool:
+def contains_matching_uri(deployment_data: Dict[URI, Dict[str, str]], w3: Web3) -> bool:
     """
     Returns true if any blockchain uri in deployment data matches
     w3-connected chain.
     """
-    for uri in deployment_data.keys():
-        if check_if_chain_matches_chain_uri(w3, uri):
-            return True
-    return False
+    with prefetch_chain_uris(w3, deployment_data.keys()):
+        return any(
+            check_if_chain_matches_uri(w3, uri) for uri in deployment_data.keys()
+        )
 
 
 def create_latest_block_uri(w3: Web3, tx_receipt: TxReceipt) -> URI:
     """
     Creates a new block uri from data in w3 and provided tx_receipt.
     """
-    chain_id = to_hex(get_genesis_block_hash(w3))
+    chain_id = get_genesis_hash(w3)
     block_hash = to_hex(tx_receipt.blockHash)
     return create_block_uri(chain_id, block_hash)
 
 
+class ManifestBuilder:
+    """
+    Copy-on-write manifest, shared by the operations of a linker pipeline. Only the
+    dicts along a modified path are copied (at most once per builder), every other
+    part of the manifest is shared with the original manifest.
+    """
+
+    def __init__(self, manifest: Manifest) -> None:
+        self.manifest = manifest
+        self._owned = {}  # type: Dict[int, Dict[str, Any]]
+
+    def assoc_in(self, keys: Sequence[str], value: Any) -> Manifest:
+        node = self._own_path(keys[:-1])
+        node[keys[-1]] = value
+        return self.manifest
+
+    def dissoc_in(self, keys: Sequence[str]) -> Any:
+        """
+        Remove and return the value found at keys.
+        """
+        node = self._own_path(keys[:-1])
+        return node.pop(keys[-1])
+
+    def build(self) -> Manifest:
+        """
+        Return the manifest, which will not be modified by any further
+        operations on this builder.
+        """
+        self._owned = {}
+        return self.manifest
+
+    def _own_path(self, keys: Sequence[str]) -> Dict[str, Any]:
+        self.manifest = Manifest(self._own(self.manifest))
+        node = self.manifest
+        for key in keys:
+            node[key] = self._own(node.get(key, {}))
+            node = node[key]
+        return node
+
+    def _own(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        if id(node) in self._owned:
+            return node
+        node_copy = dict(node)
+        self._owned[id(node_copy)] = node_copy
+        return node_copy
+
+
+class PipelinePackage(Package):
+    """
+    A Package whose manifest is updated in place by the operations of a linker
+    pipeline. Its manifest is not validated until the pipeline is complete.
+    """
+
+    def __init__(self, manifest: Manifest, w3: Web3) -> None:
+        validate_w3_instance(w3)
+        self.w3 = w3
+        self.w3.eth.defaultContractFactory = LinkableContract
+        self.manifest_builder = ManifestBuilder(manifest)
+        self._uri = None
+
+    @property  # type: ignore
+    def manifest(self) -> Manifest:
+        return self.manifest_builder.manifest
+
+    @property  # type: ignore
+    def deployments(self) -> Union[Deployments, Dict[None, None]]:
+        # Not cached, since the manifest deployments change during the pipeline
+        return Package.deployments.func(self)
+
+
+def get_manifest_builder(package: Package) -> ManifestBuilder:
+    """
+    Return the manifest builder of a pipeline package, or a new manifest builder for
+    any other package, so that the package's own manifest is never modified.
+    """
+    if isinstance(package, PipelinePackage):
+        return package.manifest_builder
+    return ManifestBuilder(package.manifest)
+
+
+def update_package(package: Package, manifest: Manifest) -> Package:
+    """
+    Return a new package with the updated manifest, unless package is a pipeline
+    package, in which case its manifest has already been updated in place.
+    """
+    if isinstance(package, PipelinePackage):
+        return package
+    return create_linked_package(manifest, package.w3)
+
+
 def insert_deployment(
     package: Package,
     deployment_name: str,
@@ -60,32 +250,20 @@ def insert_deployment(
     update the chain uri along with the new deployment data. If no match, it will simply add
     the new chain uri and deployment data.
     """
-    old_deployments_data = package.manifest.get("deployments")
+    manifest_builder = get_manifest_builder(package)
+    old_deployments_data = manifest_builder.manifest.get("deployments")
     if old_deployments_data and contains_matching_uri(old_deployments_data, package.w3):
         old_chain_uri = pluck_matching_uri(old_deployments_data, package.w3)
-        old_deployments_chain_data = old_deployments_data[old_chain_uri]
-        # Replace specific on-chain deployment (i.e. deployment_name)
-        new_deployments_chain_data_init = dissoc(
-            old_deployments_chain_data, deployment_name
-        )
-        new_deployments_chain_data = {
-            **new_deployments_chain_data_init,
-            **{deployment_name: deployment_data},
-        }
         # Replace all on-chain deployments
-        new_deployments_data_init = dissoc(
-            old_deployments_data, "deployments", old_chain_uri
+        deployments_chain_data = manifest_builder.dissoc_in(
+            ("deployments", old_chain_uri)
         )
-        new_deployments_data = {
-            **new_deployments_data_init,
-            **{latest_block_uri: new_deployments_chain_data},
-        }
-        return assoc(package.manifest, "deployments", new_deployments_data)
-
-    return assoc_in(
-        package.manifest,
-        ("deployments", latest_block_uri, deployment_name),
-        deployment_data,
+        manifest_builder.assoc_in(
+            ("deployments", latest_block_uri), deployments_chain_data
+        )
+    # Replace specific on-chain deployment (i.e. deployment_name)
+    return manifest_builder.assoc_in(
+        ("deployments", latest_block_uri, deployment_name), deployment_data
     )
 
 
@@ -98,7 +276,8 @@ def create_deployment_data(
 ) -> Iterable[Tuple[str, Any]]:
     yield "contract_type", contract_name
     yield "address", to_hex(new_address)
-    yield "transaction", to_hex(tx_receipt.transactionHash)
+    if tx_receipt.transactionHash:
+        yield "transaction", to_hex(tx_receipt.transactionHash)
     yield "block", to_hex(tx_receipt.blockHash)
     if link_refs:
         yield "runtime_bytecode", {"link_dependencies": create_link_dep(link_refs)}
@@ -114,6 +293,146 @@ def create_link_dep(link_refs: List[Dict[str, Any]]) -> Iterable[Dict[str, Any]]
         }
 
 
+def get_sender(w3: Web3, transaction: Optional[Dict[str, Any]]) -> Address:
+    """
+    Return the address that a transaction will be sent from, following the same
+    defaults as web3 (i.e. ``w3.eth.defaultAccount``, and then ``w3.eth.coinbase``).
+    """
+    if transaction and "from" in transaction:
+        return to_canonical_address(transaction["from"])
+    if is_checksum_address(w3.eth.defaultAccount):
+        return to_canonical_address(w3.eth.defaultAccount)
+    return to_canonical_address(w3.eth.coinbase)
+
+
+def get_create_address(sender: Address, nonce: int) -> Address:
+    """
+    Return the address of the contract created by a deployment transaction
+    from sender with the given nonce.
+    """
+    return Address(keccak(rlp.encode([sender, nonce]))[12:])
+
+
+class NonceManager:
+    """
+    Assigns the nonces of transactions that are sent concurrently (i.e. from several
+    threads), so that transactions from the same sender never share a nonce. A nonce
+    is reserved from when it is assigned until its transaction has been sent, after
+    which the pending transaction count of the chain accounts for it. So transactions
+    sent without the nonce manager (and chain reverts) are always taken into account.
+    """
+
+    def __init__(self, w3: Web3) -> None:
+        self.w3 = w3
+        self._lock = threading.Lock()
+        self._reserved = defaultdict(set)  # type: DefaultDict[Address, Set[int]]
+
+    @contextmanager
+    def reserve(self, sender: Address) -> Iterator[int]:
+        """
+        Reserve the next nonce of sender, until the transaction sent with it (within
+        this context) has been sent.
+        """
+        with self._lock:
+            reserved = self._reserved[sender]
+            pending_nonce = self.w3.eth.getTransactionCount(sender, "pending")
+            nonce = max(
+                [pending_nonce, *(reserved_nonce + 1 for reserved_nonce in reserved)]
+            )
+            reserved.add(nonce)
+        try:
+            yield nonce
+        finally:
+            with self._lock:
+                reserved.discard(nonce)
+
+
+_nonce_managers = WeakKeyDictionary()  # type: WeakKeyDictionary[Web3, NonceManager]
+
+
+def get_nonce_manager(w3: Web3) -> NonceManager:
+    if w3 not in _nonce_managers:
+        _nonce_managers[w3] = NonceManager(w3)
+    return _nonce_managers[w3]
+
+
+def inject_code(
+    w3: Web3, sender: Address, code: bytes, storage: Dict[int, int] = None
+) -> Tuple[Address, Hash32]:
+    """
+    Write code (and storage) directly into the state of an eth-tester chain, at the
+    address that a deployment from sender would create. Returns the address, and the
+    hash of the block that the code was written in. Another (empty) block is mined on
+    top, since eth-tester reverts to a snapshot by re-importing its block, which would
+    not reproduce the written state.
+    """
+    if not isinstance(w3.provider, EthereumTesterProvider) or not isinstance(
+        w3.provider.ethereum_tester.backend, PyEVMBackend
+    ):
+        raise LinkerError(
+            "Injecting contract code is only supported by an EthereumTesterProvider "
+            f"with a PyEVMBackend, not {w3.provider.__repr__()}."
+        )
+    ethereum_tester = w3.provider.ethereum_tester
+    chain = ethereum_tester.backend.chain
+    account_db = chain.get_vm().state.account_db
+    address = get_create_address(sender, account_db.get_nonce(sender))
+    account_db.increment_nonce(sender)
+    account_db.set_code(address, code)
+    for slot, value in (storage or {}).items():
+        account_db.set_storage(address, slot, value)
+    account_db.persist()
+    chain.header = chain.header.copy(state_root=account_db.state_root)
+    block_hash, _ = ethereum_tester.mine_blocks(2)
+    return address, to_bytes(hexstr=block_hash)
+
+
+BLOCK_GAS_LIMIT = "block_gas_limit"
+LEARNED_GAS = "learned_gas"
+LEARNED_GAS_HEADROOM = 1.5
+
+GasPolicy = Optional[Union[int, str]]
+
+_learned_deployment_gas = {}  # type: Dict[Hashable, int]
+
+
+def get_deployment_gas(
+    w3: Web3, bytecode: bytes, args: Any, gas_policy: GasPolicy
+) -> Optional[int]:
+    """
+    Return the gas to provide a deployment, according to gas_policy. Returns None if
+    the gas should be estimated instead.
+    """
+    if gas_policy is None:
+        return None
+    elif isinstance(gas_policy, int):
+        return gas_policy
+    elif gas_policy == BLOCK_GAS_LIMIT:
+        return w3.eth.getBlock("pending")["gasLimit"]
+    elif gas_policy == LEARNED_GAS:
+        try:
+            return _learned_deployment_gas.get(_get_deployment_gas_key(bytecode, args))
+        except TypeError:
+            return None
+    raise LinkerError(
+        f"Invalid gas policy: {gas_policy}. Must be an int, "
+        f"{BLOCK_GAS_LIMIT} or {LEARNED_GAS}."
+    )
+
+
+def learn_deployment_gas(bytecode: bytes, args: Any, gas_used: int) -> None:
+    try:
+        gas_key = _get_deployment_gas_key(bytecode, args)
+    except TypeError:
+        return
+    if gas_key not in _learned_deployment_gas:
+        _learned_deployment_gas[gas_key] = int(gas_used * LEARNED_GAS_HEADROOM)
+
+
+def _get_deployment_gas_key(bytecode: bytes, args: Any) -> Hashable:
+    return (keccak(bytecode), freeze(args))
+
+
 def get_deployment_address(linked_type: str, package: Package) -> Address:
     """
     Return the address of a linked_type found in a package's manifest deployments.
@@ -128,3 +447,33 @@ def get_deployment_address(linked_type: str, package: Package) -> Address:
             "current w3-connected chain."
         )
     return deployment_address
+
+
+LINKED_BYTECODE_CACHE_SIZE = 256
+
+# Linked bytecode, keyed by the unlinked bytecode, its link references and the address
+# of each linked type, so that linking the same contract type to the same deployments
+# (i.e. in every test that runs a strategy) only applies its link references once.
+_linked_bytecode = OrderedDict()  # type: OrderedDict[Hashable, bytes]
+
+
+def link_bytecode(
+    bytecode: bytes, link_refs: List[Dict[str, Any]], addresses: Dict[str, Address]
+) -> bytes:
+    """
+    Return the bytecode with the link references of every linked type in addresses
+    applied, in a single pass. Link references to any other contract type are left
+    unlinked. Raises a ``BytecodeLinkingError`` if a link reference to be applied has
+    already been linked.
+    """
+    cache_key = (keccak(bytecode), freeze(link_refs), tuple(sorted(addresses.items())))
+    if cache_key in _linked_bytecode:
+        _linked_bytecode.move_to_end(cache_key)
+        return _linked_bytecode[cache_key]
+
+    linked_refs = [link_ref for link_ref in link_refs if link_ref["name"] in addresses]
+    linked_bytecode = apply_all_link_refs(bytecode, linked_refs, addresses)
+    _linked_bytecode[cache_key] = linked_bytecode
+    if len(_linked_bytecode) > LINKED_BYTECODE_CACHE_SIZE:
+        _linked_bytecode.popitem(last=False)
+    return linked_bytecode
@@ -0,0 +1,129 @@
+import functools
+import json
+from pathlib import Path
+from typing import Any, Dict  # noqa: F401
+
+from eth_typing import URI, Manifest
+from ethpm import Package
+from ethpm.contract import LinkableContract
+from ethpm.exceptions import ValidationError
+from ethpm.utils.contract import validate_w3_instance
+from ethpm.utils.manifest_validation import (
+    MANIFEST_SCHEMA_PATH,
+    validate_manifest_against_schema,
+    validate_manifest_deployments,
+)
+from jsonschema import ValidationError as SchemaValidationError
+from jsonschema.validators import validator_for
+from web3 import Web3
+
+# Whether packages created by the linker are validated in full, rather than only
+# validating the parts of their manifests that the linker has changed
+_full_validation = False
+
+
+def load_manifest(path: Path) -> Manifest:
+    """
+    Return the validated manifest found at path. Manifests are cached by their
+    resolved path, modification time and size, so each manifest file is only read
+    and validated once per process. The returned manifest is shared between callers,
+    and must not be modified in place.
+    """
+    stat = path.stat()
+    return _load_manifest(path.resolve(), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=128)
+def _load_manifest(path: Path, mtime_ns: int, size: int) -> Manifest:
+    manifest = json.loads(path.read_text())
+    validate_manifest_against_schema(manifest)
+    validate_manifest_deployments(manifest)
+    return manifest
+
+
+def create_trusted_package(manifest: Manifest, w3: Web3) -> Package:
+    """
+    Return a new Package bound to w3, without validating the manifest. Only to be
+    used with manifests that have already been validated.
+    """
+    validate_w3_instance(w3)
+    package = Package.__new__(Package)
+    package.w3 = w3
+    package.w3.eth.defaultContractFactory = LinkableContract
+    package.manifest = manifest
+    package._uri = None
+    return package
+
+
+def set_full_validation(enabled: bool) -> None:
+    """
+    Validate every package created by the linker against the full ethPM schema, as
+    ``Package`` does (i.e. to debug a strategy that produces an invalid manifest).
+    """
+    global _full_validation
+    _full_validation = enabled
+
+
+def create_linked_package(manifest: Manifest, w3: Web3) -> Package:
+    """
+    Return a new Package for a manifest created by the linker, from a validated
+    manifest and changes that have been validated with ``validate_deployment_delta``
+    or ``validate_bytecode_delta``, so it is only validated in full if enabled.
+    """
+    if _full_validation:
+        return Package(manifest, w3)
+    return create_trusted_package(manifest, w3)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_schema() -> Dict[str, Any]:
+    return json.loads(MANIFEST_SCHEMA_PATH.read_text())
+
+
+@functools.lru_cache(maxsize=None)
+def _get_schema_validator(path: str) -> Any:
+    """
+    Return a validator for the part of the manifest schema found at path (i.e.
+    "properties/deployments"), which can refer to any of the schema's definitions.
+    """
+    schema = _load_schema()
+    subschema = functools.reduce(lambda node, key: node[key], path.split("/"), schema)
+    subschema = {**subschema, "definitions": schema["definitions"]}
+    return validator_for(schema)(subschema)
+
+
+def _validate_against_schema(value: Any, path: str) -> None:
+    try:
+        _get_schema_validator(path).validate(value)
+    except SchemaValidationError as e:
+        raise ValidationError(
+            f"Manifest invalid for schema version {_load_schema()['version']}. "
+            f"Reason: {e.message}"
+        )
+
+
+def validate_deployment_delta(
+    manifest: Manifest,
+    block_uri: URI,
+    deployment_name: str,
+    deployment_data: Dict[str, Any],
+) -> None:
+    """
+    Validate a deployment about to be inserted into a validated manifest, as the full
+    schema and deployments validation would.
+    """
+    _validate_against_schema(
+        {block_uri: {deployment_name: deployment_data}}, "properties/deployments"
+    )
+    contract_type = deployment_data["contract_type"]
+    if contract_type not in manifest.get("contract_types", {}):
+        raise ValidationError(
+            f"Manifest missing references to contracts: {{'{contract_type}'}}."
+        )
+
+
+def validate_bytecode_delta(bytecode: str) -> None:
+    """
+    Validate a (linked) bytecode about to replace a bytecode of a validated manifest.
+    """
+    _validate_against_schema(bytecode, "definitions/ByteString")
@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple  # noqa: F401
+
+from eth_utils import to_bytes, to_hex
+from web3 import Web3
+
+from pytest_ethereum._utils.chain_state import (
+    dump_chain_state,
+    load_chain_state,
+    take_snapshot_at,
+)
+from pytest_ethereum._utils.contract_fixtures import parse_arg
+from pytest_ethereum._utils.package import create_trusted_package, load_manifest
+from pytest_ethereum.deployer import Deployer
+
+SharedDeployment = Tuple[Path, str, Tuple[Any, ...]]
+
+
+def parse_shared_deployments(
+    lines: Iterable[str], rootdir: Path
+) -> List[SharedDeployment]:
+    """
+    Parse lines of "<manifest path> <contract type> [<constructor arg> ...]", where
+    manifest paths are relative to rootdir, and every arg is parsed as json if
+    possible (e.g. an int), or else used as a string (e.g. an address).
+    """
+    deployments = []
+    for line in lines:
+        manifest_path, contract_type, *args = line.split()
+        deployments.append(
+            (
+                rootdir / manifest_path,
+                contract_type,
+                tuple(parse_arg(arg) for arg in args),
+            )
+        )
+    return deployments
+
+
+def prewarm_chain_state(
+    w3: Web3, deployments: Iterable[SharedDeployment], state_path: Path
+) -> List[Dict[str, Any]]:
+    """
+    Make every shared deployment from the current chain head, and write the resulting
+    chain state to state_path, with the chain reverted to the head. Returns the
+    (json serializable) data of every deployment, for ``restore_chain_state``.
+    """
+    head_snapshot_id = w3.testing.snapshot()
+    prewarmed = []
+    for manifest_path, contract_type, args in deployments:
+        deployer = Deployer(create_trusted_package(load_manifest(manifest_path), w3))
+        package = deployer.deploy(contract_type, *args)
+        prewarmed.append(
+            {
+                "manifest_path": str(manifest_path),
+                "contract_type": contract_type,
+                "args": list(args),
+                "block_hash": to_hex(w3.eth.getBlock("latest")["hash"]),
+                "manifest": package.manifest,
+            }
+        )
+        w3.testing.revert(head_snapshot_id)
+    dump_chain_state(w3, state_path)
+    return prewarmed
+
+
+def restore_chain_state(
+    w3: Web3, state_path: Path, prewarmed: Iterable[Dict[str, Any]]
+) -> None:
+    """
+    Load the chain state written by ``prewarm_chain_state``, and add every prewarmed
+    deployment to the deployment cache, so that deploying it from the chain head
+    restores its snapshot instead of executing its transactions.
+    """
+    load_chain_state(w3, state_path)
+    for deployment in prewarmed:
+        manifest = load_manifest(Path(deployment["manifest_path"]))
+        deployer = Deployer(create_trusted_package(manifest, w3))
+        snapshot_id = take_snapshot_at(w3, to_bytes(hexstr=deployment["block_hash"]))
+        deployer.cache_deployment(
+            deployment["contract_type"],
+            tuple(deployment["args"]),
+            snapshot_id,
+            deployment["manifest"],
+        )
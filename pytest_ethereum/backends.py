@@ -0,0 +1,111 @@
+from typing import Dict, Optional  # noqa: F401
+
+from eth_tester import EthereumTester, MockBackend, PyEVMBackend
+from eth_tester.backends.base import BaseChainBackend  # noqa: F401
+from eth_tester.backends.mock.factory import make_genesis_block
+from eth_tester.backends.mock.main import get_default_alloc
+from eth_tester.backends.pyevm.main import (
+    generate_genesis_state_for_keys,
+    get_default_account_keys,
+    get_default_genesis_params,
+)
+from web3 import Web3
+from web3.providers.eth_tester import EthereumTesterProvider
+
+from pytest_ethereum.exceptions import PytestEthereumError
+from pytest_ethereum.providers import (
+    DEFAULT_POOL_SIZE,
+    BatchingProvider,
+    PooledHTTPProvider,
+    PooledIPCProvider,
+)
+
+PYEVM = "pyevm"
+MOCK = "mock"
+NODE_URI_SCHEMES = ("http://", "https://", "ipc://")
+
+# A fixed genesis timestamp, so that chains created with the same genesis parameters
+# have the same genesis block (and so the same chain head) in every process.
+DETERMINISTIC_GENESIS_TIMESTAMP = 1_546_300_800
+
+
+def validate_backend(backend: str) -> None:
+    if backend not in (PYEVM, MOCK) and not is_node_backend(backend):
+        raise PytestEthereumError(
+            f"Invalid ethereum backend: {backend}. Must be {PYEVM}, {MOCK}, or the uri "
+            f"of a node starting with one of: {', '.join(NODE_URI_SCHEMES)}"
+        )
+
+
+def is_node_backend(backend: str) -> bool:
+    return backend.startswith(NODE_URI_SCHEMES)
+
+
+def create_node_provider(
+    uri: str, pool_size: int = DEFAULT_POOL_SIZE
+) -> BatchingProvider:
+    """
+    Return a provider for the node at uri, with a pool of up to pool_size connections
+    (kept alive between requests) which supports JSON-RPC batch requests.
+    """
+    if uri.startswith("ipc://"):
+        return PooledIPCProvider(uri.split("://", 1)[1], pool_size)
+    return PooledHTTPProvider(uri, pool_size)
+
+
+def create_w3(
+    backend: str = PYEVM,
+    num_accounts: int = None,
+    genesis_gas_limit: int = None,
+    genesis_timestamp: int = None,
+    node_pool_size: int = None,
+) -> Web3:
+    """
+    Return a ``Web3`` instance connected to a fresh chain on backend, which is one of:
+
+    - ``pyevm``: an eth-tester chain, which executes transactions with py-evm.
+    - ``mock``: an eth-tester chain, which mines transactions without executing them.
+    - the uri of a local node (``http://``, ``https://`` or ``ipc://<path>``), which
+      must support ``evm_snapshot`` & ``evm_revert`` (e.g. ganache).
+
+    The number of pre-funded accounts and the genesis parameters only apply to the
+    eth-tester backends, and the size of the connection pool only applies to nodes.
+    """
+    validate_backend(backend)
+    if is_node_backend(backend):
+        return Web3(create_node_provider(backend, node_pool_size or DEFAULT_POOL_SIZE))
+    genesis_overrides = {}  # type: Dict[str, int]
+    if genesis_gas_limit is not None:
+        genesis_overrides["gas_limit"] = genesis_gas_limit
+    if genesis_timestamp is not None:
+        genesis_overrides["timestamp"] = genesis_timestamp
+    if backend == MOCK:
+        chain_backend = _create_mock_backend(
+            num_accounts, genesis_overrides
+        )  # type: BaseChainBackend
+    else:
+        chain_backend = _create_pyevm_backend(num_accounts, genesis_overrides)
+    return Web3(EthereumTesterProvider(EthereumTester(chain_backend)))
+
+
+def _create_pyevm_backend(
+    num_accounts: Optional[int], genesis_overrides: Dict[str, int]
+) -> PyEVMBackend:
+    genesis_state = None
+    if num_accounts is not None:
+        account_keys = get_default_account_keys(quantity=num_accounts)
+        genesis_state = generate_genesis_state_for_keys(account_keys)
+    return PyEVMBackend(
+        genesis_parameters=get_default_genesis_params(genesis_overrides),
+        genesis_state=genesis_state,
+    )
+
+
+def _create_mock_backend(
+    num_accounts: Optional[int], genesis_overrides: Dict[str, int]
+) -> MockBackend:
+    if num_accounts is None:
+        alloc = None
+    else:
+        alloc = get_default_alloc(num_accounts)
+    return MockBackend(alloc=alloc, genesis_block=make_genesis_block(genesis_overrides))
@@ -1,37 +1,328 @@
-from typing import Any, Callable, Dict, Tuple  # noqa: F401
+import asyncio
+from functools import partial
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple  # noqa: F401
+from weakref import WeakKeyDictionary
 
-from eth_typing import Address
+from eth_tester import PyEVMBackend
+from eth_typing import Manifest  # noqa: F401
+from eth_utils import keccak
 from ethpm import Package
+from web3 import Web3  # noqa: F401
+from web3.providers.base import BaseProvider  # noqa: F401
+from web3.providers.eth_tester import EthereumTesterProvider
 
+from pytest_ethereum._utils.cache import freeze, get_manifest_hash
+from pytest_ethereum._utils.chain_state import (
+    get_chain_db_keys,
+    get_new_chain_entries,
+    restore_chain_entries,
+)
+from pytest_ethereum._utils.linker import clear_chain_cache, get_sender
+from pytest_ethereum._utils.package import create_trusted_package
+from pytest_ethereum.deployment_cache import (
+    get_deployment_cache,
+    get_deployment_cache_key,
+)
 from pytest_ethereum.exceptions import DeployerError
-from pytest_ethereum.linker import deploy, linker
+from pytest_ethereum.linker import (
+    GasPolicy,
+    async_linker,
+    deploy,
+    inject,
+    is_cacheable_strategy,
+    linker,
+)
+from pytest_ethereum.mining import get_block_batch
+
+logger = logging.getLogger("pytest_ethereum.deployer")
+
+TRANSACT = "transact"
+INJECT = "inject"
+
+# Chain snapshots are only valid for the eth-tester instance they were taken on,
+# so deployments are cached per provider (which is shared by every w3 instance
+# connected to the same chain).
+_deployment_cache = (
+    WeakKeyDictionary()
+)  # type: WeakKeyDictionary[BaseProvider, Dict[Hashable, Tuple[int, Manifest]]]
 
 
 class Deployer:
-    def __init__(self, package: Package) -> None:
+    def __init__(
+        self,
+        package: Package,
+        cache_deployments: bool = False,
+        gas_policy: GasPolicy = None,
+    ) -> None:
         if not isinstance(package, Package):
             raise TypeError(
                 f"Expected a Package object, instead received {type(package)}."
             )
         self.package = package
         self.strategies = {}  # type: Dict[str, Callable[[Package], Package]]
+        self.cache_deployments = cache_deployments
+        self.gas_policy = gas_policy
 
     def deploy(
-        self, contract_type: str, *args: Any, **kwargs: Any
-    ) -> Tuple[Package, Address]:
+        self, contract_type: str, *args: Any, mode: str = TRANSACT, **kwargs: Any
+    ) -> Package:
+        """
+        In "inject" mode, the runtime bytecode of contract_type (and an optional
+        ``storage`` layout) is written directly into the eth-tester state, rather than
+        executing its constructor.
+        """
+        strategy = self._get_strategy(contract_type, args, mode, kwargs)
+        return self._run_strategy(strategy, contract_type, args, kwargs)
+
+    def register_strategy(
+        self, contract_type: str, strategy: Callable[[Package], Package]
+    ) -> None:
+        self.strategies[contract_type] = strategy
+
+    def cache_deployment(
+        self,
+        contract_type: str,
+        args: Tuple[Any, ...],
+        snapshot_id: int,
+        manifest: Manifest,
+    ) -> None:
+        """
+        Add a deployment of contract_type from the current chain head (e.g. made by
+        another process that shares the chain state) to the deployment cache, so that
+        deploying contract_type with args restores the snapshot with snapshot_id.
+        """
+        kwargs = {}  # type: Dict[str, Any]
+        strategy = self._get_strategy(contract_type, args, TRANSACT, kwargs)
+        cache_key = self._get_cache_key(strategy, contract_type, args, kwargs)
+        _deployment_cache.setdefault(self.package.w3.provider, {})[cache_key] = (
+            snapshot_id,
+            manifest,
+        )
+
+    def _get_strategy(
+        self,
+        contract_type: str,
+        args: Tuple[Any, ...],
+        mode: str,
+        kwargs: Dict[str, Any],
+    ) -> Callable[[Package], Package]:
         factory = self.package.get_contract_factory(contract_type)
+        if mode not in (TRANSACT, INJECT):
+            raise DeployerError(
+                f"Invalid deployment mode: {mode}. Must be {TRANSACT} or {INJECT}."
+            )
         if contract_type in self.strategies:
+            if mode == INJECT:
+                raise DeployerError(
+                    f"Unable to inject {contract_type}, since it has a registered "
+                    "strategy. Please use inject() within the strategy instead."
+                )
             strategy = self.strategies[contract_type]
-            return strategy(self.package)
-        if factory.needs_bytecode_linking:
+        elif factory.needs_bytecode_linking:
             raise DeployerError(
                 "Unable to deploy an unlinked factory. "
                 "Please register a strategy for this contract type."
             )
-        strategy = linker(deploy(contract_type, *args, **kwargs))
+        elif mode == INJECT:
+            if args:
+                raise DeployerError(
+                    f"Unable to inject {contract_type} with constructor arguments, "
+                    "since its constructor is never executed."
+                )
+            strategy = self._create_strategy(inject(contract_type, **kwargs))
+        else:
+            gas_policy = kwargs.pop("gas_policy", self.gas_policy)
+            strategy = self._create_strategy(
+                deploy(contract_type, *args, gas_policy=gas_policy, **kwargs)
+            )
+        return strategy
+
+    def _create_strategy(self, operation: Callable[..., Any]) -> Callable[..., Any]:
+        return linker(operation)
+
+    def _apply_strategy(self, strategy: Callable[[Package], Package]) -> Package:
         return strategy(self.package)
 
-    def register_strategy(
-        self, contract_type: str, strategy: Callable[[Package], Package]
-    ) -> None:
-        self.strategies[contract_type] = strategy
+    def _get_cache_key(
+        self,
+        strategy: Callable[[Package], Package],
+        contract_type: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Hashable:
+        return freeze(
+            (
+                get_manifest_hash(self.package.manifest),
+                contract_type,
+                args,
+                kwargs,
+                strategy,
+                self.package.w3.eth.getBlock("latest")["hash"],
+                # Changed by time travel, which a restored snapshot would discard
+                self.package.w3.eth.getBlock("pending")["timestamp"],
+                get_sender(self.package.w3, None),
+            )
+        )
+
+    def _run_strategy(
+        self,
+        strategy: Callable[[Package], Package],
+        contract_type: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Package:
+        """
+        Run the strategy, unless deployments are cached and an identical deployment has
+        already been made from the current chain head (with the same pending block
+        timestamp, and by the same default sender). In which case, the chain is
+        reverted to the snapshot taken right after that deployment, and a package with
+        the resulting manifest is returned without executing any transactions. Only
+        strategies without Python side effects (see ``is_cacheable_strategy``) are
+        cached.
+        """
+        w3 = self.package.w3
+        if not self.cache_deployments or not isinstance(
+            w3.provider, EthereumTesterProvider
+        ):
+            return self._apply_strategy(strategy)
+        if not is_cacheable_strategy(strategy):
+            return self._apply_strategy(strategy)
+        # Restoring a snapshot would discard the pending transactions of a block batch
+        if get_block_batch(w3) is not None:
+            return self._apply_strategy(strategy)
+
+        try:
+            cache_key = self._get_cache_key(strategy, contract_type, args, kwargs)
+        except TypeError:
+            return self._apply_strategy(strategy)
+
+        deployments = _deployment_cache.setdefault(w3.provider, {})
+        if cache_key in deployments:
+            snapshot_id, manifest = deployments[cache_key]
+            w3.testing.revert(snapshot_id)
+            clear_chain_cache(w3)
+            logger.info("%s restored from deployment cache." % contract_type)
+            return create_trusted_package(manifest, w3)
+
+        disk_cache_key = self._get_disk_cache_key(strategy, contract_type, args, kwargs)
+        if disk_cache_key is None:
+            package = self._apply_strategy(strategy)
+        else:
+            package = self._run_strategy_with_disk_cache(
+                strategy, contract_type, disk_cache_key
+            )
+        deployments[cache_key] = (w3.testing.snapshot(), package.manifest)
+        return package
+
+    def _get_disk_cache_key(
+        self,
+        strategy: Callable[[Package], Package],
+        contract_type: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Optional[bytes]:
+        """
+        Return the key of the deployment in the on-disk deployment cache, or None if
+        the cache is disabled or the deployment can't be cached across sessions.
+        """
+        w3 = self.package.w3
+        if get_deployment_cache() is None or not isinstance(
+            w3.provider.ethereum_tester.backend, PyEVMBackend
+        ):
+            return None
+        contract_data = self.package.manifest["contract_types"].get(contract_type, {})
+        bytecode = contract_data.get("deployment_bytecode", {}).get("bytecode", "")
+        try:
+            return get_deployment_cache_key(
+                w3.eth.getBlock("latest")["hash"],
+                w3.eth.getBlock("pending")["timestamp"],
+                get_manifest_hash(self.package.manifest),
+                keccak(text=bytecode),
+                contract_type,
+                args,
+                kwargs,
+                strategy,
+                get_sender(w3, None),
+            )
+        except TypeError:
+            return None
+
+    def _run_strategy_with_disk_cache(
+        self,
+        strategy: Callable[[Package], Package],
+        contract_type: str,
+        disk_cache_key: bytes,
+    ) -> Package:
+        """
+        Restore the chain state written by an identical deployment in a previous
+        session, or run the strategy and store the chain state that it writes.
+        """
+        w3 = self.package.w3
+        disk_cache = get_deployment_cache()
+        cached_deployment = disk_cache.get(disk_cache_key)
+        if cached_deployment is not None:
+            chain_entries, block_hash, manifest = cached_deployment
+            restore_chain_entries(w3, chain_entries, block_hash)
+            logger.info("%s restored from on-disk deployment cache." % contract_type)
+            return create_trusted_package(manifest, w3)
+
+        old_keys = get_chain_db_keys(w3)
+        from_block_number = w3.eth.blockNumber
+        package = self._apply_strategy(strategy)
+        disk_cache.set(
+            disk_cache_key,
+            get_new_chain_entries(w3, old_keys, from_block_number),
+            w3.eth.getBlock("latest")["hash"],
+            package.manifest,
+        )
+        return package
+
+
+# Deployments on an eth-tester chain (which isn't thread safe) are run one at a time
+_eth_tester_locks = (
+    WeakKeyDictionary()
+)  # type: WeakKeyDictionary[BaseProvider, threading.Lock]
+
+
+class AsyncDeployer(Deployer):
+    """
+    A ``Deployer`` whose ``deploy`` is a coroutine, so that independent deployments
+    (i.e. with ``asyncio.gather``) are sent concurrently and wait on their receipts
+    concurrently, rather than one after the other. Strategies can be built with
+    ``async_linker`` (or any other linker), and contract types without a strategy are
+    deployed with ``async_linker``. Deployments on an eth-tester chain are still run
+    one at a time.
+    """
+
+    async def deploy(  # type: ignore
+        self, contract_type: str, *args: Any, mode: str = TRANSACT, **kwargs: Any
+    ) -> Package:
+        strategy = self._get_strategy(contract_type, args, mode, kwargs)
+        self._loop = asyncio.get_event_loop()
+        run_strategy = partial(
+            self._run_strategy, strategy, contract_type, args, kwargs
+        )  # type: Callable[[], Package]
+        w3 = self.package.w3
+        if isinstance(w3.provider, EthereumTesterProvider):
+            lock = _eth_tester_locks.setdefault(w3.provider, threading.Lock())
+            run_strategy = partial(_run_with_lock, lock, run_strategy)
+        return await self._loop.run_in_executor(None, run_strategy)
+
+    def _create_strategy(self, operation: Callable[..., Any]) -> Callable[..., Any]:
+        return async_linker(operation)
+
+    def _apply_strategy(self, strategy: Callable[..., Any]) -> Package:
+        """
+        Called from an executor thread, so an async strategy is run on the event loop.
+        """
+        package = strategy(self.package)
+        if asyncio.iscoroutine(package):
+            return asyncio.run_coroutine_threadsafe(package, self._loop).result()
+        return package
+
+
+def _run_with_lock(lock: threading.Lock, fn: Callable[[], Package]) -> Package:
+    with lock:
+        return fn()
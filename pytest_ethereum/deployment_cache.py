@@ -0,0 +1,136 @@
+import functools
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple  # noqa: F401
+
+from eth_typing import Hash32, Manifest
+from eth_utils import keccak
+import rlp
+
+from pytest_ethereum._utils.cache import freeze_stable
+
+# Bumped whenever the format of cached deployments changes
+DEPLOYMENT_CACHE_FORMAT = 1
+
+# Chain database entries written by a deployment, the hash of the resulting chain
+# head, and the resulting manifest
+CachedDeployment = Tuple[Dict[bytes, bytes], Hash32, Manifest]
+
+
+class DeploymentCache:
+    """
+    On-disk cache of deployments, which persists across test sessions. Every entry
+    holds the chain state written by a deployment, and the resulting manifest. Once
+    the total size of the entries exceeds ``max_size`` bytes, the least recently
+    used entries are evicted.
+    """
+
+    def __init__(self, path: Path, max_size: int) -> None:
+        self.path = path
+        self.max_size = max_size
+        path.mkdir(parents=True, exist_ok=True)
+        gitignore_path = path / ".gitignore"
+        if not gitignore_path.exists():
+            gitignore_path.write_text(
+                "# Created by pytest-ethereum automatically.\n*\n"
+            )
+
+    def get(self, key: bytes) -> Optional[CachedDeployment]:
+        entry_path = self._get_entry_path(key)
+        try:
+            data = entry_path.read_bytes()
+            # The modification time of an entry is its last use
+            os.utime(str(entry_path))
+        except FileNotFoundError:
+            return None
+        try:
+            chain_entries, block_hash, manifest = rlp.decode(data)
+        except rlp.DecodingError:
+            return None
+        return (
+            {key: value for key, value in chain_entries},
+            Hash32(block_hash),
+            json.loads(manifest),
+        )
+
+    def set(
+        self,
+        key: bytes,
+        chain_entries: Dict[bytes, bytes],
+        block_hash: Hash32,
+        manifest: Manifest,
+    ) -> None:
+        data = rlp.encode(
+            [
+                [[key, value] for key, value in chain_entries.items()],
+                block_hash,
+                json.dumps(manifest, sort_keys=True).encode(),
+            ]
+        )
+        entry_path = self._get_entry_path(key)
+        # Written to a temporary file first, since pytest-xdist workers share the cache
+        temporary_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        temporary_path.write_bytes(data)
+        os.replace(str(temporary_path), str(entry_path))
+        self._evict()
+
+    def _get_entry_path(self, key: bytes) -> Path:
+        return self.path / f"{key.hex()}.rlp"
+
+    def _evict(self) -> None:
+        entries = sorted(self._get_entries())
+        total_size = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, entry_path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def _get_entries(self) -> Iterable[Tuple[float, int, Path]]:
+        for entry_path in self.path.glob("*.rlp"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, entry_path
+
+
+def get_deployment_cache_key(*values: Any) -> bytes:
+    """
+    Return a key for values, which is stable across processes and specific to the
+    versions of the packages that determine the resulting chain state. Raises a
+    ``TypeError`` if values have no stable representation.
+    """
+    return keccak(text=repr((_get_versions(), freeze_stable(values))))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_versions() -> Tuple[Any, ...]:
+    import pkg_resources
+
+    versions = []  # type: List[Any]
+    for distribution in ("pytest-ethereum", "py-evm", "eth-tester"):
+        try:
+            versions.append(pkg_resources.get_distribution(distribution).version)
+        except pkg_resources.DistributionNotFound:
+            versions.append(None)
+    return (DEPLOYMENT_CACHE_FORMAT, *versions)
+
+
+_deployment_cache = None  # type: Optional[DeploymentCache]
+
+
+def get_deployment_cache() -> Optional[DeploymentCache]:
+    """
+    Return the active on-disk deployment cache, or None if it is disabled.
+    """
+    return _deployment_cache
+
+
+def set_deployment_cache(deployment_cache: Optional[DeploymentCache]) -> None:
+    global _deployment_cache
+    _deployment_cache = deployment_cache
@@ -0,0 +1,225 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import time
+from typing import (  # noqa: F401
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from eth_typing import AnyAddress, Hash32
+from eth_utils import to_bytes, to_checksum_address
+from web3 import Web3
+
+from pytest_ethereum._utils.abi import ABIIndex, get_abi_index  # noqa: F401
+
+ReportKey = Tuple[str, str, str]
+
+
+class GasStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.gas_used = 0
+        self.max_gas_used = 0
+        self.duration = 0.0
+
+    def record(self, gas_used: int, duration: float) -> None:
+        self.calls += 1
+        self.gas_used += gas_used
+        self.max_gas_used = max(self.max_gas_used, gas_used)
+        self.duration += duration
+
+    def merge(self, stats: Dict[str, Any]) -> None:
+        self.calls += stats["calls"]
+        self.gas_used += stats["gas_used"]
+        self.max_gas_used = max(self.max_gas_used, stats["max_gas_used"])
+        self.duration += stats["duration"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "gas_used": self.gas_used,
+            "max_gas_used": self.max_gas_used,
+            "duration": self.duration,
+        }
+
+
+class GasReport:
+    """
+    Aggregates the gas used, wall time and number of calls of linker operations
+    (i.e. deployments) and transactions, per section, contract and name
+    (i.e. function or linked type).
+    """
+
+    def __init__(self) -> None:
+        self.stats = OrderedDict()  # type: OrderedDict[ReportKey, GasStats]
+        self.contracts = {}  # type: Dict[str, Tuple[str, ABIIndex]]
+        # Time each pending deployment was sent at, by transaction hash
+        self.deployments_sent_at = {}  # type: Dict[Hash32, float]
+
+    def record(
+        self, section: str, contract: str, name: str, gas_used: int, duration: float
+    ) -> None:
+        key = (section, contract, name)
+        if key not in self.stats:
+            self.stats[key] = GasStats()
+        self.stats[key].record(gas_used, duration)
+
+    def record_deployment_sent(self, tx_hash: Hash32, sent_at: float) -> None:
+        self.deployments_sent_at[tx_hash] = sent_at
+
+    def pop_deployment_duration(self, tx_hash: Hash32) -> float:
+        """
+        Return the time since the deployment with tx_hash was sent (or 0.0 if it was
+        not recorded), and forget when it was sent.
+        """
+        sent_at = self.deployments_sent_at.pop(tx_hash, None)
+        return time.perf_counter() - sent_at if sent_at is not None else 0.0
+
+    def clear_pending_deployments(self) -> None:
+        """
+        Forget every deployment without a receipt (i.e. one which failed, or was
+        discarded along with its block batch or by a chain revert).
+        """
+        self.deployments_sent_at.clear()
+
+    def register_contract(
+        self, address: AnyAddress, contract_name: str, abi: Any
+    ) -> None:
+        """
+        Register the name & ABI of a deployed contract, so that transactions sent to
+        its address can be reported by contract and function name.
+        """
+        self.contracts[to_checksum_address(address)] = (
+            contract_name,
+            get_abi_index(abi),
+        )
+
+    def record_transaction(
+        self, transaction: Dict[str, Any], gas_used: int, duration: float
+    ) -> None:
+        to = to_checksum_address(transaction["to"])
+        if to not in self.contracts:
+            self.record("transactions", to, "", gas_used, duration)
+            return
+        contract_name, abi_index = self.contracts[to]
+        data = transaction.get("data")
+        selector = to_bytes(hexstr=data)[:4] if data else b""
+        if selector in abi_index.functions_by_selector:
+            function_name = abi_index.functions_by_selector[selector]["name"]
+        else:
+            function_name = "fallback"
+        self.record("transactions", contract_name, function_name, gas_used, duration)
+
+    def merge(self, report_data: Iterable[Dict[str, Any]]) -> None:
+        """
+        Merge report data (i.e. from ``to_json_data`` of a pytest-xdist worker).
+        """
+        for entry in report_data:
+            key = (entry["section"], entry["contract"], entry["name"])
+            if key not in self.stats:
+                self.stats[key] = GasStats()
+            self.stats[key].merge(entry)
+
+    def to_json_data(self) -> List[Dict[str, Any]]:
+        return [
+            {"section": section, "contract": contract, "name": name, **stats.to_dict()}
+            for (section, contract, name), stats in self.stats.items()
+        ]
+
+    def write_json(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_json_data(), indent=2))
+
+    def summary_lines(self) -> Iterable[str]:
+        yield (
+            f"{'section':<12} {'contract':<24} {'name':<24} {'calls':>7} "
+            f"{'total gas':>12} {'avg gas':>10} {'max gas':>10} {'time (s)':>9}"
+        )
+        ordered_stats = sorted(
+            self.stats.items(), key=lambda item: (item[0][0], -item[1].gas_used)
+        )
+        for (section, contract, name), stats in ordered_stats:
+            yield (
+                f"{section:<12} {contract:<24} {name:<24} {stats.calls:>7} "
+                f"{stats.gas_used:>12} {stats.gas_used // stats.calls:>10} "
+                f"{stats.max_gas_used:>10} {stats.duration:>9.3f}"
+            )
+
+
+_gas_report = None  # type: Optional[GasReport]
+
+
+def get_gas_report() -> Optional[GasReport]:
+    """
+    Return the active gas report, or None if gas reporting is disabled.
+    """
+    return _gas_report
+
+
+def set_gas_report(gas_report: Optional[GasReport]) -> None:
+    global _gas_report
+    _gas_report = gas_report
+
+
+@contextmanager
+def report_operation(
+    w3: Web3, section: str, contract: str, name: str
+) -> Iterator[None]:
+    """
+    Record the wall time of the wrapped operation, and the gas used by every block mined
+    during it, in the active gas report (if any).
+    """
+    gas_report = get_gas_report()
+    if gas_report is None:
+        yield
+        return
+    start_block = w3.eth.blockNumber
+    start_time = time.perf_counter()
+    yield
+    duration = time.perf_counter() - start_time
+    gas_report.record(
+        section, contract, name, get_gas_used_since(w3, start_block), duration
+    )
+
+
+def get_gas_used_since(w3: Web3, block_number: int) -> int:
+    """
+    Return the total gas used by every block mined after block_number.
+    """
+    return sum(
+        w3.eth.getBlock(number)["gasUsed"]
+        for number in range(block_number + 1, w3.eth.blockNumber + 1)
+    )
+
+
+def gas_report_middleware(
+    make_request: Callable[..., Any], w3: Web3
+) -> Callable[..., Any]:
+    """
+    Records the gas used & wall time of every transaction sent to a contract.
+    Deployments are recorded by the linker instead.
+    """
+
+    def middleware(method: str, params: Any) -> Any:
+        gas_report = get_gas_report()
+        if gas_report is None or method != "eth_sendTransaction":
+            return make_request(method, params)
+        if not params[0].get("to"):
+            return make_request(method, params)
+        start_time = time.perf_counter()
+        response = make_request(method, params)
+        duration = time.perf_counter() - start_time
+        if "result" in response:
+            receipt = w3.eth.getTransactionReceipt(response["result"])
+            gas_used = receipt["gasUsed"] if receipt else 0
+            gas_report.record_transaction(params[0], gas_used, duration)
+        return response
+
+    return middleware
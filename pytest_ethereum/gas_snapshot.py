@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+from typing import Dict, Optional  # noqa: F401
+
+import pytest
+
+GAS_SNAPSHOT_ACTIONS = ("fail", "warn")
+
+
+class GasRegressionWarning(pytest.PytestWarning):
+    """
+    Warns that a test used more gas than its gas snapshot allows.
+    """
+
+    pass
+
+
+class GasSnapshot:
+    """
+    Per-test gas usage, stored as a json file (test node id -> gas used) that is
+    meant to be checked in, so that changes in gas usage can be reviewed.
+    """
+
+    def __init__(self, path: Path, tolerance: float = 0.0) -> None:
+        self.path = path
+        self.tolerance = tolerance
+        if path.exists():
+            self.snapshot = json.loads(path.read_text())  # type: Dict[str, int]
+        else:
+            self.snapshot = {}
+        self.recorded = {}  # type: Dict[str, int]
+
+    def record(self, test_id: str, gas_used: int) -> None:
+        self.recorded[test_id] = gas_used
+
+    def check(self, test_id: str, gas_used: int) -> Optional[str]:
+        """
+        Return a message describing the regression, if ``gas_used`` exceeds the gas
+        used in the snapshot by more than ``tolerance`` (a percentage).
+        """
+        if test_id not in self.snapshot:
+            return None
+        snapshot_gas = self.snapshot[test_id]
+        if gas_used <= snapshot_gas * (1 + self.tolerance / 100):
+            return None
+        increase = gas_used - snapshot_gas
+        percentage = f" (+{increase / snapshot_gas:.2%})" if snapshot_gas else ""
+        return (
+            f"Gas used by {test_id} increased from {snapshot_gas} to {gas_used}"
+            f"{percentage}, which exceeds the gas snapshot tolerance of "
+            f"{self.tolerance}%."
+        )
+
+    def write(self) -> None:
+        """
+        Write every recorded gas usage to the snapshot file, keeping the snapshot of
+        any test that was not run.
+        """
+        self.snapshot = {**self.snapshot, **self.recorded}
+        self.path.write_text(json.dumps(self.snapshot, indent=2, sort_keys=True) + "\n")
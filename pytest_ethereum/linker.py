@@ -1,48 +1,450 @@
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from typing import Any, Callable, Dict, Tuple
+import time
+from typing import (  # noqa: F401
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+)
 
-from eth_typing import Address
-from eth_utils import to_canonical_address, to_checksum_address, to_hex
-from eth_utils.toolz import assoc_in, curry, pipe
+from eth_typing import Address, Hash32, Manifest
+from eth_utils import to_bytes, to_canonical_address, to_checksum_address, to_hex
+from eth_utils.toolz import curry, pipe
 from ethpm import Package
+from ethpm.contract import LinkableContract, is_prelinked_bytecode
+from ethpm.exceptions import BytecodeLinkingError
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound
+from web3.providers.eth_tester import EthereumTesterProvider
 
-from pytest_ethereum._utils.linker import (
+from pytest_ethereum._utils.linker import (  # noqa: F401
+    BLOCK_GAS_LIMIT,
+    LEARNED_GAS,
+    GasPolicy,
+    PipelinePackage,
     create_deployment_data,
     create_latest_block_uri,
+    get_create_address,
     get_deployment_address,
+    get_deployment_gas,
+    get_manifest_builder,
+    get_nonce_manager,
+    get_sender,
+    inject_code,
     insert_deployment,
+    learn_deployment_gas,
+    link_bytecode,
+    update_package,
+)
+from pytest_ethereum._utils.package import (  # noqa: F401
+    create_linked_package,
+    set_full_validation,
+    validate_bytecode_delta,
+    validate_deployment_delta,
 )
 from pytest_ethereum.exceptions import LinkerError
+from pytest_ethereum.gas_report import get_gas_report, report_operation
+from pytest_ethereum.mining import get_block_batch, wait_for_receipt, wait_for_receipts
+from pytest_ethereum.typing import TxReceipt
 
 logger = logging.getLogger("pytest_ethereum.linker")
 
+ASYNC_LINKER_MAX_WORKERS = 16
+RECEIPT_POLL_INTERVAL = 0.1
+RECEIPT_TIMEOUT = 120
 
-def linker(*args: Callable[..., Any]) -> Callable[..., Any]:
+
+def linker(
+    *args: Callable[..., Any], predict_addresses: bool = False
+) -> Callable[..., Any]:
+    """
+    Return a strategy that applies the operations in the order provided. If
+    ``predict_addresses`` is set, the address of each deployment is predicted from its
+    sender and nonce, so that contract types can be linked to a deployment without
+    waiting on its receipt. Predicted addresses are verified against the receipts
+    before any other operation (i.e. ``run_python``) is applied.
+    """
+    if predict_addresses:
+        return _predictive_linker(args)
     return _linker(args)
 
 
 @curry
 def _linker(operations: Callable[..., Any], package: Package) -> Callable[..., Package]:
-    return pipe(package, *operations)
+    """
+    Operations update the manifest of a single pipeline package in place, which is
+    validated once all operations have been applied.
+    """
+    pipeline_package = PipelinePackage(package.manifest, package.w3)
+    linked_package = pipe(pipeline_package, *operations)
+    return _build_package(linked_package)
+
+
+@curry
+def _predictive_linker(operations: Sequence[Any], package: Package) -> Package:
+    w3 = package.w3
+    linked_package = PipelinePackage(package.manifest, w3)  # type: Package
+    nonces = {}  # type: Dict[Address, int]
+    pending_deployments = (
+        []
+    )  # type: List[Tuple[str, Any, LinkableContract, Hash32, Address]]
+    for op in operations:
+        if _is_operation(op, _deploy):
+            contract_name, args, transaction, gas_policy = op.args
+            sender = get_sender(w3, transaction)
+            if sender not in nonces:
+                nonces[sender] = w3.eth.getTransactionCount(sender, "pending")
+            nonce = nonces[sender]
+            factory, tx_hash = _send_deployment(
+                contract_name,
+                args,
+                {**(transaction or {}), "from": sender, "nonce": nonce},
+                gas_policy,
+                linked_package,
+            )
+            nonces[sender] += 1
+            predicted_address = get_create_address(sender, nonce)
+            pending_deployments.append(
+                (contract_name, args, factory, tx_hash, predicted_address)
+            )
+        elif _is_operation(op, _link) and any(
+            pending[0] in op.args[1] for pending in pending_deployments
+        ):
+            contract, linked_types = op.args
+            predicted_addresses = {
+                pending[0]: pending[4]
+                for pending in pending_deployments
+                if pending[0] in linked_types
+            }
+            deployment_addresses = {
+                linked_type: predicted_addresses[linked_type]
+                if linked_type in predicted_addresses
+                else get_deployment_address(linked_type, linked_package)
+                for linked_type in linked_types
+            }
+            linked_package = _link_address(
+                contract, deployment_addresses, linked_package
+            )
+        else:
+            linked_package = _insert_predicted_deployments(
+                pending_deployments, linked_package
+            )
+            pending_deployments = []
+            linked_package = op(linked_package)
+            # The operation may have sent transactions (or injected a contract) from
+            # any sender, so nonces are read again before the next deployment
+            nonces.clear()
+    linked_package = _insert_predicted_deployments(pending_deployments, linked_package)
+    return _build_package(linked_package)
+
+
+def _insert_predicted_deployments(
+    pending_deployments: Sequence[Tuple[str, Any, LinkableContract, Hash32, Address]],
+    package: Package,
+) -> Package:
+    tx_hashes = [pending_deployment[3] for pending_deployment in pending_deployments]
+    tx_receipts = wait_for_receipts(package.w3, tx_hashes)
+    for pending_deployment, tx_receipt in zip(pending_deployments, tx_receipts):
+        contract_name, args, factory, _, predicted_address = pending_deployment
+        address = to_canonical_address(tx_receipt.contractAddress)
+        if address != predicted_address:
+            raise LinkerError(
+                f"{contract_name} was deployed at {to_checksum_address(address)}, "
+                f"rather than the predicted address: {to_checksum_address(predicted_address)}."
+            )
+        package = _insert_deployment(contract_name, args, factory, tx_receipt, package)
+    return package
+
+
+def graph_linker(*args: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Return a strategy that applies the operations in order of their dependencies, rather
+    than in the order provided. ``link(contract, *linked_types)`` depends on
+    ``deploy(linked_type)`` for each linked type, and ``deploy(contract)`` depends on every
+    ``link(contract, ...)``. Any other operation (i.e. ``run_python``) depends on every
+    operation provided before it. All deployments without outstanding dependencies are
+    sent before waiting on any of their receipts.
+    """
+    return _graph_linker(args)
+
+
+@curry
+def _graph_linker(operations: Sequence[Any], package: Package) -> Package:
+    linked_package = PipelinePackage(package.manifest, package.w3)  # type: Package
+    for level in _schedule(operations):
+        deployments = [op for op in level if _is_operation(op, _deploy)]
+        sent_deployments = [
+            _send_deployment(
+                contract_name, args, transaction, gas_policy, linked_package
+            )
+            for contract_name, args, transaction, gas_policy in (
+                op.args for op in deployments
+            )
+        ]
+        tx_receipts = wait_for_receipts(
+            package.w3, [tx_hash for _, tx_hash in sent_deployments]
+        )
+        for op, (factory, _), tx_receipt in zip(
+            deployments, sent_deployments, tx_receipts
+        ):
+            contract_name, args, _, _ = op.args
+            linked_package = _insert_deployment(
+                contract_name, args, factory, tx_receipt, linked_package
+            )
+        for op in level:
+            if not _is_operation(op, _deploy):
+                linked_package = op(linked_package)
+    return _build_package(linked_package)
+
+
+def _schedule(operations: Sequence[Any]) -> List[List[Any]]:
+    """
+    Return the operations grouped into levels, where every operation only depends on
+    operations found in earlier levels.
+    """
+    deploys = defaultdict(list)  # type: Dict[str, List[int]]
+    links = defaultdict(list)  # type: Dict[str, List[int]]
+    for index, op in enumerate(operations):
+        if _is_deployment(op):
+            deploys[op.args[0]].append(index)
+        elif _is_operation(op, _link):
+            links[op.args[0]].append(index)
+
+    dependencies = {
+        index: set() for index in range(len(operations))
+    }  # type: Dict[int, Set[int]]
+    barrier = None
+    for index, op in enumerate(operations):
+        if barrier is not None:
+            dependencies[index].add(barrier)
+        if _is_deployment(op):
+            contract = op.args[0]
+            dependencies[index].update(links[contract])
+            dependencies[index].update(i for i in deploys[contract] if i < index)
+        elif _is_operation(op, _link):
+            for linked_type in op.args[1]:
+                linked_deploys = deploys[linked_type]
+                if not linked_deploys:
+                    continue
+                # Link to the latest deployment of linked_type provided before this
+                # operation, and make any later deployments of linked_type wait for it
+                linked_deploy = max(
+                    (i for i in linked_deploys if i < index), default=linked_deploys[0]
+                )
+                dependencies[index].add(linked_deploy)
+                for i in linked_deploys:
+                    if i > linked_deploy:
+                        dependencies[i].add(index)
+        else:
+            dependencies[index].update(range(index))
+            barrier = index
+
+    levels = {}  # type: Dict[int, int]
+    while len(levels) < len(operations):
+        ready = [
+            index
+            for index, deps in dependencies.items()
+            if index not in levels and deps <= levels.keys()
+        ]
+        if not ready:
+            raise LinkerError(
+                "Unable to schedule linker operations with circular dependencies."
+            )
+        for index in ready:
+            levels[index] = max(
+                (levels[dep] + 1 for dep in dependencies[index]), default=0
+            )
+
+    scheduled = [[] for _ in set(levels.values())]  # type: List[List[Any]]
+    for index, op in enumerate(operations):
+        scheduled[levels[index]].append(op)
+    return scheduled
+
+
+def async_linker(*args: Callable[..., Any]) -> Callable[..., Awaitable[Package]]:
+    """
+    Return an async strategy (a coroutine function of the package), which applies the
+    operations in order of their dependencies like ``graph_linker``. All deployments
+    without outstanding dependencies are sent concurrently, with nonces assigned by the
+    nonce manager of w3, and their receipts are awaited concurrently. Blocking web3
+    requests are run in a thread pool, which only has a single thread on an eth-tester
+    chain, since it isn't thread safe.
+    """
+    return _async_linker(args)
+
+
+@curry
+async def _async_linker(operations: Sequence[Any], package: Package) -> Package:
+    w3 = package.w3
+    loop = asyncio.get_event_loop()
+    if isinstance(w3.provider, EthereumTesterProvider):
+        max_workers = 1
+    else:
+        max_workers = ASYNC_LINKER_MAX_WORKERS
+    with ThreadPoolExecutor(max_workers) as executor:
+
+        def run(fn: Callable[..., Any], *args: Any) -> Awaitable[Any]:
+            return loop.run_in_executor(executor, fn, *args)
+
+        linked_package = PipelinePackage(package.manifest, w3)  # type: Package
+        for level in _schedule(operations):
+            deployments = [op for op in level if _is_operation(op, _deploy)]
+            sent_deployments = await asyncio.gather(
+                *(
+                    run(_send_concurrent_deployment, *op.args, linked_package)
+                    for op in deployments
+                )
+            )
+            tx_receipts = await asyncio.gather(
+                *(_await_receipt(w3, tx_hash, run) for _, tx_hash in sent_deployments)
+            )
+            for op, (factory, _), tx_receipt in zip(
+                deployments, sent_deployments, tx_receipts
+            ):
+                contract_name, args, _, _ = op.args
+                linked_package = await run(
+                    _insert_deployment,
+                    contract_name,
+                    args,
+                    factory,
+                    tx_receipt,
+                    linked_package,
+                )
+            for op in level:
+                if not _is_operation(op, _deploy):
+                    linked_package = await run(op, linked_package)
+        return await run(_build_package, linked_package)
+
+
+def _send_concurrent_deployment(
+    contract_name: str,
+    args: Any,
+    transaction: Dict[str, Any],
+    gas_policy: GasPolicy,
+    package: Package,
+) -> Tuple[LinkableContract, Hash32]:
+    sender = get_sender(package.w3, transaction)
+    with get_nonce_manager(package.w3).reserve(sender) as nonce:
+        return _send_deployment(
+            contract_name,
+            args,
+            {**(transaction or {}), "from": sender, "nonce": nonce},
+            gas_policy,
+            package,
+        )
+
+
+async def _await_receipt(
+    w3: Web3, tx_hash: Hash32, run: Callable[..., Awaitable[Any]]
+) -> TxReceipt:
+    """
+    Poll for the receipt of tx_hash, without blocking a thread between polls.
+    """
+    block_batch = get_block_batch(w3)
+    if block_batch is not None and block_batch.is_pending(tx_hash):
+        await run(block_batch.mine)
+    loop = asyncio.get_event_loop()
+    timeout_at = loop.time() + RECEIPT_TIMEOUT
+    while True:
+        try:
+            tx_receipt = await run(w3.eth.getTransactionReceipt, tx_hash)
+        except TransactionNotFound:
+            tx_receipt = None
+        if tx_receipt is not None and tx_receipt["blockHash"] is not None:
+            return tx_receipt
+        if loop.time() > timeout_at:
+            raise LinkerError(
+                f"Transaction {to_hex(tx_hash)} is not in the chain, after "
+                f"{RECEIPT_TIMEOUT} seconds."
+            )
+        await asyncio.sleep(RECEIPT_POLL_INTERVAL)
+
+
+def is_cacheable_strategy(strategy: Any) -> bool:
+    """
+    Return whether strategy is a linker strategy of operations which only change the
+    chain & manifest (i.e. not ``run_python``), so that its result can be restored
+    from a snapshot instead of running it again. Any other strategy (i.e. a plain
+    function) may have Python side effects.
+    """
+    linkers = (_linker, _predictive_linker, _graph_linker, _async_linker)
+    if not any(_is_operation(strategy, linker) for linker in linkers):
+        return False
+    (operations,) = strategy.args
+    chain_operations = (_deploy, _inject, _link)
+    return all(
+        any(_is_operation(op, operation) for operation in chain_operations)
+        for op in operations
+    )
+
+
+def _is_operation(op: Any, operation: Any) -> bool:
+    return isinstance(op, curry) and op.func is operation.func
+
+
+def _is_deployment(op: Any) -> bool:
+    return _is_operation(op, _deploy) or _is_operation(op, _inject)
+
+
+def _build_package(package: Package) -> Package:
+    if isinstance(package, PipelinePackage):
+        return create_linked_package(package.manifest_builder.build(), package.w3)
+    return package
 
 
 def deploy(
-    contract_name: str, *args: Any, transaction: Dict[str, Any] = None
-) -> Callable[..., Tuple[Package, Address]]:
+    contract_name: str,
+    *args: Any,
+    transaction: Dict[str, Any] = None,
+    gas_policy: GasPolicy = None,
+) -> Callable[..., Package]:
     """
-    Return a newly created package and contract address.
-    Will deploy the given contract_name, if data exists in package. If
-    a deployment is found on the current w3 instance, it will return that deployment
-    rather than creating a new instance.
+    Deploy the given contract_name, if data exists in package, and return a package
+    with the deployment added to its manifest. Within a linker, this is the pipeline
+    package itself, whose copy-on-write manifest shares every unmodified part with
+    the manifest of the original package (which is left unchanged). Outside of a
+    linker, it is a new package built from such a manifest.
+
+    Unless the transaction provides "gas", the deployment gas is estimated by executing
+    the constructor. A ``gas_policy`` skips the estimate: either a fixed amount of gas,
+    ``BLOCK_GAS_LIMIT``, or ``LEARNED_GAS`` to use the gas used by a previous
+    deployment of the same bytecode and arguments (with some headroom).
     """
-    return _deploy(contract_name, args, transaction)
+    return _deploy(contract_name, args, transaction, gas_policy)
 
 
 @curry
 def _deploy(
-    contract_name: str, args: Any, transaction: Dict[str, Any], package: Package
-) -> Tuple[Package, Address]:
+    contract_name: str,
+    args: Any,
+    transaction: Dict[str, Any],
+    gas_policy: GasPolicy,
+    package: Package,
+) -> Package:
     # Deploy new instance
+    factory, tx_hash = _send_deployment(
+        contract_name, args, transaction, gas_policy, package
+    )
+    tx_receipt = wait_for_receipt(package.w3, tx_hash)
+    return _insert_deployment(contract_name, args, factory, tx_receipt, package)
+
+
+def _send_deployment(
+    contract_name: str,
+    args: Any,
+    transaction: Dict[str, Any],
+    gas_policy: GasPolicy,
+    package: Package,
+) -> Tuple[LinkableContract, Hash32]:
     factory = package.get_contract_factory(contract_name)
     if not factory.linked_references and factory.unlinked_references:
         raise LinkerError(
@@ -50,46 +452,227 @@ def _deploy(
             "necessary to populate manifest deployments that have a link reference. If using the "
             "builder tool, use `contract_type(..., runtime_bytecode=True)`."
         )
+    if not transaction or "gas" not in transaction:
+        gas = get_deployment_gas(package.w3, factory.bytecode, args, gas_policy)
+        if gas is not None:
+            transaction = {**(transaction or {}), "gas": gas}
+    sent_at = time.perf_counter()
     tx_hash = factory.constructor(*args).transact(transaction)
-    tx_receipt = package.w3.eth.waitForTransactionReceipt(tx_hash)
+    gas_report = get_gas_report()
+    if gas_report is not None:
+        gas_report.record_deployment_sent(tx_hash, sent_at)
+    return factory, tx_hash
+
+
+def _insert_deployment(
+    contract_name: str,
+    args: Any,
+    factory: LinkableContract,
+    tx_receipt: TxReceipt,
+    package: Package,
+) -> Package:
+    gas_report = get_gas_report()
+    if gas_report is not None:
+        duration = gas_report.pop_deployment_duration(tx_receipt.transactionHash)
+    if not tx_receipt.status:
+        raise LinkerError(
+            f"Deployment of {contract_name} failed in transaction: "
+            f"{to_hex(tx_receipt.transactionHash)}. If a gas policy was provided, it "
+            "may not provide enough gas to deploy this contract."
+        )
+    learn_deployment_gas(factory.bytecode, args, tx_receipt.gasUsed)
+    if gas_report is not None:
+        gas_report.record(
+            "linker", contract_name, "deploy", tx_receipt.gasUsed, duration
+        )
     address = to_canonical_address(tx_receipt.contractAddress)
+    manifest = _insert_deployment_data(
+        contract_name, address, factory, tx_receipt, package
+    )
+    logger.info("%s deployed." % contract_name)
+    return update_package(package, manifest)
+
+
+def _insert_deployment_data(
+    contract_name: str,
+    address: Address,
+    factory: LinkableContract,
+    tx_receipt: TxReceipt,
+    package: Package,
+) -> Manifest:
+    gas_report = get_gas_report()
+    if gas_report is not None:
+        gas_report.register_contract(address, contract_name, factory.abi)
     # Create manifest copy with new deployment instance
     latest_block_uri = create_latest_block_uri(package.w3, tx_receipt)
     deployment_data = create_deployment_data(
         contract_name, address, tx_receipt, factory.linked_references
     )
-    manifest = insert_deployment(
-        package, contract_name, deployment_data, latest_block_uri
+    validate_deployment_delta(
+        package.manifest, latest_block_uri, contract_name, deployment_data
     )
-    logger.info("%s deployed." % contract_name)
-    return Package(manifest, package.w3)
+    return insert_deployment(package, contract_name, deployment_data, latest_block_uri)
+
+
+def inject(
+    contract_name: str,
+    storage: Dict[int, int] = None,
+    transaction: Dict[str, Any] = None,
+) -> Callable[..., Package]:
+    """
+    Return a package with the injected contract added to its manifest (see ``deploy``),
+    after writing the runtime bytecode of contract_name (and any provided storage
+    slots) directly into the state of an eth-tester chain.
+    The constructor is never executed, so this is only suitable for contracts that
+    don't rely on its side effects (i.e. libraries). The address is the one that a
+    deployment from the sender (``transaction["from"]`` or the default account) would
+    create, and the sender's nonce is incremented.
+    """
+    return _inject(contract_name, storage, transaction)
+
+
+@curry
+def _inject(
+    contract_name: str,
+    storage: Dict[int, int],
+    transaction: Dict[str, Any],
+    package: Package,
+) -> Package:
+    factory = package.get_contract_factory(contract_name)
+    if not factory.bytecode_runtime:
+        raise LinkerError(
+            f"Contract factory: {contract_name} is missing runtime bytecode, which is "
+            "necessary to inject a contract."
+        )
+    if factory.linked_references and not is_prelinked_bytecode(
+        factory.bytecode_runtime, factory.linked_references
+    ):
+        raise LinkerError(
+            f"Unable to inject contract factory: {contract_name}, since its runtime "
+            "bytecode has not been linked."
+        )
+    sender = get_sender(package.w3, transaction)
+    with report_operation(package.w3, "linker", contract_name, "inject"):
+        address, block_hash = inject_code(
+            package.w3, sender, factory.bytecode_runtime, storage
+        )
+    tx_receipt = AttributeDict({"blockHash": block_hash, "transactionHash": None})
+    manifest = _insert_deployment_data(
+        contract_name, address, factory, tx_receipt, package
+    )
+    logger.info("%s injected." % contract_name)
+    return update_package(package, manifest)
+
+
+def link(contract: str, *linked_types: Any) -> Any:
+    """
+    Return a new package, created with a new manifest after applying the link
+    references of every linked type to the contract type's bytecode, in a single pass.
+    Like every other operation, the package can also be provided directly (i.e.
+    ``link("Escrow", "SafeSendLib", package)``) to apply the operation immediately.
+    """
+    if linked_types and isinstance(linked_types[-1], Package):
+        *linked_types, package = linked_types
+        return link(contract, *linked_types)(package)
+    if not linked_types:
+        raise LinkerError(f"No linked types provided to link {contract} to.")
+    invalid_linked_types = [
+        linked_type for linked_type in linked_types if not isinstance(linked_type, str)
+    ]
+    if invalid_linked_types:
+        raise LinkerError(
+            f"Invalid linked types: {invalid_linked_types} to link {contract} to. "
+            "Must be contract type names."
+        )
+    return _link(contract, linked_types)
 
 
 @curry
-def link(contract: str, linked_type: str, package: Package) -> Package:
+def _link(contract: str, linked_types: Sequence[str], package: Package) -> Package:
+    with report_operation(
+        package.w3, "linker", contract, f"link {', '.join(linked_types)}"
+    ):
+        # Fail on an invalid linked type before looking up any deployment
+        _get_link_refs(contract, linked_types, package)
+        deployment_addresses = {
+            linked_type: get_deployment_address(linked_type, package)
+            for linked_type in linked_types
+        }
+        return _link_address(contract, deployment_addresses, package)
+
+
+def _get_link_refs(
+    contract: str, linked_types: Iterable[str], package: Package
+) -> Dict[str, List[Dict[str, Any]]]:
     """
-    Return a new package, created with a new manifest after applying the linked type
-    reference to the contract factory.
+    Return the link references of the contract type's deployment and runtime bytecode.
     """
-    deployment_address = get_deployment_address(linked_type, package)
-    unlinked_factory = package.get_contract_factory(contract)
-    if not unlinked_factory.needs_bytecode_linking:
+    contract_type = package.manifest.get("contract_types", {}).get(contract, {})
+    link_refs = {
+        bytecode_type: contract_type[bytecode_type].get("link_references")
+        for bytecode_type in ("deployment_bytecode", "runtime_bytecode")
+        if bytecode_type in contract_type
+    }
+    if not any(link_refs.values()):
         raise LinkerError(
-            f"Contract factory: {unlinked_factory.__repr__()} does not need bytecode linking, "
+            f"Contract type: {contract} does not need bytecode linking, "
             "so it is not a valid contract type for link()"
         )
-    linked_factory = unlinked_factory.link_bytecode({linked_type: deployment_address})
-    # todo replace runtime_bytecode in manifest
-    manifest = assoc_in(
-        package.manifest,
-        ("contract_types", contract, "deployment_bytecode", "bytecode"),
-        to_hex(linked_factory.bytecode),
-    )
+    link_ref_names = {
+        link_ref["name"] for refs in link_refs.values() if refs for link_ref in refs
+    }
+    missing_names = sorted(set(linked_types) - link_ref_names)
+    if missing_names:
+        raise LinkerError(
+            f"Contract type: {contract} has no link references to: "
+            f"{', '.join(missing_names)}."
+        )
+    return link_refs
+
+
+def _link_address(
+    contract: str, deployment_addresses: Dict[str, Address], package: Package
+) -> Package:
+    """
+    Link the contract type to the deployment address of each linked type. The linked
+    bytecode is read from (and written to) the manifest directly, rather than through
+    a contract factory, and cached by ``link_bytecode``.
+    """
+    link_refs = _get_link_refs(contract, deployment_addresses, package)
+    contract_type = package.manifest["contract_types"][contract]
+    linked_types = ", ".join(deployment_addresses)
+    manifest_builder = get_manifest_builder(package)
+    for bytecode_type, refs in link_refs.items():
+        if not refs:
+            continue
+        try:
+            linked_bytecode = link_bytecode(
+                to_bytes(hexstr=contract_type[bytecode_type]["bytecode"]),
+                refs,
+                deployment_addresses,
+            )
+        except BytecodeLinkingError:
+            raise LinkerError(
+                f"Unable to link {contract} to {linked_types}, since its "
+                f"{bytecode_type} has already been linked."
+            )
+        bytecode = to_hex(linked_bytecode)
+        validate_bytecode_delta(bytecode)
+        manifest_builder.assoc_in(
+            ("contract_types", contract, bytecode_type, "bytecode"), bytecode
+        )
     logger.info(
         "%s linked to %s at address %s."
-        % (contract, linked_type, to_checksum_address(deployment_address))
+        % (
+            contract,
+            linked_types,
+            ", ".join(
+                to_checksum_address(address)
+                for address in deployment_addresses.values()
+            ),
+        )
     )
-    return Package(manifest, package.w3)
+    return update_package(package, manifest_builder.manifest)
 
 
 @curry
@@ -98,6 +681,7 @@ def run_python(callback_fn: Callable[..., None], package: Package) -> Package:
     Return the unmodified package, after performing any user-defined callback function on
     the contracts in the package.
     """
-    callback_fn(package)
+    with report_operation(package.w3, "linker", callback_fn.__name__, "run_python"):
+        callback_fn(package)
     logger.info("%s python function ran." % callback_fn.__name__)
     return package
@@ -0,0 +1,201 @@
+from functools import partial
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple  # noqa: F401
+from weakref import WeakKeyDictionary
+
+from eth_typing import Address, Hash32  # noqa: F401
+from eth_utils import to_checksum_address
+from hexbytes import HexBytes
+from web3 import Web3
+
+from pytest_ethereum._utils.chain_state import get_pyevm_backend
+from pytest_ethereum._utils.linker import get_sender
+from pytest_ethereum.exceptions import PytestEthereumError
+from pytest_ethereum.gas_report import get_gas_report
+from pytest_ethereum.providers import prefetch
+from pytest_ethereum.typing import TxReceipt
+
+# The active block batch of each w3 instance
+_block_batches = WeakKeyDictionary()  # type: WeakKeyDictionary[Web3, BlockBatch]
+
+
+class BlockBatch:
+    """
+    Within a ``BlockBatch``, every transaction sent on w3 is added to the pending
+    block without mining it, so that all of them are mined together in a single block
+    on exit, rather than one block per transaction. Transactions are executed (and
+    their gas estimated) on top of the transactions sent before them in the batch, and
+    a new block is started once the next transaction doesn't fit in the pending block.
+    Only supported by an eth-tester chain with a ``PyEVMBackend``.
+
+    .. code:: python
+
+       with BlockBatch(w3) as batch:
+           for user in users:
+               token.functions.transfer(user, 1).transact()
+       assert all(receipt.status for receipt in batch.receipts)
+    """
+
+    def __init__(self, w3: Web3) -> None:
+        self.w3 = w3
+        self.backend = get_pyevm_backend(w3)
+        self.receipts = []  # type: List[TxReceipt]
+        self._pending = []  # type: List[Tuple[Dict[str, Any], HexBytes, float]]
+
+    def __enter__(self) -> "BlockBatch":
+        if self.w3 in _block_batches:
+            raise PytestEthereumError(
+                "Unable to start a block batch within another block batch on the "
+                "same w3 instance."
+            )
+        _block_batches[self.w3] = self
+        self.w3.middleware_onion.add(self._middleware, "block_batch")
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        try:
+            self.mine()
+        finally:
+            self.w3.middleware_onion.remove("block_batch")
+            del _block_batches[self.w3]
+
+    def is_pending(self, tx_hash: Hash32) -> bool:
+        return any(pending[1] == tx_hash for pending in self._pending)
+
+    def mine(self) -> List[TxReceipt]:
+        """
+        Mine every pending transaction of the batch in a single block, and return
+        their receipts in the order they were sent (which are also added to
+        ``receipts``). The batch can carry on, starting a new block.
+        """
+        if not self._pending:
+            return []
+        start_time = time.perf_counter()
+        self.w3.testing.mine()
+        duration = time.perf_counter() - start_time
+        receipts = []
+        gas_report = get_gas_report()
+        for transaction, tx_hash, send_duration in self._pending:
+            receipt = self.w3.eth.getTransactionReceipt(tx_hash)
+            receipts.append(receipt)
+            if gas_report is not None and transaction.get("to"):
+                # The time to mine the block is shared by its transactions
+                gas_report.record_transaction(
+                    transaction,
+                    receipt.gasUsed,
+                    send_duration + duration / len(self._pending),
+                )
+        self._pending = []
+        self.receipts.extend(receipts)
+        return receipts
+
+    def _middleware(
+        self, make_request: Callable[..., Any], w3: Web3
+    ) -> Callable[..., Any]:
+        def middleware(method: str, params: Any) -> Any:
+            if method != "eth_sendTransaction":
+                return make_request(method, params)
+            start_time = time.perf_counter()
+            tx_hash = HexBytes(self._send_transaction(params[0]))
+            self._pending.append((params[0], tx_hash, time.perf_counter() - start_time))
+            return {"result": tx_hash}
+
+        return middleware
+
+    def _send_transaction(self, transaction: Dict[str, Any]) -> Hash32:
+        """
+        Sign the transaction with the key of its sender, and add it to the pending
+        block. Transactions are signed here, since eth-tester always takes the nonce
+        of a transaction from the latest block, rather than the pending block.
+        """
+        sender = get_sender(self.w3, transaction)
+        private_key = self._get_private_key(sender)
+        if "gas" in transaction:
+            gas = transaction["gas"]
+        else:
+            estimate = {
+                key: value for key, value in transaction.items() if key != "nonce"
+            }
+            gas = self.w3.eth.estimateGas(
+                {**estimate, "from": to_checksum_address(sender)}
+            )
+        pending_block = self.w3.eth.getBlock("pending")
+        if self._pending and gas > pending_block.gasLimit - pending_block.gasUsed:
+            self.mine()
+        fields = {
+            "nonce": transaction.get(
+                "nonce", self.backend.get_nonce(sender, "pending")
+            ),
+            "gas": gas,
+            "gasPrice": transaction.get("gasPrice", self.w3.eth.gasPrice),
+            "to": transaction.get("to", b""),
+            "value": transaction.get("value", 0),
+            "data": transaction.get("data", b""),
+        }
+        signed_transaction = self.w3.eth.account.signTransaction(fields, private_key)
+        return self.backend.send_raw_transaction(signed_transaction.rawTransaction)
+
+    def _get_private_key(self, sender: Address) -> bytes:
+        for account_key in self.backend.account_keys:
+            if account_key.public_key.to_canonical_address() == sender:
+                return account_key.to_bytes()
+        raise PytestEthereumError(
+            f"Unable to send a transaction from {to_checksum_address(sender)} within "
+            "a block batch, since it isn't an account of the eth-tester backend."
+        )
+
+
+def get_block_batch(w3: Web3) -> Optional[BlockBatch]:
+    """
+    Return the active block batch of w3, or None if transactions are auto-mined.
+    """
+    return _block_batches.get(w3)
+
+
+def wait_for_receipt(w3: Web3, tx_hash: Hash32) -> TxReceipt:
+    """
+    Return the receipt of tx_hash, mining the pending block of the active block batch
+    first if the transaction was sent within it.
+    """
+    block_batch = get_block_batch(w3)
+    if block_batch is not None and block_batch.is_pending(tx_hash):
+        block_batch.mine()
+    return w3.eth.waitForTransactionReceipt(tx_hash)
+
+
+def wait_for_receipts(w3: Web3, tx_hashes: Sequence[Hash32]) -> List[TxReceipt]:
+    """
+    Return the receipts of tx_hashes, like ``wait_for_receipt``, looking them up in a
+    single batch request on a node backend.
+    """
+    block_batch = get_block_batch(w3)
+    if block_batch is not None and any(map(block_batch.is_pending, tx_hashes)):
+        block_batch.mine()
+    receipt_lookups = (
+        partial(w3.eth.getTransactionReceipt, tx_hash) for tx_hash in tx_hashes
+    )
+    with prefetch(w3, *receipt_lookups):
+        return [w3.eth.waitForTransactionReceipt(tx_hash) for tx_hash in tx_hashes]
+
+
+def advance_time(w3: Web3, seconds: int) -> int:
+    """
+    Move the timestamp of the next block forward by seconds, and return it.
+    """
+    timestamp = w3.eth.getBlock("pending")["timestamp"] + seconds
+    w3.testing.timeTravel(timestamp)
+    return timestamp
+
+
+def mine_blocks(w3: Web3, num_blocks: int, block_time: int = None) -> None:
+    """
+    Mine num_blocks blocks, which are block_time seconds apart if provided.
+    """
+    if block_time is None:
+        w3.testing.mine(num_blocks)
+        return
+    for _ in range(num_blocks):
+        timestamp = w3.eth.getBlock("latest")["timestamp"] + block_time
+        # The next block can't be older than the time its pending block was started
+        w3.testing.timeTravel(max(timestamp, w3.eth.getBlock("pending")["timestamp"]))
+        w3.testing.mine()
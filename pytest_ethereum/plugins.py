@@ -1,30 +1,702 @@
-import json
 from pathlib import Path
-from typing import Callable
+import shutil
+import tempfile
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, Iterator, Optional
 
-from ethpm import Package
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.fixtures import FixtureRequest
+from _pytest.main import Session
+from _pytest.nodes import Item
+from _pytest.reports import TestReport
+from _pytest.runner import CallInfo
+from _pytest.terminal import TerminalReporter
 import pytest
-from web3 import Web3
 
-from pytest_ethereum.deployer import Deployer
+from pytest_ethereum.gas_snapshot import (
+    GAS_SNAPSHOT_ACTIONS,
+    GasRegressionWarning,
+    GasSnapshot,
+)
+
+# This module is loaded by every pytest run in an environment with pytest-ethereum
+# installed, so web3, ethpm & py-evm are only imported once they are actually needed
+# (i.e. by a fixture, or an enabled gas report).
+if TYPE_CHECKING:
+    from web3 import Web3  # noqa: F401
+    from web3.contract import Contract  # noqa: F401
+    from pytest_ethereum._utils.contract_fixtures import ContractFixture  # noqa: F401
+    from pytest_ethereum.deployer import AsyncDeployer, Deployer  # noqa: F401
+    from pytest_ethereum.deployment_cache import DeploymentCache  # noqa: F401
+    from pytest_ethereum.mining import BlockBatch  # noqa: F401
+    from pytest_ethereum.testing import EventCapture  # noqa: F401
+
+CHAIN_SCOPES = ("session", "package", "module", "class", "function")
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("ethereum")
+    group.addoption(
+        "--eth-gas-report",
+        action="store_true",
+        default=False,
+        help="Report the gas used, time and number of calls of linker operations and "
+        "contract transactions.",
+    )
+    group.addoption(
+        "--eth-gas-report-json",
+        metavar="PATH",
+        default=None,
+        help="Write the gas report as json to PATH (implies --eth-gas-report).",
+    )
+    group.addoption(
+        "--eth-gas-snapshot",
+        action="store_true",
+        default=False,
+        help="Check the gas used by every test using `w3` against the gas snapshot file.",
+    )
+    group.addoption(
+        "--eth-gas-snapshot-update",
+        action="store_true",
+        default=False,
+        help="Write the gas used by every test using `w3` to the gas snapshot file.",
+    )
+    group.addoption(
+        "--eth-deployment-cache",
+        action="store_true",
+        default=False,
+        help="Cache deployments on disk, and restore them in later test sessions.",
+    )
+    group.addoption(
+        "--eth-validate-manifests",
+        action="store_true",
+        default=False,
+        help="Validate every package created by the linker against the full ethPM "
+        "schema, rather than only the parts of its manifest that the linker changed.",
+    )
+    group.addoption(
+        "--eth-backend",
+        metavar="BACKEND",
+        default=None,
+        help="Backend of the chain used by `w3` (overrides ethereum_backend).",
+    )
+    group.addoption(
+        "--eth-num-accounts",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Number of pre-funded accounts (overrides ethereum_num_accounts).",
+    )
+    group.addoption(
+        "--eth-genesis-gas-limit",
+        metavar="GAS",
+        type=int,
+        default=None,
+        help="Gas limit of the genesis block (overrides ethereum_genesis_gas_limit).",
+    )
+    group.addoption(
+        "--eth-node-pool-size",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Maximum number of connections to a node backend (overrides "
+        "ethereum_node_pool_size).",
+    )
+    parser.addini(
+        "ethereum_backend",
+        "Backend of the chain used by `w3`: pyevm, mock (mines transactions without "
+        "executing them), or the uri of a node (http://, https:// or ipc://<path>), "
+        "which must support evm_snapshot & evm_revert.",
+        default="pyevm",
+    )
+    parser.addini(
+        "ethereum_num_accounts",
+        "Number of pre-funded accounts of the pyevm & mock backends.",
+        default="",
+    )
+    parser.addini(
+        "ethereum_genesis_gas_limit",
+        "Gas limit of the genesis block of the pyevm & mock backends.",
+        default="",
+    )
+    parser.addini(
+        "ethereum_node_pool_size",
+        "Maximum number of connections to a node backend, which are kept alive and "
+        "shared by every test's `w3` (default: 16).",
+        default="",
+    )
+    parser.addini(
+        "ethereum_cache_deployments",
+        "Restore a deployment identical to one already made from the same chain head "
+        "(i.e. by an earlier test) from its chain snapshot, rather than executing its "
+        "transactions again. Always enabled by --eth-deployment-cache and "
+        "ethereum_shared_deployments.",
+        type="bool",
+        default=False,
+    )
+    parser.addini(
+        "ethereum_deployment_cache_dir",
+        "Directory of the on-disk deployment cache, relative to the rootdir.",
+        default=".pytest_ethereum_cache",
+    )
+    parser.addini(
+        "ethereum_deployment_cache_size",
+        "Maximum size of the on-disk deployment cache in megabytes, beyond which the "
+        "least recently used deployments are evicted.",
+        default="100",
+    )
+    parser.addini(
+        "ethereum_gas_snapshot",
+        "Path of the gas snapshot file, relative to the rootdir.",
+        default="gas-snapshot.json",
+    )
+    parser.addini(
+        "ethereum_gas_snapshot_tolerance",
+        "Percentage by which a test's gas may exceed its gas snapshot.",
+        default="0",
+    )
+    parser.addini(
+        "ethereum_gas_snapshot_action",
+        "Whether to fail or warn when a test's gas exceeds its gas snapshot, one of: "
+        f"{', '.join(GAS_SNAPSHOT_ACTIONS)}.",
+        default="fail",
+    )
+    parser.addini(
+        "ethereum_shared_deployments",
+        "Deployments made once by the pytest-xdist controller, and restored from the "
+        "deployment cache by every worker, one per line: "
+        "<manifest path> <contract type> [<constructor arg> ...].",
+        type="linelist",
+        default=[],
+    )
+    parser.addini(
+        "ethereum_chain_scope",
+        "Scope of the chain backing the `w3` fixture, one of: "
+        f"{', '.join(CHAIN_SCOPES)}. Chain state is reverted after every test.",
+        default="session",
+    )
+    parser.addini(
+        "ethereum_contract_fixtures",
+        "Fixtures which return a deployed contract instance, one per line: "
+        "<manifest path> <contract type> [name=<fixture name>] [scope=<scope>] "
+        "[strategy=<module>:<name>] [<constructor arg> ...].",
+        type="linelist",
+        default=[],
+    )
+
+
+def pytest_configure(config: Config) -> None:
+    scope = config.getini("ethereum_chain_scope")
+    if scope not in CHAIN_SCOPES:
+        raise pytest.UsageError(
+            f"Invalid ethereum_chain_scope: {scope}. Must be one of: "
+            f"{', '.join(CHAIN_SCOPES)}."
+        )
+    if config.getoption("eth_gas_report") or config.getoption("eth_gas_report_json"):
+        from pytest_ethereum.gas_report import GasReport, set_gas_report
+
+        config._eth_gas_report = GasReport()
+        set_gas_report(config._eth_gas_report)
+    if config.getoption("eth_gas_snapshot") or config.getoption(
+        "eth_gas_snapshot_update"
+    ):
+        config._eth_gas_snapshot = _create_gas_snapshot(config)
+    if config.getoption("eth_deployment_cache"):
+        from pytest_ethereum.deployment_cache import set_deployment_cache
+
+        config._eth_deployment_cache = _create_deployment_cache(config)
+        set_deployment_cache(config._eth_deployment_cache)
+    if config.getoption("eth_validate_manifests"):
+        from pytest_ethereum.linker import set_full_validation
+
+        set_full_validation(True)
+    config._eth_cache_deployments = any(
+        (
+            config.getini("ethereum_cache_deployments"),
+            config.getoption("eth_deployment_cache"),
+            config.getini("ethereum_shared_deployments"),
+        )
+    )
+    config._eth_backend = _get_backend(config)
+    config._eth_w3_options = {
+        "num_accounts": _get_int_option(config, "num_accounts"),
+        "genesis_gas_limit": _get_int_option(config, "genesis_gas_limit"),
+    }
+    config._eth_node_pool_size = _get_int_option(config, "node_pool_size")
+    config._eth_node_providers = {}
+    if getattr(config, "_eth_deployment_cache", None) is not None:
+        # Deployments made from genesis can only be restored from the on-disk cache
+        # by a chain with the same genesis block
+        from pytest_ethereum.backends import DETERMINISTIC_GENESIS_TIMESTAMP
+
+        config._eth_w3_options["genesis_timestamp"] = DETERMINISTIC_GENESIS_TIMESTAMP
+    if config.getini("ethereum_contract_fixtures"):
+        config.pluginmanager.register(
+            _create_contract_fixtures(config), "ethereum_contract_fixtures"
+        )
+
+
+def _create_gas_snapshot(config: Config) -> GasSnapshot:
+    action = config.getini("ethereum_gas_snapshot_action")
+    if action not in GAS_SNAPSHOT_ACTIONS:
+        raise pytest.UsageError(
+            f"Invalid ethereum_gas_snapshot_action: {action}. Must be one of: "
+            f"{', '.join(GAS_SNAPSHOT_ACTIONS)}."
+        )
+    try:
+        tolerance = float(config.getini("ethereum_gas_snapshot_tolerance"))
+    except ValueError:
+        raise pytest.UsageError(
+            "Invalid ethereum_gas_snapshot_tolerance: "
+            f"{config.getini('ethereum_gas_snapshot_tolerance')}. Must be a number."
+        )
+    path = Path(config.rootdir) / config.getini("ethereum_gas_snapshot")
+    return GasSnapshot(path, tolerance)
+
+
+def _get_backend(config: Config) -> str:
+    backend = config.getoption("eth_backend") or config.getini("ethereum_backend")
+    # The default backend is valid, and doesn't need to import web3 to validate
+    if backend != "pyevm":
+        from pytest_ethereum.backends import validate_backend
+        from pytest_ethereum.exceptions import PytestEthereumError
+
+        try:
+            validate_backend(backend)
+        except PytestEthereumError as exc:
+            raise pytest.UsageError(str(exc))
+    return backend
+
+
+def _get_int_option(config: Config, name: str) -> Optional[int]:
+    value = config.getoption(f"eth_{name}")
+    if value is not None:
+        return value
+    if not config.getini(f"ethereum_{name}"):
+        return None
+    try:
+        return int(config.getini(f"ethereum_{name}"))
+    except ValueError:
+        raise pytest.UsageError(
+            f"Invalid ethereum_{name}: {config.getini(f'ethereum_{name}')}. "
+            "Must be an integer."
+        )
+
+
+class _ContractFixtures:
+    """
+    Plugin with a fixture for every line of ethereum_contract_fixtures.
+    """
+
+    pass
+
+
+def _create_contract_fixtures(config: Config) -> _ContractFixtures:
+    from pytest_ethereum._utils.contract_fixtures import parse_contract_fixtures
+    from pytest_ethereum.exceptions import PytestEthereumError
+
+    try:
+        contract_fixtures = parse_contract_fixtures(
+            config.getini("ethereum_contract_fixtures"), Path(config.rootdir)
+        )
+    except PytestEthereumError as exc:
+        raise pytest.UsageError(str(exc))
+    chain_scope = config.getini("ethereum_chain_scope")
+    for contract_fixture in contract_fixtures:
+        if contract_fixture.scope not in CHAIN_SCOPES:
+            raise pytest.UsageError(
+                f"Invalid scope: {contract_fixture.scope} of the "
+                f"{contract_fixture.name} fixture. Must be one of: "
+                f"{', '.join(CHAIN_SCOPES)}."
+            )
+        # A deployment can't outlive the chain it was made on
+        if CHAIN_SCOPES.index(contract_fixture.scope) < CHAIN_SCOPES.index(chain_scope):
+            raise pytest.UsageError(
+                f"Invalid scope: {contract_fixture.scope} of the "
+                f"{contract_fixture.name} fixture, which is wider than the "
+                f"ethereum_chain_scope: {chain_scope}."
+            )
+    plugin = _ContractFixtures()
+    for contract_fixture in contract_fixtures:
+        setattr(
+            plugin, contract_fixture.name, _create_contract_fixture(contract_fixture)
+        )
+    return plugin
+
+
+def _create_deployment_cache(config: Config) -> "DeploymentCache":
+    from pytest_ethereum.deployment_cache import DeploymentCache  # noqa: F811
+
+    try:
+        max_size = float(config.getini("ethereum_deployment_cache_size")) * 10 ** 6
+    except ValueError:
+        raise pytest.UsageError(
+            "Invalid ethereum_deployment_cache_size: "
+            f"{config.getini('ethereum_deployment_cache_size')}. Must be a number."
+        )
+    path = Path(config.rootdir) / config.getini("ethereum_deployment_cache_dir")
+    return DeploymentCache(path, int(max_size))
+
+
+def pytest_unconfigure(config: Config) -> None:
+    if getattr(config, "_eth_gas_report", None) is not None:
+        from pytest_ethereum.gas_report import set_gas_report
+
+        set_gas_report(None)
+    if getattr(config, "_eth_deployment_cache", None) is not None:
+        from pytest_ethereum.deployment_cache import set_deployment_cache
+
+        set_deployment_cache(None)
+    if config.getoption("eth_validate_manifests"):
+        from pytest_ethereum.linker import set_full_validation
+
+        set_full_validation(False)
+    if getattr(config, "_eth_shared_chain", None) is not None:
+        shutil.rmtree(Path(config._eth_shared_chain["state_path"]).parent)
+    for provider in getattr(config, "_eth_node_providers", {}).values():
+        provider.close()
+    config._eth_node_providers = {}
+
+
+def pytest_sessionstart(session: Session) -> None:
+    """
+    Before pytest-xdist starts its workers, make every shared deployment once on the
+    controller, so that workers load the resulting chain state instead.
+    """
+    config = session.config
+    lines = config.getini("ethereum_shared_deployments")
+    is_controller = not hasattr(config, "workerinput")
+    if not lines or not is_controller or getattr(config.option, "dist", "no") == "no":
+        return
+    from pytest_ethereum._utils.shared_chain import (
+        parse_shared_deployments,
+        prewarm_chain_state,
+    )
+
+    deployments = parse_shared_deployments(lines, Path(config.rootdir))
+    state_path = Path(tempfile.mkdtemp(prefix="pytest-ethereum-")) / "chain.rlp"
+    # Chain state can only be shared between pyevm chains
+    w3 = _create_w3(config, "pyevm")
+    prewarmed = prewarm_chain_state(w3, deployments, state_path)
+    config._eth_shared_chain = {"state_path": str(state_path), "deployments": prewarmed}
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node: Any) -> None:
+    shared_chain = getattr(node.config, "_eth_shared_chain", None)
+    if shared_chain is not None:
+        node.workerinput["eth_shared_chain"] = shared_chain
+
+
+def pytest_sessionfinish(session: Session) -> None:
+    config = session.config
+    gas_report = getattr(config, "_eth_gas_report", None)
+    gas_snapshot = getattr(config, "_eth_gas_snapshot", None)
+    # Send the results of a pytest-xdist worker to the controller
+    if hasattr(config, "workeroutput"):
+        if gas_report is not None:
+            config.workeroutput["eth_gas_report"] = gas_report.to_json_data()
+        if gas_snapshot is not None:
+            config.workeroutput["eth_gas_snapshot"] = gas_snapshot.recorded
+        return
+    json_path = config.getoption("eth_gas_report_json")
+    if gas_report is not None and json_path:
+        gas_report.write_json(Path(json_path))
+    if gas_snapshot is not None and config.getoption("eth_gas_snapshot_update"):
+        gas_snapshot.write()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node: Any, error: Any) -> None:
+    gas_report = getattr(node.config, "_eth_gas_report", None)
+    gas_snapshot = getattr(node.config, "_eth_gas_snapshot", None)
+    worker_output = getattr(node, "workeroutput", {})
+    if gas_report is not None and "eth_gas_report" in worker_output:
+        gas_report.merge(worker_output["eth_gas_report"])
+    if gas_snapshot is not None and "eth_gas_snapshot" in worker_output:
+        gas_snapshot.recorded.update(worker_output["eth_gas_snapshot"])
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter) -> None:
+    gas_report = getattr(terminalreporter.config, "_eth_gas_report", None)
+    if gas_report is None or hasattr(terminalreporter.config, "workeroutput"):
+        return
+    terminalreporter.write_sep("=", "ethereum gas report")
+    for line in gas_report.summary_lines():
+        terminalreporter.write_line(line)
+
+
+def _chain_scope(fixture_name: str, config: Config) -> str:
+    return config.getini("ethereum_chain_scope")
+
+
+def _create_w3(config: Config, backend: str) -> "Web3":
+    """
+    Returns a `Web3` instance connected to a fresh chain on backend, configured with
+    the ethereum options. With the on-disk deployment cache enabled, the chain has
+    the same genesis block in every session, so that deployments made from genesis
+    can be restored from the cache. A node is connected to with a single pooled
+    provider per session, which is shared by every `Web3` instance of the node.
+    """
+    from pytest_ethereum.backends import (
+        create_node_provider,
+        create_w3,
+        is_node_backend,
+    )
+    from pytest_ethereum.providers import DEFAULT_POOL_SIZE
+
+    if not is_node_backend(backend):
+        return create_w3(backend, **config._eth_w3_options)
+    from web3 import Web3  # noqa: F811
+
+    if backend not in config._eth_node_providers:
+        config._eth_node_providers[backend] = create_node_provider(
+            backend, config._eth_node_pool_size or DEFAULT_POOL_SIZE
+        )
+    return Web3(config._eth_node_providers[backend])
 
 
 @pytest.fixture
-def w3() -> Web3:
-    w3 = Web3(Web3.EthereumTesterProvider())
+def ethereum_backend(request: FixtureRequest) -> str:
+    """
+    Returns the backend of the chain used by `w3`, which is the configured
+    `ethereum_backend` unless this fixture is overridden (e.g. in a conftest.py,
+    to use another backend for the tests of a directory).
+    """
+    return request.config._eth_backend
+
+
+@pytest.fixture(scope=_chain_scope)
+def _chain_w3s(request: FixtureRequest) -> Iterator[Dict[str, "Web3"]]:
+    """
+    Returns the `Web3` instances connected to the chain of each backend, which are
+    created by `w3` as needed and shared by every test within the configured
+    `ethereum_chain_scope`.
+    """
+    from pytest_ethereum._utils.linker import clear_chain_cache
+
+    chain_w3s = {}  # type: Dict[str, Web3]
+    yield chain_w3s
+    # A node backend's provider (and so its chain cache) outlives the chain scope
+    for chain_w3 in chain_w3s.values():
+        clear_chain_cache(chain_w3)
+
+
+def _revert_chain(chain_w3: "Web3", snapshot_id: int) -> None:
+    """
+    Reverts the chain to the snapshot with snapshot_id, and clears its chain cache,
+    since blocks mined since the snapshot may have been cached as matching the chain.
+    """
+    from pytest_ethereum._utils.linker import clear_chain_cache
+
+    chain_w3.testing.revert(snapshot_id)
+    clear_chain_cache(chain_w3)
+
+
+def _get_chain_w3(chain_w3s: Dict[str, "Web3"], backend: str, config: Config) -> "Web3":
+    """
+    Returns the `Web3` instance connected to the chain of backend, creating it if
+    needed. On a pytest-xdist worker, a new pyevm chain starts from the state
+    prewarmed by the controller.
+    """
+    if backend in chain_w3s:
+        return chain_w3s[backend]
+    from pytest_ethereum.gas_report import gas_report_middleware
+
+    w3 = _create_w3(config, backend)
+    shared_chain = getattr(config, "workerinput", {}).get("eth_shared_chain")
+    if shared_chain is not None and backend == "pyevm":
+        from pytest_ethereum._utils.shared_chain import restore_chain_state
+
+        restore_chain_state(
+            w3, Path(shared_chain["state_path"]), shared_chain["deployments"]
+        )
+    w3.middleware_onion.add(gas_report_middleware, "gas_report")
+    chain_w3s[backend] = w3
+    return w3
+
+
+def _create_test_w3(chain_w3: "Web3") -> "Web3":
+    """
+    Returns a new `Web3` instance sharing the provider (and so the chain) of chain_w3.
+    """
+    from web3 import Web3  # noqa: F811
+    from pytest_ethereum.gas_report import gas_report_middleware
+
+    w3 = Web3(chain_w3.provider)
+    w3.middleware_onion.add(gas_report_middleware, "gas_report")
     return w3
 
 
 @pytest.fixture
-def deployer(w3: Web3) -> Callable[[Path], Deployer]:
+def w3(
+    _chain_w3s: Dict[str, "Web3"], ethereum_backend: str, request: FixtureRequest
+) -> Iterator["Web3"]:
+    """
+    Returns a new `Web3` instance connected to the shared chain of the
+    `ethereum_backend` (so that changes to the instance itself, i.e. its default
+    account or middlewares, don't leak into other tests), and reverts the chain to the
+    snapshot taken before the test once the test has finished.
+    """
+    chain_w3 = _get_chain_w3(_chain_w3s, ethereum_backend, request.config)
+    snapshot_id = chain_w3.testing.snapshot()
+    if getattr(request.config, "_eth_gas_snapshot", None) is not None:
+        # Checked against the gas snapshot once the test has been called (see
+        # pytest_runtest_makereport), before the chain is reverted
+        request.node._eth_gas_start = (chain_w3, chain_w3.eth.blockNumber)
+    yield _create_test_w3(chain_w3)
+    _revert_chain(chain_w3, snapshot_id)
+    gas_report = getattr(request.config, "_eth_gas_report", None)
+    if gas_report is not None:
+        # Deployments still pending were discarded by the revert
+        gas_report.clear_pending_deployments()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: Item, call: CallInfo) -> Generator[None, Any, None]:
+    outcome = yield
+    gas_start = getattr(item, "_eth_gas_start", None)
+    if call.when == "call" and gas_start is not None:
+        chain_w3, start_block = gas_start
+        _check_gas_snapshot(item, outcome.get_result(), chain_w3, start_block)
+
+
+def _check_gas_snapshot(
+    item: Item, report: TestReport, chain_w3: "Web3", start_block: int
+) -> None:
+    """
+    Records the gas used by the test, and fails its report (or warns) if the gas
+    exceeds its gas snapshot, so that a regression is reported as a failed test.
+    """
+    from pytest_ethereum.gas_report import get_gas_used_since
+
+    gas_snapshot = item.config._eth_gas_snapshot
+    # Cached deployments restore the blocks they were mined in, so their gas is
+    # included as well
+    gas_used = get_gas_used_since(chain_w3, start_block)
+    gas_snapshot.record(item.nodeid, gas_used)
+    if not item.config.getoption("eth_gas_snapshot") or not report.passed:
+        return
+    regression = gas_snapshot.check(item.nodeid, gas_used)
+    if regression is None:
+        return
+    if item.config.getini("ethereum_gas_snapshot_action") == "warn":
+        item.warn(GasRegressionWarning(regression))
+    else:
+        report.outcome = "failed"
+        report.longrepr = regression
+
+
+@pytest.fixture
+def deployer(w3: "Web3", request: FixtureRequest) -> Callable[[Path], "Deployer"]:
     """
     Returns a `Deployer` instance composed from a `Package` instance
     generated from the manifest located at the provided `path` folder.
     """
+    from pytest_ethereum._utils.package import create_trusted_package, load_manifest
+    from pytest_ethereum.deployer import Deployer  # noqa: F811
 
     def _deployer(path: Path) -> Deployer:
-        manifest = json.loads(path.read_text())
-        package = Package(manifest, w3)
-        return Deployer(package)
+        manifest = load_manifest(path)
+        package = create_trusted_package(manifest, w3)
+        return Deployer(
+            package, cache_deployments=request.config._eth_cache_deployments
+        )
 
     return _deployer
+
+
+def _create_contract_fixture(contract_fixture: "ContractFixture") -> Any:
+    """
+    Returns a fixture which deploys the contract fixture. A function scoped fixture
+    is reverted along with the rest of the test by `w3`, while a wider scoped fixture
+    deploys on the chain of the configured `ethereum_backend` (regardless of any
+    override of the `ethereum_backend` fixture) and reverts the chain to the snapshot
+    taken before its deployment once its scope has finished. Tests within its scope
+    still start from the chain with its deployment, since `w3` only reverts to the
+    snapshot it takes before each test.
+    """
+    if contract_fixture.scope == "function":
+
+        @pytest.fixture(name=contract_fixture.name)
+        def _function_fixture(w3: "Web3", request: FixtureRequest) -> "Contract":
+            return _deploy_contract_fixture(w3, contract_fixture, request.config)
+
+        return _function_fixture
+
+    @pytest.fixture(name=contract_fixture.name, scope=contract_fixture.scope)
+    def _fixture(
+        _chain_w3s: Dict[str, "Web3"], request: FixtureRequest
+    ) -> Iterator["Contract"]:
+        config = request.config
+        chain_w3 = _get_chain_w3(_chain_w3s, config._eth_backend, config)
+        snapshot_id = chain_w3.testing.snapshot()
+        yield _deploy_contract_fixture(chain_w3, contract_fixture, config)
+        _revert_chain(chain_w3, snapshot_id)
+
+    return _fixture
+
+
+def _deploy_contract_fixture(
+    w3: "Web3", contract_fixture: "ContractFixture", config: Config
+) -> "Contract":
+    from pytest_ethereum._utils.package import create_trusted_package, load_manifest
+    from pytest_ethereum.deployer import Deployer  # noqa: F811
+
+    manifest = load_manifest(contract_fixture.manifest_path)
+    deployer = Deployer(
+        create_trusted_package(manifest, w3),
+        cache_deployments=config._eth_cache_deployments,
+    )
+    if contract_fixture.strategy is not None:
+        deployer.register_strategy(
+            contract_fixture.contract_type, contract_fixture.load_strategy()
+        )
+    package = deployer.deploy(contract_fixture.contract_type, *contract_fixture.args)
+    return package.deployments.get_instance(contract_fixture.contract_type)
+
+
+@pytest.fixture
+def async_deployer(
+    w3: "Web3", request: FixtureRequest
+) -> Callable[[Path], "AsyncDeployer"]:
+    """
+    Returns an `AsyncDeployer` instance composed from a `Package` instance
+    generated from the manifest located at the provided `path` folder.
+    """
+    from pytest_ethereum._utils.package import create_trusted_package, load_manifest
+    from pytest_ethereum.deployer import AsyncDeployer  # noqa: F811
+
+    def _async_deployer(path: Path) -> AsyncDeployer:
+        manifest = load_manifest(path)
+        package = create_trusted_package(manifest, w3)
+        return AsyncDeployer(
+            package, cache_deployments=request.config._eth_cache_deployments
+        )
+
+    return _async_deployer
+
+
+@pytest.fixture
+def block_batch(w3: "Web3") -> Callable[[], "BlockBatch"]:
+    """
+    Returns a function that creates a `BlockBatch` context manager on `w3`, which
+    mines every transaction sent within it in a single block.
+    """
+    from pytest_ethereum.mining import BlockBatch  # noqa: F811
+
+    def _block_batch() -> BlockBatch:
+        return BlockBatch(w3)
+
+    return _block_batch
+
+
+@pytest.fixture
+def event_capture(w3: "Web3") -> "EventCapture":
+    """
+    Returns an `EventCapture` instance, which captures every log emitted on the `w3`
+    chain during the test.
+    """
+    from pytest_ethereum.testing import EventCapture  # noqa: F811
+
+    return EventCapture(w3, from_block=w3.eth.blockNumber + 1)
@@ -0,0 +1,251 @@
+from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+import json
+import queue
+import socket
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple  # noqa: F401
+
+from eth_utils import to_bytes
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import HTTPProvider, IPCProvider, Web3
+from web3._utils.encoding import FriendlyJsonSerde
+from web3._utils.threads import Timeout
+from web3.providers.base import JSONBaseProvider
+from web3.providers.ipc import PersistantSocket, has_valid_json_rpc_ending
+
+from pytest_ethereum.exceptions import PytestEthereumError
+
+DEFAULT_POOL_SIZE = 16
+
+Request = Tuple[str, Any]
+RPCResponse = Dict[str, Any]
+
+
+class _RequestRecorded(Exception):
+    pass
+
+
+class BatchingProvider(JSONBaseProvider, metaclass=ABCMeta):
+    """
+    Base class of the node providers, which can send several requests in a single
+    JSON-RPC batch request. Subclasses implement ``send``, which sends raw request data
+    to the node and returns the raw response, and ``close``.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._prefetched = {}  # type: Dict[str, RPCResponse]
+        self._prefetched_lock = threading.Lock()
+        self._recording = threading.local()
+
+    @abstractmethod
+    def send(self, request_data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Close every pooled connection to the node.
+        """
+        pass
+
+    def make_request(self, method: str, params: Any) -> RPCResponse:
+        if getattr(self._recording, "requests", None) is not None:
+            self._recording.requests.append((method, params))
+            raise _RequestRecorded
+        with self._prefetched_lock:
+            response = self._prefetched.get(_get_request_key(method, params))
+        if response is not None:
+            return response
+        return self.decode_rpc_response(
+            self.send(self.encode_rpc_request(method, params))
+        )
+
+    def make_batch_request(self, requests: List[Request]) -> List[RPCResponse]:
+        """
+        Send requests in a single JSON-RPC batch request, and return their responses
+        in the same order.
+        """
+        rpc_requests = [
+            {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or [],
+                "id": next(self.request_counter),
+            }
+            for method, params in requests
+        ]
+        request_data = to_bytes(text=FriendlyJsonSerde().json_encode(rpc_requests))
+        responses = self.decode_rpc_response(self.send(request_data))
+        if not isinstance(responses, list):
+            raise PytestEthereumError(
+                f"Node at {self} doesn't support JSON-RPC batch requests: {responses}"
+            )
+        responses_by_id = {response["id"]: response for response in responses}
+        return [responses_by_id[rpc_request["id"]] for rpc_request in rpc_requests]
+
+    def record_requests(self, call: Callable[[], Any]) -> List[Request]:
+        """
+        Return the requests that call makes up to its first request, which is not sent.
+        """
+        self._recording.requests = []
+        try:
+            call()
+        except _RequestRecorded:
+            pass
+        finally:
+            recorded_requests = self._recording.requests
+            self._recording.requests = None
+        return recorded_requests
+
+    @contextmanager
+    def prefetch(self, requests: List[Request]) -> Iterator[None]:
+        """
+        Send requests in a single batch request, and answer any identical request made
+        within this context with its prefetched response. Errors and null results
+        (i.e. the receipt of a pending transaction) aren't prefetched, so that they
+        are requested again.
+        """
+        keys = [_get_request_key(method, params) for method, params in requests]
+        responses = self.make_batch_request(requests)
+        with self._prefetched_lock:
+            self._prefetched.update(
+                (key, response)
+                for key, response in zip(keys, responses)
+                if response.get("result") is not None
+            )
+        try:
+            yield
+        finally:
+            with self._prefetched_lock:
+                for key in keys:
+                    self._prefetched.pop(key, None)
+
+
+def _get_request_key(method: str, params: Any) -> str:
+    return FriendlyJsonSerde().json_encode([method, params or []])
+
+
+class PooledHTTPProvider(BatchingProvider, HTTPProvider):
+    """
+    An ``HTTPProvider`` with its own pool of up to pool_size keep-alive connections
+    (i.e. one per thread sending concurrent requests), rather than the session that
+    web3 shares between every provider of the same endpoint.
+    """
+
+    def __init__(
+        self,
+        endpoint_uri: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        request_kwargs: Dict[str, Any] = None,
+    ) -> None:
+        super().__init__(endpoint_uri, request_kwargs)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(self, request_data: bytes) -> bytes:
+        request_kwargs = self.get_request_kwargs()
+        request_kwargs.setdefault("timeout", 10)
+        response = self.session.post(
+            self.endpoint_uri, data=request_data, **request_kwargs
+        )
+        response.raise_for_status()
+        return response.content
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class PooledIPCProvider(BatchingProvider, IPCProvider):
+    """
+    An ``IPCProvider`` with a pool of up to pool_size persistent sockets, so that
+    concurrent requests (i.e. from several threads) aren't sent one at a time over a
+    single socket.
+    """
+
+    def __init__(
+        self, ipc_path: str, pool_size: int = DEFAULT_POOL_SIZE, timeout: int = 10
+    ) -> None:
+        super().__init__(ipc_path, timeout)
+        self.pool_size = pool_size
+        self._sockets = queue.LifoQueue()  # type: queue.LifoQueue[PersistantSocket]
+        self._num_sockets = 0
+
+    def send(self, request_data: bytes) -> bytes:
+        persistent_socket = self._acquire_socket()
+        try:
+            with persistent_socket as sock:
+                try:
+                    sock.sendall(request_data)
+                except BrokenPipeError:
+                    # One extra attempt on a new socket, like IPCProvider
+                    sock = persistent_socket.reset()
+                    sock.sendall(request_data)
+                return self._receive(sock)
+        finally:
+            self._sockets.put(persistent_socket)
+
+    def close(self) -> None:
+        with self._lock:
+            while True:
+                try:
+                    persistent_socket = self._sockets.get_nowait()
+                except queue.Empty:
+                    break
+                if persistent_socket.sock is not None:
+                    persistent_socket.sock.close()
+                    persistent_socket.sock = None
+                self._num_sockets -= 1
+
+    def _acquire_socket(self) -> PersistantSocket:
+        try:
+            return self._sockets.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._num_sockets < self.pool_size:
+                self._num_sockets += 1
+                return PersistantSocket(self.ipc_path)
+        return self._sockets.get()
+
+    def _receive(self, sock: socket.socket) -> bytes:
+        raw_response = b""
+        with Timeout(self.timeout) as timeout:
+            while True:
+                try:
+                    raw_response += sock.recv(4096)
+                except socket.timeout:
+                    timeout.sleep(0)
+                    continue
+                if raw_response and has_valid_json_rpc_ending(raw_response):
+                    try:
+                        json.loads(raw_response.decode())
+                    except ValueError:
+                        pass
+                    else:
+                        return raw_response
+                timeout.sleep(0)
+
+
+@contextmanager
+def prefetch(w3: Web3, *calls: Callable[[], Any]) -> Iterator[None]:
+    """
+    Within this context, the first request made by each call (i.e. a receipt or block
+    lookup) is answered from a single JSON-RPC batch request, rather than one request
+    per call. Requests are recorded by running each call up to its request, so that
+    the calls are then made as usual (with their results formatted by the middlewares
+    of w3). Has no effect unless w3 is connected to a node with a ``BatchingProvider``.
+    """
+    provider = w3.provider
+    if not isinstance(provider, BatchingProvider) or len(calls) < 2:
+        yield
+        return
+    requests = [request for call in calls for request in provider.record_requests(call)]
+    with provider.prefetch(requests):
+        yield
@@ -1,12 +1,40 @@
-from typing import Any, Dict
+from collections import OrderedDict, defaultdict
+import heapq
+from typing import (  # noqa: F401
+    Any,
+    DefaultDict,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from eth_tester.exceptions import TransactionFailed
 import pytest
+from web3 import Web3
 from web3.contract import ContractEvent
 
-from pytest_ethereum._utils.abi import merge_args_and_kwargs
+from pytest_ethereum._utils.abi import (
+    EventIndex,
+    get_event_index,
+    merge_args_and_kwargs,
+)
 
 TxReceipt = Dict[str, Any]
+LogEntry = Dict[str, Any]
+DecodedEvent = Tuple[int, Dict[str, Any]]
+
+DECODED_RECEIPTS_CACHE_SIZE = 1024
+
+# Decoded events, keyed by receipt (i.e. block & tx hash) and event ABI, so that
+# every receipt is only decoded once per event type, regardless of how many ``Log``
+# instances test it.
+_decoded_receipts = (
+    OrderedDict()
+)  # type: OrderedDict[Hashable, Tuple[DecodedEvent, ...]]
 
 
 class Log:
@@ -20,6 +48,8 @@ class Log:
         self.event = contract_event()
         self.args = merge_args_and_kwargs(self.event.abi, args, kwargs=kwargs)
         self.kwargs = kwargs
+        self.event_index = get_event_index(self.event.abi)
+        self.topic = self.event_index.topic
 
     def is_present(self, receipt: TxReceipt) -> bool:
         """
@@ -36,11 +66,7 @@ class Log:
            assert Log(ping.events.Ping, b"one", b"missing").is_present(receipt) is False
 
         """
-        logs = self._process_receipt(receipt)
-        missing_args = [arg for arg in self.args if arg not in logs.values()]
-        if missing_args:
-            return False
-        return True
+        return any(self._is_match(logs) for _, logs in self._process_receipt(receipt))
 
     def not_present(self, receipt: TxReceipt) -> bool:
         """
@@ -55,10 +81,10 @@ class Log:
            assert Log(ping.events.Ping, first=b"one").not_present(receipt) is False
            assert Log(ping.events.Ping, b"one", b"missing").not_present(receipt) is False
         """
-        logs = self._process_receipt(receipt)
-        matching_args = [arg for arg in self.args if arg in logs.values()]
-        if matching_args:
-            return False
+        for _, logs in self._process_receipt(receipt):
+            log_values = list(logs.values())
+            if any(arg in log_values for arg in self.args):
+                return False
         return True
 
     def exact_match(self, receipt: TxReceipt) -> bool:
@@ -77,14 +103,221 @@ class Log:
                 "Log().exact_match() requires keyword arguments to test an exact match."
             )
 
-        logs = self._process_receipt(receipt)
-        if self.kwargs != logs:
+        return any(self.kwargs == logs for _, logs in self._process_receipt(receipt))
+
+    def count(self, receipt: TxReceipt) -> int:
+        """
+        Returns the number of emitted logs that contain *every* member of ``args`` /
+        ``kwargs``.
+
+        .. code:: python
+
+           assert Log(ping.events.Ping, b"one").count(receipt) == 1
+        """
+        return len(self.log_indices(receipt))
+
+    def log_indices(self, receipt: TxReceipt) -> Tuple[int, ...]:
+        """
+        Returns the ``logIndex`` of every emitted log that contains *every* member
+        of ``args`` / ``kwargs``, in the order they were emitted.
+        """
+        return tuple(
+            log_index
+            for log_index, logs in self._process_receipt(receipt)
+            if self._is_match(logs)
+        )
+
+    def _is_match(self, logs: Dict[str, Any]) -> bool:
+        log_values = list(logs.values())
+        return all(arg in log_values for arg in self.args)
+
+    def _process_receipt(self, receipt: TxReceipt) -> Tuple[DecodedEvent, ...]:
+        """
+        Returns the ``logIndex`` and args of every log of this event type in the receipt.
+        Receipts without a block & transaction hash (i.e. built by hand) aren't cached.
+        """
+        block_hash = receipt.get("blockHash")
+        transaction_hash = receipt.get("transactionHash")
+        if block_hash is None or transaction_hash is None:
+            return self._decode_receipt(receipt)
+
+        cache_key = (block_hash, transaction_hash, self.event_index.abi_hash)
+        if cache_key in _decoded_receipts:
+            _decoded_receipts.move_to_end(cache_key)
+            return _decoded_receipts[cache_key]
+
+        decoded_events = self._decode_receipt(receipt)
+        _decoded_receipts[cache_key] = decoded_events
+        if len(_decoded_receipts) > DECODED_RECEIPTS_CACHE_SIZE:
+            _decoded_receipts.popitem(last=False)
+        return decoded_events
+
+    def _decode_receipt(self, receipt: TxReceipt) -> Tuple[DecodedEvent, ...]:
+        decoded_logs = (
+            (log_entry["logIndex"], self.event_index.decode(log_entry))
+            for log_entry in receipt["logs"]
+        )
+        return tuple(
+            (log_index, dict(decoded_log["args"]))
+            for log_index, decoded_log in decoded_logs
+            if decoded_log is not None
+        )
+
+
+def logs_in_order(receipt: TxReceipt, *logs: Log) -> bool:
+    """
+    Asserts that a log matching each ``Log`` was emitted, in the order provided.
+
+    .. code:: python
+
+       assert logs_in_order(receipt, Log(ping.events.Ping, b"one"), Log(ping.events.Ping, b"two"))
+    """
+    previous_index = -1
+    for log in logs:
+        next_index = next(
+            (index for index in log.log_indices(receipt) if index > previous_index),
+            None,
+        )
+        if next_index is None:
             return False
-        return True
+        previous_index = next_index
+    return True
+
+
+class EventCapture:
+    """
+    Captures the logs emitted on a chain from ``from_block`` onwards. Logs are read in
+    chunks of blocks, and indexed in memory by address and topic as they are read, so
+    that every block is only read once and a query for an event type only decodes the
+    logs of that event type.
+    """
+
+    def __init__(self, w3: Web3, from_block: int = 0, chunk_size: int = 1000) -> None:
+        self.w3 = w3
+        self.from_block = from_block
+        self.chunk_size = chunk_size
+        self._reset_index()
+
+    def stream_logs(
+        self,
+        address: Union[str, List[str]] = None,
+        topics: List[Any] = None,
+        from_block: int = None,
+        to_block: Union[int, str] = "latest",
+    ) -> Iterator[LogEntry]:
+        """
+        Yields every raw log emitted by ``address`` (or any address) that matches
+        ``topics`` (or any topics), between ``from_block`` (defaults to the capture's
+        ``from_block``) and ``to_block``.
+        """
+        if from_block is None:
+            from_block = self.from_block
+        if to_block == "latest":
+            to_block = self.w3.eth.blockNumber
+        filter_params = {}  # type: Dict[str, Any]
+        if address is not None:
+            filter_params["address"] = address
+        if topics is not None:
+            filter_params["topics"] = topics
+        for chunk_start in range(from_block, int(to_block) + 1, self.chunk_size):
+            chunk_end = min(chunk_start + self.chunk_size - 1, int(to_block))
+            yield from self.w3.eth.getLogs(
+                {**filter_params, "fromBlock": chunk_start, "toBlock": chunk_end}
+            )
+
+    def stream_events(
+        self, contract_event: ContractEvent, *args: Any, **kwargs: Any
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields every decoded event of ``contract_event`` that contains *every* member
+        of ``args`` / ``kwargs`` (or every event, if none are provided), in the order
+        they were emitted. If ``contract_event`` belongs to a contract instance, only
+        events emitted by that contract are yielded.
+
+        .. code:: python
+
+           transfers_to_x = list(event_capture.stream_events(token.events.Transfer, to=x))
+        """
+        self._update_index()
+        event_index = get_event_index(contract_event().abi)
+        topic = event_index.topic
+        log = Log(contract_event, *args, **kwargs) if args or kwargs else None
+        address = contract_event.address
+        indexed_logs = [
+            log_entries
+            for (log_address, log_topic), log_entries in self._index.items()
+            if address in (None, log_address) and topic in (None, log_topic)
+        ]
+        for log_entry in heapq.merge(*indexed_logs, key=_get_log_position):
+            decoded_log = self._decode_log(event_index, log_entry)
+            if decoded_log is None:
+                continue
+            if log is None or log._is_match(decoded_log["args"]):
+                yield decoded_log
+
+    def count(self, contract_event: ContractEvent, *args: Any, **kwargs: Any) -> int:
+        """
+        Returns the number of captured events that ``stream_events`` would yield.
+        """
+        return sum(1 for _ in self.stream_events(contract_event, *args, **kwargs))
+
+    def is_present(
+        self, contract_event: ContractEvent, *args: Any, **kwargs: Any
+    ) -> bool:
+        """
+        Asserts that at least one captured event contains *every* member of ``args`` /
+        ``kwargs``.
+        """
+        return any(True for _ in self.stream_events(contract_event, *args, **kwargs))
+
+    def _reset_index(self) -> None:
+        self._last_block = None  # type: Optional[Tuple[int, bytes]]
+        self._index = defaultdict(
+            list
+        )  # type: DefaultDict[Tuple[str, Optional[bytes]], List[LogEntry]]
+        self._decoded_logs = {}  # type: Dict[Hashable, Optional[Dict[str, Any]]]
+
+    def _update_index(self) -> None:
+        """
+        Indexes every log emitted since the last update. If the chain has been reverted
+        since (i.e. the last indexed block is no longer part of the chain), the index is
+        rebuilt from ``from_block``.
+        """
+        latest_block = self.w3.eth.getBlock("latest")
+        if self._last_block is not None:
+            last_number, last_hash = self._last_block
+            if last_number > latest_block["number"]:
+                self._reset_index()
+            elif self.w3.eth.getBlock(last_number)["hash"] != last_hash:
+                self._reset_index()
+        if self._last_block is None:
+            next_block = self.from_block
+        else:
+            next_block = self._last_block[0] + 1
+        for log_entry in self.stream_logs(
+            from_block=next_block, to_block=latest_block["number"]
+        ):
+            topics = log_entry["topics"]
+            self._index[(log_entry["address"], topics[0] if topics else None)].append(
+                log_entry
+            )
+        self._last_block = (latest_block["number"], latest_block["hash"])
+
+    def _decode_log(
+        self, event_index: EventIndex, log_entry: LogEntry
+    ) -> Optional[Dict[str, Any]]:
+        cache_key = (
+            log_entry["blockHash"],
+            log_entry["logIndex"],
+            event_index.abi_hash,
+        )
+        if cache_key not in self._decoded_logs:
+            self._decoded_logs[cache_key] = event_index.decode(log_entry)
+        return self._decoded_logs[cache_key]
+
 
-    def _process_receipt(self, receipt: TxReceipt) -> Dict[str, bytes]:
-        processed_receipt = self.event.processReceipt(receipt)[0]
-        return {k: v for k, v in processed_receipt["args"].items()}
+def _get_log_position(log_entry: LogEntry) -> Tuple[int, int]:
+    return (log_entry["blockNumber"], log_entry["logIndex"])
 
 
 def tx_fail(*args: Any, **kwargs: Any) -> None:
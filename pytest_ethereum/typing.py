@@ -1,4 +1,7 @@
 # todo: move to eth-typing
 class TxReceipt:
     blockHash = None
+    contractAddress = None
+    gasUsed = None
+    status = None
     transactionHash = None
@@ -7,7 +7,7 @@ from setuptools import (
 
 extras_require = {
     'test': [
-        "pytest>=4.4.0",
+        "pytest>=5.2.0",
         "pytest-xdist",
         "tox>=2.9.1,<3",
     ],
@@ -50,6 +50,8 @@ setup(
     install_requires=[
         "eth-utils>=1.4.0,<2.0.0",
         "ethpm>=0.1.4a14,<1.0.0",
+        "pytest>=5.2.0",
+        "rlp>=1.0.1,<2",
     ],
     setup_requires=['setuptools-markdown'],
     python_requires='>=3.6, <4',
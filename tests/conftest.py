@@ -11,6 +11,22 @@ def manifest_dir():
     return TESTS_DIR / "manifests"
 
 
+@pytest.fixture
+def request_counter(w3):
+    requests = []
+
+    def counting_middleware(make_request, w3):
+        def middleware(method, params):
+            requests.append(method)
+            return make_request(method, params)
+
+        return middleware
+
+    w3.middleware_onion.add(counting_middleware, "counter")
+    yield requests
+    w3.middleware_onion.remove("counter")
+
+
 # LINK REFS
 @pytest.fixture
 def escrow_deployer(deployer):
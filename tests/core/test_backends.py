@@ -0,0 +1,63 @@
+import pytest
+from web3 import HTTPProvider, IPCProvider
+
+from pytest_ethereum.backends import MOCK, create_w3
+from pytest_ethereum.exceptions import PytestEthereumError
+
+
+@pytest.mark.parametrize("backend", ("pyevm", "mock"))
+def test_create_w3_with_num_accounts(backend):
+    w3 = create_w3(backend, num_accounts=3)
+    assert len(w3.eth.accounts) == 3
+
+
+@pytest.mark.parametrize("backend", ("pyevm", "mock"))
+def test_create_w3_with_genesis_parameters(backend):
+    w3 = create_w3(backend, genesis_gas_limit=10 ** 7, genesis_timestamp=1)
+    genesis = w3.eth.getBlock(0)
+    assert genesis["gasLimit"] == 10 ** 7
+    assert genesis["timestamp"] == 1
+
+
+@pytest.mark.parametrize(
+    "backend,provider_class,endpoint",
+    (
+        ("http://127.0.0.1:8545", HTTPProvider, "http://127.0.0.1:8545"),
+        ("ipc:///tmp/geth.ipc", IPCProvider, "/tmp/geth.ipc"),
+    ),
+)
+def test_create_w3_with_node(backend, provider_class, endpoint):
+    w3 = create_w3(backend)
+    assert isinstance(w3.provider, provider_class)
+    if provider_class is HTTPProvider:
+        assert w3.provider.endpoint_uri == endpoint
+    else:
+        assert str(w3.provider.ipc_path) == endpoint
+
+
+@pytest.mark.parametrize("backend", ("geth", "ws://127.0.0.1:8546"))
+def test_create_w3_with_invalid_backend_raises_exception(backend):
+    with pytest.raises(PytestEthereumError, match="Invalid ethereum backend"):
+        create_w3(backend)
+
+
+class TestMockBackend:
+    @pytest.fixture
+    def ethereum_backend(self):
+        return MOCK
+
+    @pytest.mark.parametrize("num_blocks", (1, 5))
+    def test_w3_fixture_reverts_chain_state_after_each_test(self, w3, num_blocks):
+        assert w3.eth.blockNumber == 0
+        w3.testing.mine(num_blocks)
+        assert w3.eth.blockNumber == num_blocks
+
+    def test_w3_fixture_uses_mock_backend(self, w3):
+        sender, recipient = w3.eth.accounts[:2]
+        balance = w3.eth.getBalance(recipient)
+        tx_hash = w3.eth.sendTransaction(
+            {"from": sender, "to": recipient, "value": 1, "gas": 21000}
+        )
+        # Transactions are mined without being executed
+        assert w3.eth.getTransactionReceipt(tx_hash)["blockNumber"] == 1
+        assert w3.eth.getBalance(recipient) == balance
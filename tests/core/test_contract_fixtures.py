@@ -0,0 +1,84 @@
+from ethpm import ASSETS_DIR
+import pytest
+
+pytest_plugins = "pytester"
+
+CONTRACT_FIXTURES_INI = f"""
+[pytest]
+ethereum_contract_fixtures =
+    {ASSETS_DIR / "owned" / "1.0.1.json"} Owned scope=module
+    {ASSETS_DIR / "standard-token" / "1.0.1.json"} StandardToken 100 name=token
+    {ASSETS_DIR / "escrow" / "1.0.3.json"} Escrow scope=session strategy=strategies:escrow
+"""
+
+STRATEGIES = """
+from pytest_ethereum.linker import deploy, link, linker
+
+RECIPIENT = "0x" + "01" * 20
+
+escrow = linker(
+    deploy("SafeSendLib"),
+    link("Escrow", "SafeSendLib"),
+    deploy("Escrow", RECIPIENT),
+)
+"""
+
+TEST_MODULE_SCOPE = """
+def test_module_fixture(owned, w3):
+    assert w3.eth.getCode(owned.address)
+    w3.testing.mine(5)
+
+
+def test_module_fixture_is_shared_within_module(owned, w3):
+    assert w3.eth.blockNumber == 1
+"""
+
+TEST_FUNCTION_SCOPE = """
+def test_module_fixture_is_reverted(w3):
+    assert w3.eth.blockNumber == 0
+
+
+def test_function_fixture(token, w3):
+    assert token.functions.totalSupply().call() == 100
+"""
+
+TEST_STRATEGY = """
+from strategies import RECIPIENT
+
+
+def test_session_fixture_with_strategy(escrow, w3):
+    assert escrow.functions.recipient().call().lower() == RECIPIENT
+"""
+
+
+@pytest.fixture
+def contract_fixtures_dir(testdir):
+    testdir.makeini(CONTRACT_FIXTURES_INI)
+    testdir.makepyfile(strategies=STRATEGIES)
+    testdir.syspathinsert()
+    return testdir
+
+
+def test_contract_fixtures(contract_fixtures_dir):
+    contract_fixtures_dir.makepyfile(
+        test_a=TEST_MODULE_SCOPE, test_b=TEST_FUNCTION_SCOPE, test_c=TEST_STRATEGY
+    )
+    result = contract_fixtures_dir.runpytest("-p", "pytest_ethereum.plugins")
+    result.assert_outcomes(passed=5)
+
+
+@pytest.mark.parametrize(
+    "ini,match",
+    (
+        (CONTRACT_FIXTURES_INI.replace("scope=module", "scope=test"), "Invalid scope"),
+        (
+            CONTRACT_FIXTURES_INI + "ethereum_chain_scope = module",
+            "wider than the ethereum_chain_scope",
+        ),
+    ),
+    ids=("invalid", "wider_than_chain_scope"),
+)
+def test_contract_fixtures_with_invalid_scope(contract_fixtures_dir, ini, match):
+    contract_fixtures_dir.makeini(ini)
+    result = contract_fixtures_dir.runpytest("-p", "pytest_ethereum.plugins")
+    result.stderr.fnmatch_lines([f"*{match}*"])
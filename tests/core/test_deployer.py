@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from eth_utils import is_address
@@ -5,7 +6,20 @@ from ethpm import ASSETS_DIR
 import pytest
 import web3
 
-from pytest_ethereum.exceptions import DeployerError
+from pytest_ethereum.deployer import Deployer
+from pytest_ethereum.exceptions import DeployerError, LinkerError
+from pytest_ethereum.linker import (
+    BLOCK_GAS_LIMIT,
+    LEARNED_GAS,
+    async_linker,
+    deploy,
+    link,
+    linker,
+    run_python,
+)
+from pytest_ethereum.mining import advance_time
+
+pytest_plugins = "pytester"
 
 logging.getLogger("evm").setLevel(logging.INFO)
 
@@ -85,3 +99,245 @@ def test_safe_math_deployer(safe_math):
 def test_escrow_deployer_unlinked(escrow_deployer):
     with pytest.raises(DeployerError):
         escrow_deployer.deploy("Escrow", escrow_deployer.package.w3.eth.accounts[0])
+
+
+def test_deployer_restores_cached_deployment(deployer, w3, caplog):
+    caplog.set_level(logging.INFO, logger="pytest_ethereum.deployer")
+    owned_deployer = deployer(ASSETS_DIR / "owned" / "1.0.1.json")
+    owned_deployer.cache_deployments = True
+    snapshot_id = w3.testing.snapshot()
+    owned_package = owned_deployer.deploy("Owned")
+    deployed_block = w3.eth.getBlock("latest")
+    w3.testing.revert(snapshot_id)
+    caplog.clear()
+
+    cached_package = owned_deployer.deploy("Owned")
+    assert "Owned restored from deployment cache." in caplog.messages
+    assert cached_package.manifest == owned_package.manifest
+    assert w3.eth.getBlock("latest") == deployed_block
+    owned_instance = cached_package.deployments.get_instance("Owned")
+    assert w3.eth.getCode(owned_instance.address)
+
+
+def test_deployer_does_not_restore_deployment_from_different_chain_head(deployer, w3):
+    owned_deployer = deployer(ASSETS_DIR / "owned" / "1.0.1.json")
+    first_owned = owned_deployer.deploy("Owned").deployments.get_instance("Owned")
+    second_owned = owned_deployer.deploy("Owned").deployments.get_instance("Owned")
+    assert first_owned.address != second_owned.address
+    assert w3.eth.blockNumber == 2
+
+
+def test_deployer_without_deployment_cache(deployer, w3, caplog):
+    caplog.set_level(logging.INFO, logger="pytest_ethereum.deployer")
+    owned_deployer = deployer(ASSETS_DIR / "owned" / "1.0.1.json")
+    snapshot_id = w3.testing.snapshot()
+    owned_deployer.deploy("Owned")
+    w3.testing.revert(snapshot_id)
+    owned_deployer.deploy("Owned")
+    assert "Owned restored from deployment cache." not in caplog.messages
+
+
+@pytest.mark.parametrize(
+    "create_strategy",
+    (
+        lambda callback: linker(deploy("Owned"), run_python(callback)),
+        lambda callback: lambda package: callback(linker(deploy("Owned"))(package)),
+    ),
+)
+def test_deployer_does_not_cache_strategy_with_side_effects(
+    deployer, w3, caplog, create_strategy
+):
+    caplog.set_level(logging.INFO, logger="pytest_ethereum.deployer")
+    owned_deployer = deployer(ASSETS_DIR / "owned" / "1.0.1.json")
+    owned_deployer.cache_deployments = True
+    callback_packages = []
+    owned_deployer.register_strategy("Owned", create_strategy(callback_packages.append))
+    snapshot_id = w3.testing.snapshot()
+    owned_deployer.deploy("Owned")
+    w3.testing.revert(snapshot_id)
+    owned_deployer.deploy("Owned")
+    assert "Owned restored from deployment cache." not in caplog.messages
+    assert len(callback_packages) == 2
+
+
+def test_deployer_does_not_restore_deployment_from_different_sender(
+    deployer, w3, caplog
+):
+    caplog.set_level(logging.INFO, logger="pytest_ethereum.deployer")
+    owned_deployer = deployer(ASSETS_DIR / "owned" / "1.0.1.json")
+    owned_deployer.cache_deployments = True
+    snapshot_id = w3.testing.snapshot()
+    owned_deployer.deploy("Owned")
+    w3.testing.revert(snapshot_id)
+    caplog.clear()
+    w3.eth.defaultAccount = w3.eth.accounts[1]
+    owned_package = owned_deployer.deploy("Owned")
+    assert "Owned restored from deployment cache." not in caplog.messages
+    (deployment,) = [
+        deployments["Owned"]
+        for deployments in owned_package.manifest["deployments"].values()
+    ]
+    tx = w3.eth.getTransaction(deployment["transaction"])
+    assert tx["from"] == w3.eth.accounts[1]
+
+
+def test_deployer_does_not_restore_deployment_after_time_travel(deployer, w3, caplog):
+    caplog.set_level(logging.INFO, logger="pytest_ethereum.deployer")
+    owned_deployer = deployer(ASSETS_DIR / "owned" / "1.0.1.json")
+    owned_deployer.cache_deployments = True
+    snapshot_id = w3.testing.snapshot()
+    owned_deployer.deploy("Owned")
+    w3.testing.revert(snapshot_id)
+    caplog.clear()
+    timestamp = advance_time(w3, 10 ** 6)
+    owned_deployer.deploy("Owned")
+    assert "Owned restored from deployment cache." not in caplog.messages
+    assert w3.eth.getBlock("latest")["timestamp"] >= timestamp
+
+
+def test_deployer_fixture_caches_deployments_with_ini_option(testdir):
+    testdir.makeini(
+        """
+        [pytest]
+        ethereum_cache_deployments = true
+        """
+    )
+    testdir.makepyfile(
+        f"""
+        from pathlib import Path
+
+        OWNED_PATH = Path({str(ASSETS_DIR / "owned" / "1.0.1.json")!r})
+
+        def test_deploy(deployer):
+            assert deployer(OWNED_PATH).cache_deployments is True
+
+        def test_async_deploy(async_deployer):
+            assert async_deployer(OWNED_PATH).cache_deployments is True
+        """
+    )
+    result = testdir.runpytest("-p", "pytest_ethereum.plugins")
+    result.assert_outcomes(passed=2)
+
+
+@pytest.mark.parametrize("gas_policy", (1_000_000, BLOCK_GAS_LIMIT))
+def test_deployer_with_gas_policy(deployer, gas_policy, request_counter):
+    owned_package = deployer(ASSETS_DIR / "owned" / "1.0.1.json").package
+    owned_deployer = Deployer(
+        owned_package, cache_deployments=False, gas_policy=gas_policy
+    )
+    owned_instance = owned_deployer.deploy("Owned").deployments.get_instance("Owned")
+    assert is_address(owned_instance.address)
+    assert "eth_sendTransaction" in request_counter
+    assert "eth_estimateGas" not in request_counter
+
+
+def test_deployer_with_learned_gas_policy(deployer, w3, request_counter, monkeypatch):
+    monkeypatch.setattr("pytest_ethereum._utils.linker._learned_deployment_gas", {})
+    owned_package = deployer(ASSETS_DIR / "owned" / "1.0.1.json").package
+    owned_deployer = Deployer(
+        owned_package, cache_deployments=False, gas_policy=LEARNED_GAS
+    )
+    owned_deployer.deploy("Owned")
+    assert "eth_estimateGas" in request_counter
+    request_counter.clear()
+
+    owned_deployer.deploy("Owned")
+    assert "eth_sendTransaction" in request_counter
+    assert "eth_estimateGas" not in request_counter
+    latest_block = w3.eth.getBlock("latest")
+    deploy_transaction = w3.eth.getTransaction(latest_block["transactions"][0])
+    assert latest_block["gasUsed"] < deploy_transaction["gas"]
+
+
+def test_deployer_overrides_gas_policy(deployer, request_counter):
+    owned_package = deployer(ASSETS_DIR / "owned" / "1.0.1.json").package
+    owned_deployer = Deployer(owned_package, cache_deployments=False, gas_policy=1)
+    owned_deployer.deploy("Owned", gas_policy=None)
+    assert "eth_estimateGas" in request_counter
+
+
+def test_deployer_raises_exception_with_insufficient_gas(deployer):
+    owned_package = deployer(ASSETS_DIR / "owned" / "1.0.1.json").package
+    owned_deployer = Deployer(owned_package, cache_deployments=False, gas_policy=70000)
+    with pytest.raises(LinkerError, match="Deployment of Owned failed"):
+        owned_deployer.deploy("Owned")
+
+
+def test_deployer_raises_exception_with_invalid_gas_policy(deployer):
+    owned_package = deployer(ASSETS_DIR / "owned" / "1.0.1.json").package
+    owned_deployer = Deployer(owned_package, gas_policy="invalid")
+    with pytest.raises(LinkerError, match="Invalid gas policy"):
+        owned_deployer.deploy("Owned")
+
+
+def test_deployer_injects_contract(deployer, w3):
+    escrow_deployer = deployer(ASSETS_DIR / "escrow" / "1.0.3.json")
+    transaction_count = w3.eth.getTransactionCount(w3.eth.accounts[0])
+    lib_package = escrow_deployer.deploy("SafeSendLib", mode="inject")
+    lib_instance = lib_package.deployments.get_instance("SafeSendLib")
+    lib_factory = lib_package.get_contract_factory("SafeSendLib")
+    assert w3.eth.getCode(lib_instance.address) == lib_factory.bytecode_runtime
+    assert w3.eth.getTransactionCount(w3.eth.accounts[0]) == transaction_count + 1
+
+    # Injected contracts survive a revert to any later snapshot
+    snapshot_id = w3.testing.snapshot()
+    w3.eth.sendTransaction({"from": w3.eth.accounts[0], "to": w3.eth.accounts[1]})
+    w3.testing.revert(snapshot_id)
+    assert w3.eth.getCode(lib_instance.address) == lib_factory.bytecode_runtime
+
+    # Later deployments from the same sender don't collide with the injected contract
+    deployed_package = escrow_deployer.deploy("SafeSendLib")
+    deployed_instance = deployed_package.deployments.get_instance("SafeSendLib")
+    assert deployed_instance.address != lib_instance.address
+
+
+def test_deployer_raises_exception_when_injecting_with_constructor_args(deployer):
+    escrow_deployer = deployer(ASSETS_DIR / "escrow" / "1.0.3.json")
+    with pytest.raises(DeployerError):
+        escrow_deployer.deploy("SafeSendLib", 1, mode="inject")
+
+
+def test_deployer_raises_exception_with_invalid_mode(deployer):
+    escrow_deployer = deployer(ASSETS_DIR / "escrow" / "1.0.3.json")
+    with pytest.raises(DeployerError):
+        escrow_deployer.deploy("SafeSendLib", mode="invalid")
+
+
+def test_async_deployer_deploys_concurrently(async_deployer, manifest_dir):
+    greeter_deployer = async_deployer(manifest_dir / "greeter" / "1.0.0.json")
+    registry_deployer = async_deployer(manifest_dir / "registry" / "1.0.0.json")
+    greeter, registry = asyncio.get_event_loop().run_until_complete(
+        asyncio.gather(
+            greeter_deployer.deploy("greeter"), registry_deployer.deploy("registry")
+        )
+    )
+    greeter_instance = greeter.deployments.get_instance("greeter")
+    assert greeter_instance.functions.greet().call() == b"Hello"
+    registry_instance = registry.deployments.get_instance("registry")
+    assert tuple(registry_instance.functions) == ("register", "lookup")
+
+
+def test_async_deployer_creates_same_package_as_deployer(async_deployer, deployer, w3):
+    escrow_manifest_path = ASSETS_DIR / "escrow" / "1.0.3.json"
+    operations = (
+        deploy("SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+        deploy("Escrow", w3.eth.accounts[0]),
+    )
+    snapshot_id = w3.testing.snapshot()
+    escrow_deployer = async_deployer(escrow_manifest_path)
+    escrow_deployer.register_strategy("Escrow", async_linker(*operations))
+    async_package = asyncio.get_event_loop().run_until_complete(
+        escrow_deployer.deploy("Escrow")
+    )
+    w3.testing.revert(snapshot_id)
+    escrow_deployer = deployer(escrow_manifest_path)
+    escrow_deployer.register_strategy("Escrow", linker(*operations))
+    package = escrow_deployer.deploy("Escrow")
+    assert (
+        async_package.manifest["contract_types"] == package.manifest["contract_types"]
+    )
+    for contract_type in ("SafeSendLib", "Escrow"):
+        assert async_package.deployments.get(contract_type)["address"] == (
+            package.deployments.get(contract_type)["address"]
+        )
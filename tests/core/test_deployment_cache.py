@@ -0,0 +1,127 @@
+import logging
+import os
+
+from ethpm import ASSETS_DIR
+import pytest
+
+from pytest_ethereum._utils.package import create_trusted_package, load_manifest
+from pytest_ethereum.backends import DETERMINISTIC_GENESIS_TIMESTAMP, create_w3
+from pytest_ethereum.deployer import Deployer
+from pytest_ethereum.deployment_cache import (
+    DeploymentCache,
+    get_deployment_cache_key,
+    set_deployment_cache,
+)
+from pytest_ethereum.linker import deploy, link, linker, run_python
+
+
+def test_deployment_cache_get_and_set(tmp_path):
+    cache = DeploymentCache(tmp_path / "cache", max_size=10 ** 6)
+    assert (tmp_path / "cache" / ".gitignore").exists()
+    assert cache.get(b"\01") is None
+    cache.set(b"\01", {b"key": b"value"}, b"\02" * 32, {"version": "1.0.0"})
+    assert cache.get(b"\01") == ({b"key": b"value"}, b"\02" * 32, {"version": "1.0.0"})
+
+
+def test_deployment_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = DeploymentCache(tmp_path, max_size=10 ** 6)
+    for index in range(3):
+        cache.set(bytes([index]), {b"key": b"\00" * 1000}, b"\00" * 32, {})
+        entry_path = tmp_path / f"{bytes([index]).hex()}.rlp"
+        os.utime(str(entry_path), (index, index))
+    # Entry 0 is used most recently
+    assert cache.get(b"\00") is not None
+
+    cache.max_size = 2500
+    cache.set(b"\03", {b"key": b"\00" * 1000}, b"\00" * 32, {})
+    assert cache.get(b"\00") is not None
+    assert cache.get(b"\01") is None
+    assert cache.get(b"\02") is None
+    assert cache.get(b"\03") is not None
+
+
+def test_deployment_cache_ignores_corrupted_entries(tmp_path):
+    cache = DeploymentCache(tmp_path, max_size=10 ** 6)
+    (tmp_path / "01.rlp").write_bytes(b"\xff")
+    assert cache.get(b"\01") is None
+
+
+def callback(package):
+    pass
+
+
+def test_get_deployment_cache_key_changes_with_function_code(monkeypatch):
+    def edited_callback(package):
+        package.w3.testing.mine(1)
+
+    strategy = linker(deploy("Owned"), run_python(callback))
+    key = get_deployment_cache_key("Owned", (), strategy)
+    monkeypatch.setattr(callback, "__code__", edited_callback.__code__)
+    assert get_deployment_cache_key("Owned", (), strategy) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(callback, "__defaults__", (1,))
+    assert get_deployment_cache_key("Owned", (), strategy) != key
+    monkeypatch.undo()
+    assert get_deployment_cache_key("Owned", (), strategy) == key
+
+
+def test_get_deployment_cache_key():
+    strategy = linker(deploy("Owned"), run_python(callback))
+    key = get_deployment_cache_key("Owned", (1,), strategy)
+    assert key == get_deployment_cache_key(
+        "Owned", (1,), linker(deploy("Owned"), run_python(callback))
+    )
+    assert key != get_deployment_cache_key("Owned", (2,), strategy)
+    assert key != get_deployment_cache_key("Owned", (True,), strategy)
+    assert key != get_deployment_cache_key("Owned", [1], strategy)
+    with pytest.raises(TypeError):
+        get_deployment_cache_key(linker(run_python(lambda package: None)))
+    with pytest.raises(TypeError):
+        get_deployment_cache_key(object())
+
+
+@pytest.fixture
+def deployment_cache(tmp_path):
+    deployment_cache = DeploymentCache(tmp_path, max_size=10 ** 7)
+    set_deployment_cache(deployment_cache)
+    yield deployment_cache
+    set_deployment_cache(None)
+
+
+def create_escrow_deployer():
+    """
+    Return an escrow deployer on a new chain, as it would be created in a new session.
+    """
+    w3 = create_w3(genesis_timestamp=DETERMINISTIC_GENESIS_TIMESTAMP)
+    manifest = load_manifest(ASSETS_DIR / "escrow" / "1.0.3.json")
+    escrow_deployer = Deployer(
+        create_trusted_package(manifest, w3), cache_deployments=True
+    )
+    escrow_deployer.register_strategy(
+        "Escrow",
+        linker(
+            deploy("SafeSendLib"),
+            link("Escrow", "SafeSendLib"),
+            deploy("Escrow", w3.eth.accounts[1]),
+        ),
+    )
+    return escrow_deployer
+
+
+def test_deployer_restores_deployment_from_previous_session(deployment_cache, caplog):
+    caplog.set_level(logging.INFO, logger="pytest_ethereum.deployer")
+    escrow_package = create_escrow_deployer().deploy("Escrow")
+    assert caplog.messages == []
+
+    escrow_deployer = create_escrow_deployer()
+    w3 = escrow_deployer.package.w3
+    cached_package = escrow_deployer.deploy("Escrow")
+    assert caplog.messages == ["Escrow restored from on-disk deployment cache."]
+    assert cached_package.manifest == escrow_package.manifest
+    escrow = cached_package.deployments.get_instance("Escrow")
+    assert escrow.functions.recipient().call() == w3.eth.accounts[1]
+    # Later transactions are mined on top of the restored deployment
+    block_number = w3.eth.blockNumber
+    w3.eth.sendTransaction({"from": w3.eth.accounts[0], "to": w3.eth.accounts[1]})
+    assert w3.eth.blockNumber == block_number + 1
+    assert w3.eth.getCode(escrow.address) == escrow.bytecode_runtime
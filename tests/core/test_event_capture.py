@@ -0,0 +1,94 @@
+import pytest
+from web3.contract import Contract
+
+from pytest_ethereum.testing import EventCapture
+
+
+@pytest.fixture
+def ping_deployer(deployer, manifest_dir):
+    return deployer(manifest_dir / "ping" / "1.0.0.json")
+
+
+@pytest.fixture
+def ping(ping_deployer):
+    ping_package = ping_deployer.deploy("ping")
+    return ping_package.deployments.get_instance("ping")
+
+
+def send_pings(ping, *pings):
+    w3 = ping.web3
+    for first, second in pings:
+        tx_hash = ping.functions.ping(first, second).transact()
+        w3.eth.waitForTransactionReceipt(tx_hash)
+
+
+def test_event_capture_fixture_only_captures_events_during_test(ping, event_capture):
+    assert isinstance(event_capture, EventCapture)
+    assert event_capture.count(ping.events.Ping) == 0
+    send_pings(ping, (b"1", b"2"))
+    assert event_capture.count(ping.events.Ping) == 1
+
+
+@pytest.mark.parametrize(
+    "args,kwargs,expected",
+    (
+        ((), {}, 4),
+        ((b"1".ljust(32, b"\00"),), {}, 2),
+        ((), {"second": b"4".ljust(32, b"\00")}, 1),
+        ((b"1".ljust(32, b"\00"), b"3".ljust(32, b"\00")), {}, 1),
+        ((b"5".ljust(32, b"\00"),), {}, 0),
+    ),
+)
+def test_event_capture_count(ping, event_capture, args, kwargs, expected):
+    send_pings(ping, (b"1", b"2"), (b"3", b"4"), (b"1", b"3"), (b"2", b"2"))
+    assert event_capture.count(ping.events.Ping, *args, **kwargs) == expected
+    assert event_capture.is_present(ping.events.Ping, *args, **kwargs) is bool(expected)
+
+
+def test_event_capture_streams_events_in_order_across_chunks(ping, w3):
+    event_capture = EventCapture(w3, from_block=w3.eth.blockNumber + 1, chunk_size=2)
+    send_pings(ping, (b"1", b"2"), (b"3", b"4"), (b"5", b"6"))
+    events = list(event_capture.stream_events(ping.events.Ping))
+    assert [event["args"]["first"][:1] for event in events] == [b"1", b"3", b"5"]
+    assert [event["blockNumber"] for event in events] == sorted(
+        event["blockNumber"] for event in events
+    )
+    assert len(list(event_capture.stream_logs(address=ping.address))) == 3
+
+
+def test_event_capture_only_streams_events_of_contract(
+    ping, ping_deployer, event_capture
+):
+    other_ping = ping_deployer.deploy("ping").deployments.get_instance("ping")
+    send_pings(ping, (b"1", b"2"))
+    send_pings(other_ping, (b"1", b"2"), (b"3", b"4"))
+    assert event_capture.count(ping.events.Ping) == 1
+    assert event_capture.count(other_ping.events.Ping) == 2
+    assert event_capture.count(type(ping).events.Ping) == 3
+
+
+def test_event_capture_rebuilds_index_after_revert(ping, w3, event_capture):
+    send_pings(ping, (b"1", b"2"))
+    snapshot_id = w3.testing.snapshot()
+    send_pings(ping, (b"3", b"4"))
+    assert event_capture.count(ping.events.Ping) == 2
+    w3.testing.revert(snapshot_id)
+    assert event_capture.count(ping.events.Ping) == 1
+    send_pings(ping, (b"5", b"6"))
+    assert event_capture.count(ping.events.Ping, b"3".ljust(32, b"\00")) == 0
+    assert event_capture.count(ping.events.Ping, b"5".ljust(32, b"\00")) == 1
+
+
+def test_event_capture_decodes_events_once_per_event_abi(ping, event_capture):
+    # Same signature (and so topic) as Ping, but with both arguments indexed
+    other_abi = [
+        dict(item_abi, inputs=[dict(arg, indexed=True) for arg in item_abi["inputs"]])
+        for item_abi in ping.abi
+        if item_abi["type"] == "event"
+    ]
+    other_ping = ping.web3.eth.contract(
+        address=ping.address, abi=other_abi, ContractFactoryClass=Contract
+    )
+    send_pings(ping, (b"1", b"2"))
+    assert event_capture.count(other_ping.events.Ping) == 0
+    assert event_capture.count(ping.events.Ping) == 1
@@ -0,0 +1,156 @@
+import json
+
+from ethpm import ASSETS_DIR
+import pytest
+
+from pytest_ethereum import gas_report as gas_report_module
+from pytest_ethereum.exceptions import LinkerError
+from pytest_ethereum.gas_report import GasReport, get_gas_report, set_gas_report
+from pytest_ethereum.linker import deploy, link, linker, run_python
+
+pytest_plugins = "pytester"
+
+
+@pytest.fixture
+def gas_report():
+    gas_report = GasReport()
+    set_gas_report(gas_report)
+    yield gas_report
+    set_gas_report(None)
+
+
+@pytest.fixture
+def escrow_deployer(deployer):
+    escrow_deployer = deployer(ASSETS_DIR / "escrow" / "1.0.3.json")
+    escrow_deployer.cache_deployments = False
+    return escrow_deployer
+
+
+def test_gas_report_is_disabled_by_default():
+    assert get_gas_report() is None
+
+
+def test_gas_report_records_linker_operations(escrow_deployer, gas_report, w3):
+    def release_funds(package):
+        escrow_instance = package.deployments.get_instance("Escrow")
+        tx_hash = escrow_instance.functions.releaseFunds().transact()
+        w3.eth.waitForTransactionReceipt(tx_hash)
+
+    escrow_strategy = linker(
+        deploy("SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+        deploy("Escrow", w3.eth.accounts[0]),
+        run_python(release_funds),
+    )
+    escrow_deployer.register_strategy("Escrow", escrow_strategy)
+    escrow_package = escrow_deployer.deploy("Escrow")
+
+    stats = gas_report.stats
+    assert set(stats) == {
+        ("linker", "SafeSendLib", "deploy"),
+        ("linker", "Escrow", "link SafeSendLib"),
+        ("linker", "Escrow", "deploy"),
+        ("linker", "release_funds", "run_python"),
+        ("transactions", "Escrow", "releaseFunds"),
+    }
+    escrow_address = escrow_package.deployments.get_instance("Escrow").address
+    escrow_receipt = w3.eth.waitForTransactionReceipt(
+        escrow_package.manifest["deployments"][
+            next(iter(escrow_package.manifest["deployments"]))
+        ]["Escrow"]["transaction"]
+    )
+    assert escrow_receipt["contractAddress"] == escrow_address
+    assert stats[("linker", "Escrow", "deploy")].gas_used == escrow_receipt["gasUsed"]
+    assert stats[("linker", "Escrow", "link SafeSendLib")].gas_used == 0
+    release_stats = stats[("transactions", "Escrow", "releaseFunds")]
+    assert release_stats.calls == 1
+    assert stats[("linker", "release_funds", "run_python")].gas_used == (
+        release_stats.gas_used
+    )
+    assert all(stat.duration > 0 for stat in stats.values())
+
+
+def test_gas_report_aggregates_calls(deployer, gas_report):
+    owned_deployer = deployer(ASSETS_DIR / "owned" / "1.0.1.json")
+    owned_deployer.cache_deployments = False
+    owned_deployer.deploy("Owned")
+    owned_deployer.deploy("Owned")
+    owned_stats = gas_report.stats[("linker", "Owned", "deploy")]
+    assert owned_stats.calls == 2
+    assert owned_stats.gas_used == 2 * owned_stats.max_gas_used
+
+
+def test_gas_report_forgets_failed_deployments(deployer, gas_report):
+    owned_deployer = deployer(ASSETS_DIR / "owned" / "1.0.1.json")
+    with pytest.raises(LinkerError, match="Deployment of Owned failed"):
+        owned_deployer.deploy("Owned", gas_policy=70000)
+    assert gas_report.deployments_sent_at == {}
+
+
+def test_gas_report_forgets_pending_deployments_after_test(testdir):
+    testdir.makeconftest(
+        """
+        import pytest
+
+        @pytest.fixture
+        def gas_report(pytestconfig):
+            return pytestconfig._eth_gas_report
+        """
+    )
+    testdir.makepyfile(
+        """
+        def test_deployment_without_receipt(w3, gas_report):
+            gas_report.record_deployment_sent(b"\\x01" * 32, 0.0)
+
+        def test_pending_deployments_forgotten(gas_report):
+            assert gas_report.deployments_sent_at == {}
+        """
+    )
+    result = testdir.runpytest("-p", "pytest_ethereum.plugins", "--eth-gas-report")
+    result.assert_outcomes(passed=2)
+
+
+def test_gas_report_json_and_merge(tmp_path):
+    gas_report = GasReport()
+    gas_report.record("linker", "Owned", "deploy", 100, 0.5)
+    gas_report.record("linker", "Owned", "deploy", 300, 0.5)
+    json_path = tmp_path / "gas.json"
+    gas_report.write_json(json_path)
+    assert json.loads(json_path.read_text()) == [
+        {
+            "section": "linker",
+            "contract": "Owned",
+            "name": "deploy",
+            "calls": 2,
+            "gas_used": 400,
+            "max_gas_used": 300,
+            "duration": 1.0,
+        }
+    ]
+
+    merged_report = GasReport()
+    merged_report.merge(gas_report.to_json_data())
+    merged_report.merge(gas_report.to_json_data())
+    assert merged_report.stats[("linker", "Owned", "deploy")].calls == 4
+    header, owned_line = merged_report.summary_lines()
+    assert owned_line.split() == [
+        "linker",
+        "Owned",
+        "deploy",
+        "4",
+        "800",
+        "200",
+        "300",
+        "2.000",
+    ]
+
+
+def test_gas_report_middleware_ignores_disabled_report(deployer, w3, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(
+        gas_report_module.GasReport,
+        "record_transaction",
+        lambda *args: recorded.append(args),
+    )
+    w3.eth.sendTransaction({"from": w3.eth.accounts[0], "to": w3.eth.accounts[1]})
+    assert recorded == []
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from pytest_ethereum.gas_snapshot import GasSnapshot
+
+pytest_plugins = "pytester"
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / "gas-snapshot.json"
+    path.write_text(json.dumps({"test_a": 100_000, "test_b": 50000}))
+    return path
+
+
+def test_gas_snapshot_loads_existing_snapshot(snapshot_path):
+    gas_snapshot = GasSnapshot(snapshot_path)
+    assert gas_snapshot.snapshot == {"test_a": 100_000, "test_b": 50000}
+    assert gas_snapshot.recorded == {}
+
+
+def test_gas_snapshot_without_file(tmp_path):
+    gas_snapshot = GasSnapshot(tmp_path / "missing.json")
+    assert gas_snapshot.snapshot == {}
+    assert gas_snapshot.check("test_a", 100_000) is None
+
+
+@pytest.mark.parametrize(
+    "tolerance,gas_used,regression",
+    (
+        (0, 90000, False),
+        (0, 100_000, False),
+        (0, 100_001, True),
+        (5, 105_000, False),
+        (5, 105_001, True),
+    ),
+)
+def test_gas_snapshot_check(snapshot_path, tolerance, gas_used, regression):
+    gas_snapshot = GasSnapshot(snapshot_path, tolerance)
+    message = gas_snapshot.check("test_a", gas_used)
+    if regression:
+        assert message.startswith(
+            f"Gas used by test_a increased from 100000 to {gas_used}"
+        )
+    else:
+        assert message is None
+
+
+def test_gas_snapshot_check_ignores_new_tests(snapshot_path):
+    gas_snapshot = GasSnapshot(snapshot_path)
+    assert gas_snapshot.check("test_c", 10 ** 6) is None
+
+
+def test_gas_snapshot_write(snapshot_path):
+    gas_snapshot = GasSnapshot(snapshot_path)
+    gas_snapshot.record("test_a", 90000)
+    gas_snapshot.record("test_c", 20000)
+    gas_snapshot.write()
+    assert json.loads(snapshot_path.read_text()) == {
+        "test_a": 90000,
+        "test_b": 50000,
+        "test_c": 20000,
+    }
+    assert GasSnapshot(snapshot_path).check("test_a", 90000) is None
+
+
+@pytest.fixture
+def transfer_testdir(testdir):
+    testdir.makepyfile(
+        test_transfer="""
+        def test_transfer(w3):
+            sender, recipient = w3.eth.accounts[:2]
+            w3.eth.sendTransaction({"from": sender, "to": recipient, "value": 1})
+        """
+    )
+    (testdir.tmpdir / "gas-snapshot.json").write(
+        json.dumps({"test_transfer.py::test_transfer": 20000})
+    )
+    return testdir
+
+
+def test_gas_regression_fails_test(transfer_testdir):
+    result = transfer_testdir.runpytest(
+        "-p", "pytest_ethereum.plugins", "--eth-gas-snapshot"
+    )
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*increased from 20000 to 21000*"])
+
+
+def test_gas_regression_warns(transfer_testdir):
+    transfer_testdir.makeini(
+        """
+        [pytest]
+        ethereum_gas_snapshot_action = warn
+        """
+    )
+    result = transfer_testdir.runpytest(
+        "-p", "pytest_ethereum.plugins", "--eth-gas-snapshot"
+    )
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(
+        ["*GasRegressionWarning*increased from 20000 to 21000*"]
+    )
@@ -1,2 +1,43 @@
+import subprocess
+import sys
+
+# Upper bound on the time to import the plugin, which every pytest run pays
+PLUGIN_IMPORT_TIME_BUDGET = 0.25
+
+HEAVY_MODULES = ("web3", "ethpm", "eth", "eth_tester")
+
+IMPORT_PLUGIN = f"""
+import sys
+import time
+
+import pytest
+
+start = time.perf_counter()
+import pytest_ethereum.plugins
+print(time.perf_counter() - start)
+print(",".join(module for module in {HEAVY_MODULES} if module in sys.modules))
+"""
+
+
 def test_import():
     import pytest_ethereum  # noqa: F401
+
+
+def test_plugin_import_is_lazy():
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PLUGIN],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    import_time, imported_modules = output.splitlines()
+    assert imported_modules == ""
+    assert float(import_time) < PLUGIN_IMPORT_TIME_BUDGET
+
+
+def test_tx_fail():
+    from eth_tester.exceptions import TransactionFailed
+    from pytest_ethereum import tx_fail
+
+    with tx_fail():
+        raise TransactionFailed()
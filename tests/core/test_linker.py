@@ -1,9 +1,23 @@
+import asyncio
+import copy
+import json
+import logging
+
 from ethpm import ASSETS_DIR, Package
 import pytest
 
 from pytest_ethereum.deployer import Deployer
-from pytest_ethereum.exceptions import DeployerError
-from pytest_ethereum.linker import deploy, link, linker, run_python
+from pytest_ethereum.exceptions import DeployerError, LinkerError
+from pytest_ethereum.linker import (
+    _schedule,
+    async_linker,
+    deploy,
+    graph_linker,
+    inject,
+    link,
+    linker,
+    run_python,
+)
 
 
 @pytest.fixture
@@ -68,3 +82,287 @@ def test_linker_with_callback(escrow_deployer, w3):
     escrow_instance = linked_escrow_package.deployments.get_instance("Escrow")
     assert escrow_instance.functions.sender().call() == sender
     assert w3.eth.getBalance(recipient) == w3.toWei("1000001", "ether")
+
+
+def test_linker_strategy_restored_from_deployment_cache(escrow_deployer, w3, caplog):
+    caplog.set_level(logging.INFO)
+    escrow_deployer.cache_deployments = True
+    snapshot_id = w3.testing.snapshot()
+    for _ in range(2):
+        # equivalent strategies share a cache entry
+        escrow_strategy = linker(
+            deploy("SafeSendLib", transaction={"from": w3.eth.accounts[7]}),
+            link("Escrow", "SafeSendLib"),
+            deploy(
+                "Escrow", w3.eth.accounts[0], transaction={"from": w3.eth.accounts[7]}
+            ),
+        )
+        escrow_deployer.register_strategy("Escrow", escrow_strategy)
+        w3.testing.revert(snapshot_id)
+        linked_escrow_package = escrow_deployer.deploy("Escrow")
+        assert w3.eth.blockNumber == 2
+    assert caplog.messages.count("Escrow deployed.") == 1
+    assert "Escrow restored from deployment cache." in caplog.messages
+    escrow_instance = linked_escrow_package.deployments.get_instance("Escrow")
+    assert escrow_instance.functions.sender().call() == w3.eth.accounts[7]
+
+
+def test_linker_does_not_modify_original_package(escrow_deployer, w3):
+    escrow_package = escrow_deployer.package
+    original_manifest = copy.deepcopy(escrow_package.manifest)
+    escrow_strategy = linker(
+        deploy("SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+        deploy("Escrow", w3.eth.accounts[0]),
+    )
+    linked_escrow_package = escrow_strategy(escrow_package)
+    assert type(linked_escrow_package) is Package
+    assert escrow_package.manifest == original_manifest
+    assert (
+        linked_escrow_package.manifest["contract_types"]["SafeSendLib"]
+        is escrow_package.manifest["contract_types"]["SafeSendLib"]
+    )
+    assert len(linked_escrow_package.deployments.deployment_data) == 2
+
+
+def test_graph_linker(escrow_deployer, w3):
+    escrow_strategy = graph_linker(
+        deploy("Escrow", w3.eth.accounts[0]),
+        link("Escrow", "SafeSendLib"),
+        deploy("SafeSendLib"),
+    )
+    escrow_deployer.register_strategy("Escrow", escrow_strategy)
+    linked_escrow_package = escrow_deployer.deploy("Escrow")
+    assert isinstance(linked_escrow_package, Package)
+    escrow_instance = linked_escrow_package.deployments.get_instance("Escrow")
+    assert escrow_instance.functions.sender().call() == w3.eth.accounts[0]
+
+
+def test_graph_linker_with_callback(escrow_deployer, w3):
+    def callback_fn(package):
+        escrow_instance = package.deployments.get_instance("Escrow")
+        tx_hash = escrow_instance.functions.releaseFunds().transact()
+        w3.eth.waitForTransactionReceipt(tx_hash)
+
+    recipient = w3.eth.accounts[5]
+    escrow_strategy = graph_linker(
+        deploy("SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+        deploy("Escrow", recipient, transaction={"value": w3.toWei("1", "ether")}),
+        run_python(callback_fn),
+    )
+    escrow_deployer.register_strategy("Escrow", escrow_strategy)
+    escrow_deployer.deploy("Escrow")
+    assert w3.eth.getBalance(recipient) == w3.toWei("1000001", "ether")
+
+
+def test_schedule():
+    def callback_fn(package):
+        pass
+
+    operations = (
+        deploy("Escrow", "0x"),
+        link("Escrow", "SafeSendLib"),
+        link("Escrow", "Other"),
+        deploy("SafeSendLib"),
+        deploy("Other"),
+        deploy("Owned"),
+        run_python(callback_fn),
+        deploy("Owned"),
+    )
+    assert _schedule(operations) == [
+        [operations[3], operations[4], operations[5]],
+        [operations[1], operations[2]],
+        [operations[0]],
+        [operations[6]],
+        [operations[7]],
+    ]
+
+
+def test_schedule_raises_exception_with_circular_dependencies():
+    operations = (
+        deploy("Escrow"),
+        link("Escrow", "SafeSendLib"),
+        deploy("SafeSendLib"),
+        link("SafeSendLib", "Escrow"),
+    )
+    with pytest.raises(LinkerError):
+        _schedule(operations)
+
+
+def test_linker_with_predicted_addresses(escrow_deployer, w3):
+    escrow_strategy = linker(
+        deploy("SafeSendLib", transaction={"from": w3.eth.accounts[3]}),
+        link("Escrow", "SafeSendLib"),
+        deploy("Escrow", w3.eth.accounts[0], transaction={"from": w3.eth.accounts[3]}),
+        predict_addresses=True,
+    )
+    escrow_deployer.register_strategy("Escrow", escrow_strategy)
+    linked_escrow_package = escrow_deployer.deploy("Escrow")
+    escrow_instance = linked_escrow_package.deployments.get_instance("Escrow")
+    assert escrow_instance.functions.sender().call() == w3.eth.accounts[3]
+    safe_send_lib = linked_escrow_package.deployments.get_instance("SafeSendLib")
+    assert w3.eth.getCode(safe_send_lib.address)
+
+
+def send_transaction(package):
+    w3 = package.w3
+    w3.eth.sendTransaction({"from": w3.eth.accounts[0], "to": w3.eth.accounts[1]})
+    return package
+
+
+@pytest.mark.parametrize(
+    "operation", (run_python(send_transaction), inject("SafeSendLib"))
+)
+def test_linker_with_predicted_addresses_after_other_operation(
+    escrow_deployer, w3, operation
+):
+    safe_send_lib_strategy = linker(
+        deploy("SafeSendLib"), operation, deploy("SafeSendLib"), predict_addresses=True
+    )
+    linked_package = safe_send_lib_strategy(escrow_deployer.package)
+    safe_send_lib = linked_package.deployments.get_instance("SafeSendLib")
+    assert w3.eth.getCode(safe_send_lib.address)
+
+
+def test_linker_raises_exception_on_mispredicted_address(
+    escrow_deployer, w3, monkeypatch
+):
+    monkeypatch.setattr(
+        "pytest_ethereum.linker.get_create_address", lambda sender, nonce: b"\01" * 20
+    )
+    escrow_strategy = linker(
+        deploy("SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+        deploy("Escrow", w3.eth.accounts[0]),
+        predict_addresses=True,
+    )
+    with pytest.raises(LinkerError, match="predicted address"):
+        escrow_strategy(escrow_deployer.package)
+
+
+def test_linker_with_injected_contracts(escrow_deployer, w3):
+    sender = w3.eth.accounts[0]
+    recipient = w3.eth.accounts[5]
+    escrow_strategy = linker(
+        inject("SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+        inject(
+            "Escrow",
+            storage={0: int(sender, 16), 1: int(recipient, 16)},
+            transaction={"from": sender},
+        ),
+    )
+    escrow_deployer.register_strategy("Escrow", escrow_strategy)
+    linked_escrow_package = escrow_deployer.deploy("Escrow")
+    escrow_instance = linked_escrow_package.deployments.get_instance("Escrow")
+    assert escrow_instance.functions.sender().call() == sender
+    assert escrow_instance.functions.recipient().call() == recipient
+    escrow_factory = linked_escrow_package.get_contract_factory("Escrow")
+    assert w3.eth.getCode(escrow_instance.address) == escrow_factory.bytecode_runtime
+    (chain_deployments,) = linked_escrow_package.manifest["deployments"].values()
+    assert "transaction" not in chain_deployments["Escrow"]
+
+
+def test_inject_raises_exception_with_unlinked_runtime_bytecode(escrow_deployer):
+    with pytest.raises(LinkerError, match="has not been linked"):
+        linker(inject("Escrow"))(escrow_deployer.package)
+
+
+@pytest.fixture
+def two_lib_escrow_deployer(deployer, tmp_path):
+    # Escrow linked to two copies of SafeSendLib, one for each of its link offsets
+    manifest = json.loads((ASSETS_DIR / "escrow" / "1.0.3.json").read_text())
+    contract_types = manifest["contract_types"]
+    contract_types["OtherSafeSendLib"] = contract_types["SafeSendLib"]
+    for bytecode_type in ("deployment_bytecode", "runtime_bytecode"):
+        (link_ref,) = contract_types["Escrow"][bytecode_type]["link_references"]
+        first_offset, second_offset = link_ref["offsets"]
+        contract_types["Escrow"][bytecode_type]["link_references"] = [
+            {**link_ref, "offsets": [first_offset]},
+            {**link_ref, "name": "OtherSafeSendLib", "offsets": [second_offset]},
+        ]
+    manifest_path = tmp_path / "escrow.json"
+    manifest_path.write_text(json.dumps(manifest))
+    return deployer(manifest_path)
+
+
+@pytest.mark.parametrize(
+    "links",
+    (
+        (link("Escrow", "SafeSendLib", "OtherSafeSendLib"),),
+        (link("Escrow", "SafeSendLib"), link("Escrow", "OtherSafeSendLib")),
+    ),
+)
+def test_linker_with_multiple_linked_types(two_lib_escrow_deployer, w3, links):
+    recipient = w3.eth.accounts[5]
+    escrow_strategy = linker(
+        deploy("SafeSendLib"),
+        deploy("OtherSafeSendLib"),
+        *links,
+        deploy("Escrow", recipient, transaction={"value": w3.toWei("1", "ether")}),
+    )
+    two_lib_escrow_deployer.register_strategy("Escrow", escrow_strategy)
+    linked_escrow_package = two_lib_escrow_deployer.deploy("Escrow")
+    escrow_factory = linked_escrow_package.get_contract_factory("Escrow")
+    assert escrow_factory.needs_bytecode_linking is False
+    escrow_instance = linked_escrow_package.deployments.get_instance("Escrow")
+    tx_hash = escrow_instance.functions.releaseFunds().transact()
+    assert w3.eth.waitForTransactionReceipt(tx_hash).status
+    assert w3.eth.getBalance(recipient) == w3.toWei("1000001", "ether")
+
+
+def test_link_raises_exception_for_invalid_linked_type(two_lib_escrow_deployer):
+    package = two_lib_escrow_deployer.package
+    with pytest.raises(LinkerError, match="does not need bytecode linking"):
+        linker(link("SafeSendLib", "OtherSafeSendLib"))(package)
+    with pytest.raises(LinkerError, match="has no link references to: Other"):
+        linker(link("Escrow", "SafeSendLib", "Other"))(package)
+
+
+def test_link_raises_exception_when_already_linked(escrow_deployer):
+    escrow_strategy = linker(
+        deploy("SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+    )
+    with pytest.raises(LinkerError, match="has already been linked"):
+        escrow_strategy(escrow_deployer.package)
+
+
+def test_link_raises_exception_without_linked_types():
+    with pytest.raises(LinkerError):
+        link("Escrow")
+
+
+def test_link_applied_to_package(escrow_deployer):
+    package = linker(deploy("SafeSendLib"))(escrow_deployer.package)
+    linked_package = link("Escrow", "SafeSendLib", package)
+    assert isinstance(linked_package, Package)
+    escrow_factory = linked_package.get_contract_factory("Escrow")
+    assert escrow_factory.needs_bytecode_linking is False
+
+
+def test_link_raises_exception_for_non_str_linked_type(escrow_deployer):
+    with pytest.raises(LinkerError, match="Invalid linked types"):
+        link("Escrow", "SafeSendLib", escrow_deployer)
+
+
+def test_async_linker(two_lib_escrow_deployer, w3):
+    recipient = w3.eth.accounts[5]
+    # Both libraries are deployed concurrently, before linking and deploying Escrow
+    escrow_strategy = async_linker(
+        deploy("Escrow", recipient, transaction={"value": w3.toWei("1", "ether")}),
+        link("Escrow", "SafeSendLib", "OtherSafeSendLib"),
+        deploy("SafeSendLib"),
+        deploy("OtherSafeSendLib"),
+    )
+    linked_escrow_package = asyncio.get_event_loop().run_until_complete(
+        escrow_strategy(two_lib_escrow_deployer.package)
+    )
+    assert isinstance(linked_escrow_package, Package)
+    assert len(linked_escrow_package.deployments.deployment_data) == 3
+    escrow_instance = linked_escrow_package.deployments.get_instance("Escrow")
+    tx_hash = escrow_instance.functions.releaseFunds().transact()
+    assert w3.eth.waitForTransactionReceipt(tx_hash).status
+    assert w3.eth.getBalance(recipient) == w3.toWei("1000001", "ether")
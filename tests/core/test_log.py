@@ -1,8 +1,12 @@
 import logging
 
 import pytest
+from web3.contract import Contract
+from web3.datastructures import AttributeDict
 
-from pytest_ethereum.testing import Log
+from pytest_ethereum import testing
+from pytest_ethereum._utils.abi import EventIndex
+from pytest_ethereum.testing import Log, logs_in_order
 
 logging.getLogger("evm").setLevel(logging.INFO)
 
@@ -116,3 +120,114 @@ def test_log_not_present_raises_exception_with_invalid_args_kwargs(
     ping, receipt = ping_setup
     with pytest.raises(TypeError):
         Log(ping.events.Ping, *args, **kwargs).not_present(receipt)
+
+
+@pytest.fixture
+def multi_ping_setup(deployer, manifest_dir):
+    ping_deployer = deployer(manifest_dir / "ping" / "1.0.0.json")
+    ping_package = ping_deployer.deploy("ping")
+    ping = ping_package.deployments.get_instance("ping")
+    receipts = [
+        ping_package.w3.eth.waitForTransactionReceipt(
+            ping.functions.ping(first, second).transact()
+        )
+        for first, second in ((b"1", b"2"), (b"3", b"4"), (b"1", b"5"))
+    ]
+    # A single receipt containing every emitted log
+    receipt = AttributeDict(
+        dict(
+            receipts[0],
+            transactionHash=b"\01" * 32,
+            logs=[
+                AttributeDict(dict(receipt["logs"][0], logIndex=log_index))
+                for log_index, receipt in enumerate(receipts)
+            ],
+        )
+    )
+    return ping, receipt
+
+
+def test_log_matches_every_emitted_log(multi_ping_setup):
+    ping, receipt = multi_ping_setup
+    assert Log(ping.events.Ping, b"3".ljust(32, b"\00")).is_present(receipt)
+    assert Log(ping.events.Ping, second=b"5".ljust(32, b"\00")).is_present(receipt)
+    assert Log(ping.events.Ping, b"5".ljust(32, b"\00")).not_present(receipt) is False
+    assert Log(
+        ping.events.Ping, first=b"3".ljust(32, b"\00"), second=b"4".ljust(32, b"\00")
+    ).exact_match(receipt)
+
+
+@pytest.mark.parametrize(
+    "args,kwargs,expected",
+    (
+        ((b"1".ljust(32, b"\00"),), {}, (0, 2)),
+        ((b"3".ljust(32, b"\00"),), {}, (1,)),
+        ((), {"second": b"5".ljust(32, b"\00")}, (2,)),
+        ((b"6".ljust(32, b"\00"),), {}, ()),
+    ),
+)
+def test_log_count_and_indices(multi_ping_setup, args, kwargs, expected):
+    ping, receipt = multi_ping_setup
+    log = Log(ping.events.Ping, *args, **kwargs)
+    assert log.log_indices(receipt) == expected
+    assert log.count(receipt) == len(expected)
+
+
+@pytest.mark.parametrize(
+    "ordered_args,expected",
+    (
+        ((b"1", b"3"), True),
+        ((b"3", b"1"), True),
+        ((b"1", b"3", b"1"), True),
+        ((b"3", b"1", b"3"), False),
+        ((b"1", b"1", b"1"), False),
+    ),
+)
+def test_logs_in_order(multi_ping_setup, ordered_args, expected):
+    ping, receipt = multi_ping_setup
+    logs = [Log(ping.events.Ping, arg.ljust(32, b"\00")) for arg in ordered_args]
+    assert logs_in_order(receipt, *logs) is expected
+
+
+def test_receipts_are_only_decoded_once(multi_ping_setup, monkeypatch):
+    ping, receipt = multi_ping_setup
+    decoded_logs = []
+
+    def decode(event_index, log_entry):
+        decoded_logs.append(log_entry)
+        return original_decode(event_index, log_entry)
+
+    original_decode = EventIndex.decode
+    monkeypatch.setattr(testing, "_decoded_receipts", testing.OrderedDict())
+    monkeypatch.setattr(EventIndex, "decode", decode)
+    assert Log(ping.events.Ping, b"1".ljust(32, b"\00")).count(receipt) == 2
+    assert Log(ping.events.Ping, b"3".ljust(32, b"\00")).is_present(receipt)
+    assert Log(ping.events.Ping, b"4".ljust(32, b"\00")).not_present(receipt) is False
+    assert len(decoded_logs) == 3
+
+
+def test_receipts_are_decoded_once_per_event_abi(multi_ping_setup):
+    ping, receipt = multi_ping_setup
+    # Same signature (and so topic) as Ping, but with both arguments indexed
+    other_abi = [
+        dict(item_abi, inputs=[dict(arg, indexed=True) for arg in item_abi["inputs"]])
+        for item_abi in ping.abi
+        if item_abi["type"] == "event"
+    ]
+    other_ping = ping.web3.eth.contract(
+        address=ping.address, abi=other_abi, ContractFactoryClass=Contract
+    )
+    first = b"3".ljust(32, b"\00")
+    assert Log(other_ping.events.Ping, first).is_present(receipt) is False
+    assert Log(ping.events.Ping, first).is_present(receipt)
+
+
+def test_log_with_receipt_without_hashes(multi_ping_setup, monkeypatch):
+    ping, receipt = multi_ping_setup
+    monkeypatch.setattr(testing, "_decoded_receipts", testing.OrderedDict())
+    # i.e. a receipt built by hand in a test
+    receipt_without_hashes = {"logs": receipt["logs"]}
+    assert (
+        Log(ping.events.Ping, b"1".ljust(32, b"\00")).count(receipt_without_hashes) == 2
+    )
+    assert testing._decoded_receipts == {}
@@ -0,0 +1,106 @@
+from ethpm import ASSETS_DIR
+import pytest
+from web3 import Web3
+
+from pytest_ethereum.backends import create_w3
+from pytest_ethereum.exceptions import PytestEthereumError
+from pytest_ethereum.linker import deploy, link, linker
+from pytest_ethereum.mining import (
+    BlockBatch,
+    advance_time,
+    get_block_batch,
+    mine_blocks,
+    wait_for_receipt,
+)
+
+
+def test_block_batch_mines_transactions_in_a_single_block(w3, block_batch):
+    sender, recipient = w3.eth.accounts[:2]
+    balance = w3.eth.getBalance(recipient)
+    with block_batch() as batch:
+        tx_hashes = [
+            w3.eth.sendTransaction({"from": sender, "to": recipient, "value": value})
+            for value in range(1, 6)
+        ]
+        assert w3.eth.blockNumber == 0
+        assert get_block_batch(w3) is batch
+    assert get_block_batch(w3) is None
+    assert w3.eth.blockNumber == 1
+    assert w3.eth.getBlock(1)["transactions"] == tx_hashes
+    assert [receipt.transactionHash for receipt in batch.receipts] == tx_hashes
+    assert all(receipt.status for receipt in batch.receipts)
+    assert w3.eth.getBalance(recipient) == balance + 15
+    # Transactions are auto-mined again after the batch
+    w3.eth.sendTransaction({"from": sender, "to": recipient, "value": 1})
+    assert w3.eth.blockNumber == 2
+
+
+def test_block_batch_starts_a_new_block_once_the_pending_block_is_full():
+    w3 = create_w3(genesis_gas_limit=50000)
+    sender, recipient = w3.eth.accounts[:2]
+    with BlockBatch(w3) as batch:
+        for _ in range(3):
+            w3.eth.sendTransaction({"from": sender, "to": recipient, "gas": 21000})
+    assert w3.eth.blockNumber == 2
+    assert [receipt.blockNumber for receipt in batch.receipts] == [1, 1, 2]
+
+
+def test_wait_for_receipt_mines_the_pending_block(w3, block_batch):
+    sender, recipient = w3.eth.accounts[:2]
+    with block_batch() as batch:
+        tx_hash = w3.eth.sendTransaction({"from": sender, "to": recipient})
+        assert wait_for_receipt(w3, tx_hash).blockNumber == 1
+        w3.eth.sendTransaction({"from": sender, "to": recipient})
+    assert [receipt.blockNumber for receipt in batch.receipts] == [1, 2]
+
+
+def test_predictive_linker_deploys_in_a_single_block(deployer, w3, block_batch):
+    escrow_deployer = deployer(ASSETS_DIR / "escrow" / "1.0.3.json")
+    escrow_strategy = linker(
+        deploy("SafeSendLib"),
+        link("Escrow", "SafeSendLib"),
+        deploy("Escrow", w3.eth.accounts[0]),
+        predict_addresses=True,
+    )
+    escrow_deployer.register_strategy("Escrow", escrow_strategy)
+    with block_batch():
+        escrow_package = escrow_deployer.deploy("Escrow")
+    assert w3.eth.blockNumber == 1
+    assert len(w3.eth.getBlock(1)["transactions"]) == 2
+    escrow_instance = escrow_package.deployments.get_instance("Escrow")
+    assert escrow_instance.functions.sender().call() == w3.eth.accounts[0]
+
+
+def test_block_batch_raises_exception_when_nested(w3, block_batch):
+    with block_batch():
+        with pytest.raises(PytestEthereumError, match="within another block batch"):
+            with block_batch():
+                pass
+
+
+def test_block_batch_requires_pyevm_backend():
+    with pytest.raises(PytestEthereumError):
+        BlockBatch(create_w3("mock"))
+
+
+def test_block_batch_raises_exception_for_unknown_sender(w3, block_batch):
+    unknown_account = Web3.toChecksumAddress("0x" + "01" * 20)
+    with block_batch():
+        with pytest.raises(PytestEthereumError, match="isn't an account"):
+            w3.eth.sendTransaction(
+                {"from": unknown_account, "to": w3.eth.accounts[1], "gas": 21000}
+            )
+
+
+def test_advance_time(w3):
+    timestamp = w3.eth.getBlock("pending")["timestamp"]
+    assert advance_time(w3, 3600) == timestamp + 3600
+    w3.testing.mine()
+    assert w3.eth.getBlock("latest")["timestamp"] == timestamp + 3600
+
+
+def test_mine_blocks_with_block_time(w3):
+    mine_blocks(w3, 3, block_time=15)
+    timestamps = [w3.eth.getBlock(number)["timestamp"] for number in (1, 2, 3)]
+    assert timestamps[1] - timestamps[0] == 15
+    assert timestamps[2] - timestamps[1] == 15
@@ -0,0 +1,303 @@
+from functools import partial
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import socketserver
+import threading
+
+from ethpm import ASSETS_DIR
+import pytest
+from web3 import Web3
+from web3._utils.encoding import Web3JsonEncoder
+from web3.exceptions import TransactionNotFound
+from web3.providers.eth_tester import EthereumTesterProvider
+
+from pytest_ethereum._utils.linker import contains_matching_uri
+from pytest_ethereum._utils.package import create_trusted_package, load_manifest
+from pytest_ethereum.backends import create_w3
+from pytest_ethereum.deployer import Deployer
+from pytest_ethereum.exceptions import PytestEthereumError
+from pytest_ethereum.linker import deploy, graph_linker
+from pytest_ethereum.mining import wait_for_receipts
+from pytest_ethereum.providers import PooledHTTPProvider, PooledIPCProvider, prefetch
+
+pytest_plugins = "pytester"
+
+
+class StandInNode:
+    """
+    A local JSON-RPC node backed by an eth-tester chain, which records the requests
+    (and connections) it receives.
+    """
+
+    def __init__(self, supports_batches=True):
+        self.tester_w3 = Web3(EthereumTesterProvider())
+        self.tester_w3.middleware_onion.clear()
+        self.supports_batches = supports_batches
+        self.requests = []
+        self.num_connections = 0
+        self._lock = threading.Lock()
+
+    def handle(self, request_data):
+        rpc_request = json.loads(request_data)
+        with self._lock:
+            self.requests.append(rpc_request)
+            if not isinstance(rpc_request, list):
+                response = self._handle_request(rpc_request)
+            elif self.supports_batches:
+                response = [self._handle_request(request) for request in rpc_request]
+            else:
+                response = {"jsonrpc": "2.0", "id": None, "error": {"code": -32600}}
+        return json.dumps(response, cls=Web3JsonEncoder).encode()
+
+    def _handle_request(self, rpc_request):
+        response = {"jsonrpc": "2.0", "id": rpc_request["id"]}
+        try:
+            response["result"] = self.tester_w3.manager.request_blocking(
+                rpc_request["method"], rpc_request["params"]
+            )
+        except Exception as exc:
+            response["error"] = {"code": -32000, "message": str(exc)}
+        return response
+
+    def get_methods(self, rpc_request):
+        if isinstance(rpc_request, list):
+            return [request["method"] for request in rpc_request]
+        return [rpc_request["method"]]
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer is only available from Python 3.7
+    daemon_threads = True
+
+
+@pytest.fixture
+def http_node():
+    node = StandInNode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            node.num_connections += 1
+
+        def do_POST(self):
+            response = node.handle(self.rfile.read(int(self.headers["Content-Length"])))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    node.uri = f"http://127.0.0.1:{server.server_address[1]}"
+    yield node
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def ipc_node(tmp_path):
+    node = StandInNode()
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            node.num_connections += 1
+            request_data = b""
+            while True:
+                data = self.request.recv(4096)
+                if not data:
+                    return
+                request_data += data
+                try:
+                    json.loads(request_data)
+                except ValueError:
+                    continue
+                self.request.sendall(node.handle(request_data))
+                request_data = b""
+
+    ipc_path = str(tmp_path / "node.ipc")
+    server = socketserver.ThreadingUnixStreamServer(ipc_path, Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    node.uri = f"ipc://{ipc_path}"
+    yield node
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=("http", "ipc"))
+def node(request):
+    return request.getfixturevalue(f"{request.param}_node")
+
+
+@pytest.fixture
+def node_w3():
+    """
+    Returns a function that creates a w3 instance connected to a node, whose provider
+    is closed once the test has finished.
+    """
+    w3s = []
+
+    def _node_w3(uri, **kwargs):
+        w3 = create_w3(uri, **kwargs)
+        w3s.append(w3)
+        return w3
+
+    yield _node_w3
+    for w3 in w3s:
+        w3.provider.close()
+
+
+def test_create_w3_with_node_uses_pooled_provider(http_node, ipc_node, node_w3):
+    assert isinstance(node_w3(http_node.uri).provider, PooledHTTPProvider)
+    assert isinstance(node_w3(ipc_node.uri).provider, PooledIPCProvider)
+
+
+def test_pooled_provider_reuses_connection(node, node_w3):
+    w3 = node_w3(node.uri)
+    for _ in range(5):
+        assert w3.eth.blockNumber == 0
+    assert len(node.requests) == 5
+    assert node.num_connections == 1
+
+
+def test_pooled_provider_reconnects_after_close(node, node_w3):
+    w3 = node_w3(node.uri)
+    assert w3.eth.blockNumber == 0
+    w3.provider.close()
+    assert w3.eth.blockNumber == 0
+    assert node.num_connections == 2
+
+
+def test_pooled_provider_with_concurrent_requests(node, node_w3):
+    w3 = node_w3(node.uri, node_pool_size=4)
+    barrier = threading.Barrier(8)
+
+    def get_accounts():
+        barrier.wait()
+        for _ in range(5):
+            assert len(w3.eth.accounts) == 10
+
+    threads = [threading.Thread(target=get_accounts) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(node.requests) == 40
+    assert node.num_connections <= 4
+
+
+def test_make_batch_request(node, node_w3):
+    provider = node_w3(node.uri).provider
+    responses = provider.make_batch_request(
+        [("eth_blockNumber", []), ("eth_getBlockByNumber", ["earliest", False])]
+    )
+    assert responses[0]["result"] == 0
+    assert responses[1]["result"]["number"] == 0
+    assert node.get_methods(node.requests[0]) == [
+        "eth_blockNumber",
+        "eth_getBlockByNumber",
+    ]
+
+
+def test_make_batch_request_without_node_support_raises_exception():
+    node = StandInNode(supports_batches=False)
+    provider = PooledHTTPProvider("http://127.0.0.1:8545")
+    provider.send = node.handle
+    with pytest.raises(PytestEthereumError, match="doesn't support JSON-RPC batch"):
+        provider.make_batch_request([("eth_blockNumber", []), ("eth_accounts", [])])
+
+
+def test_prefetch_sends_single_batch_request(node, node_w3):
+    w3 = node_w3(node.uri)
+    with prefetch(w3, lambda: w3.eth.getBlock("earliest"), lambda: w3.eth.accounts):
+        assert w3.eth.getBlock("earliest")["number"] == 0
+        assert w3.eth.getBlock("earliest")["number"] == 0
+        assert len(w3.eth.accounts) == 10
+    assert len(node.requests) == 1
+    assert len(w3.eth.accounts) == 10
+    assert len(node.requests) == 2
+
+
+def test_prefetch_requests_null_results_again(node, node_w3):
+    w3 = node_w3(node.uri)
+    tx_hash = "0x" + "00" * 32
+    get_receipt = partial(w3.eth.getTransactionReceipt, tx_hash)
+    with prefetch(w3, lambda: w3.eth.accounts, get_receipt):
+        with pytest.raises(TransactionNotFound):
+            get_receipt()
+    assert node.get_methods(node.requests[-1]) == ["eth_getTransactionReceipt"]
+
+
+def test_prefetch_without_batching_provider(w3, request_counter):
+    with prefetch(w3, lambda: w3.eth.blockNumber, lambda: w3.eth.accounts):
+        assert request_counter == []
+        w3.eth.blockNumber
+    assert request_counter == ["eth_blockNumber"]
+
+
+def test_wait_for_receipts_sends_single_batch_request(node, node_w3):
+    w3 = node_w3(node.uri)
+    sender, recipient = w3.eth.accounts[:2]
+    tx_hashes = [
+        w3.eth.sendTransaction({"from": sender, "to": recipient, "value": value})
+        for value in range(3)
+    ]
+    num_requests = len(node.requests)
+    receipts = wait_for_receipts(w3, tx_hashes)
+    assert [receipt.transactionHash for receipt in receipts] == tx_hashes
+    assert len(node.requests) == num_requests + 1
+    assert node.get_methods(node.requests[-1]) == ["eth_getTransactionReceipt"] * 3
+
+
+def test_contains_matching_uri_sends_single_batch_request(node, node_w3):
+    w3 = node_w3(node.uri)
+    genesis_hash = w3.eth.getBlock(0)["hash"].hex()[2:]
+    deployment_data = {
+        f"blockchain://{'ab' * 32}/block/{'cd' * 32}": {},
+        f"blockchain://{genesis_hash}/block/{genesis_hash}": {},
+    }
+    num_requests = len(node.requests)
+    assert contains_matching_uri(deployment_data, w3)
+    assert len(node.requests) == num_requests + 1
+
+
+def test_graph_linker_with_node(node, node_w3):
+    w3 = node_w3(node.uri)
+    manifest = load_manifest(ASSETS_DIR / "escrow" / "1.0.2.json")
+    escrow_deployer = Deployer(create_trusted_package(manifest, w3))
+    escrow_deployer.register_strategy(
+        "SafeSendLib", graph_linker(deploy("SafeSendLib"))
+    )
+    package = escrow_deployer.deploy("SafeSendLib")
+    safe_send_lib = package.deployments.get_instance("SafeSendLib")
+    assert w3.eth.getCode(safe_send_lib.address) != b""
+
+
+def test_w3_fixture_shares_node_provider(testdir, http_node):
+    testdir.makeini(
+        f"""
+        [pytest]
+        ethereum_backend = {http_node.uri}
+        ethereum_chain_scope = function
+        """
+    )
+    testdir.makepyfile(
+        """
+        providers = []
+
+        def test_one(w3):
+            providers.append(w3.provider)
+
+        def test_two(w3):
+            assert w3.provider is providers[0]
+        """
+    )
+    result = testdir.runpytest("-p", "pytest_ethereum.plugins")
+    result.assert_outcomes(passed=2)
+    assert http_node.num_connections == 1
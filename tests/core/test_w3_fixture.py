@@ -1,6 +1,57 @@
+from eth_utils import remove_0x_prefix, to_hex
+from ethpm.utils.chains import create_block_uri
+import pytest
 from web3 import Web3
+from web3._utils.empty import empty
+
+from pytest_ethereum._utils.linker import (
+    check_if_chain_matches_uri,
+    get_chain_cache,
+    get_genesis_hash,
+)
 
 
 def test_w3_fixture_is_available(request):
     w3 = request.getfixturevalue("w3")
     assert isinstance(w3, Web3)
+
+
+@pytest.mark.parametrize("num_blocks", (1, 5))
+def test_w3_fixture_reverts_chain_state_after_each_test(w3, num_blocks):
+    assert w3.eth.blockNumber == 0
+    w3.testing.mine(num_blocks)
+    assert w3.eth.blockNumber == num_blocks
+
+
+def test_w3_fixture_reverts_account_balances(w3):
+    sender, recipient = w3.eth.accounts[:2]
+    assert w3.eth.getBalance(recipient) == w3.toWei("1000000", "ether")
+    tx_hash = w3.eth.sendTransaction({"from": sender, "to": recipient, "value": 1})
+    w3.eth.waitForTransactionReceipt(tx_hash)
+    assert w3.eth.getBalance(recipient) == w3.toWei("1000000", "ether") + 1
+
+
+@pytest.mark.parametrize("run", (1, 2))
+def test_w3_fixture_is_a_new_instance_for_each_test(w3, run):
+    assert w3.eth.defaultAccount is empty
+    assert "counter" not in w3.middleware_onion
+    w3.eth.defaultAccount = w3.eth.accounts[1]
+    w3.middleware_onion.add(lambda make_request, w3: make_request, "counter")
+
+
+@pytest.mark.parametrize("run", (1, 2))
+def test_w3_fixture_clears_chain_cache_after_each_test(w3, run):
+    # A block mined by the previous run must not still be cached as on the chain
+    assert get_chain_cache(w3).matching_uris == {}
+    w3.testing.mine()
+    block_uri = create_block_uri(
+        remove_0x_prefix(get_genesis_hash(w3)),
+        remove_0x_prefix(to_hex(w3.eth.getBlock("latest")["hash"])),
+    )
+    assert check_if_chain_matches_uri(w3, block_uri)
+
+
+def test_w3_fixture_shares_chain_provider(w3, _chain_w3s, ethereum_backend):
+    chain_w3 = _chain_w3s[ethereum_backend]
+    assert w3 is not chain_w3
+    assert w3.provider is chain_w3.provider
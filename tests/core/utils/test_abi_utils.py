@@ -0,0 +1,65 @@
+from eth_utils import function_abi_to_4byte_selector
+import pytest
+from web3._utils.events import get_event_data
+
+from pytest_ethereum._utils.abi import (
+    get_abi_index,
+    get_event_index,
+    merge_args_and_kwargs,
+)
+
+
+def wide_event_abi(width):
+    return {
+        "name": "Wide",
+        "type": "event",
+        "anonymous": False,
+        "inputs": [
+            {"name": f"arg{i}", "type": "uint256", "indexed": i < 3}
+            for i in range(width)
+        ],
+    }
+
+
+@pytest.fixture
+def ping(deployer, manifest_dir):
+    ping_package = deployer(manifest_dir / "ping" / "1.0.0.json").deploy("ping")
+    return ping_package.deployments.get_instance("ping")
+
+
+def test_merge_args_and_kwargs_sorts_by_argument_position():
+    event_abi = wide_event_abi(100)
+    kwargs = {f"arg{i}": i for i in reversed(range(2, 100))}
+    assert merge_args_and_kwargs(event_abi, (0, 1), kwargs) == tuple(range(100))
+
+
+def test_event_index_is_only_built_once():
+    event_index = get_event_index(wide_event_abi(5))
+    assert get_event_index(wide_event_abi(5)) is event_index
+    assert get_event_index(wide_event_abi(6)) is not event_index
+    assert event_index.arg_positions == {f"arg{i}": i for i in range(5)}
+    assert event_index.topic_names == ("arg0", "arg1", "arg2")
+    assert event_index.data_names == ("arg3", "arg4")
+
+
+def test_abi_index(ping):
+    abi_index = get_abi_index(ping.abi)
+    assert get_abi_index(list(ping.abi)) is abi_index
+    assert set(abi_index.events) == {"Ping"}
+    assert abi_index.events["Ping"] is get_event_index(ping.events.Ping().abi)
+    (ping_abi,) = [item_abi for item_abi in ping.abi if item_abi["name"] == "ping"]
+    selector = function_abi_to_4byte_selector(ping_abi)
+    assert abi_index.functions_by_selector[selector] == ping_abi
+    assert abi_index.function_arg_positions[selector] == {"_first": 0, "_second": 1}
+
+
+def test_event_index_decodes_like_web3(ping, w3):
+    tx_hash = ping.functions.ping(b"1", b"2").transact()
+    (log_entry,) = w3.eth.waitForTransactionReceipt(tx_hash)["logs"]
+    event_abi = ping.events.Ping().abi
+    expected = get_event_data(event_abi, log_entry)
+    assert get_event_index(event_abi).decode(log_entry) == expected
+    assert get_abi_index(ping.abi).decode_log(log_entry) == expected
+    other_log_entry = dict(log_entry, topics=[b"\01" * 32])
+    assert get_event_index(event_abi).decode(other_log_entry) is None
+    assert get_abi_index(ping.abi).decode_log(other_log_entry) is None
@@ -0,0 +1,34 @@
+import pytest
+
+from pytest_ethereum._utils.cache import freeze, freeze_stable
+from pytest_ethereum.linker import deploy, linker
+
+
+@pytest.mark.parametrize("freeze_fn", (freeze, freeze_stable))
+def test_freeze_equivalent_strategies(freeze_fn):
+    assert freeze_fn(linker(deploy("Owned", 1))) == freeze_fn(
+        linker(deploy("Owned", 1))
+    )
+    assert freeze_fn(linker(deploy("Owned", 1))) != freeze_fn(
+        linker(deploy("Owned", 2))
+    )
+
+
+@pytest.mark.parametrize(
+    "value,other_value",
+    (
+        (1, True),
+        (1, 1.0),
+        ((1, 2), [1, 2]),
+        ({"a": 1}, (("a", 1),)),
+        ({1: "a"}, {True: "a"}),
+    ),
+)
+def test_freeze_distinguishes_types(value, other_value):
+    assert freeze(value) != freeze(other_value)
+    assert freeze((value,)) != freeze((other_value,))
+
+
+def test_freeze_raises_exception_with_unhashable_value():
+    with pytest.raises(TypeError):
+        freeze({"a": {1, 2}})
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from pytest_ethereum._utils.contract_fixtures import parse_contract_fixtures
+from pytest_ethereum.exceptions import PytestEthereumError
+from pytest_ethereum.linker import linker
+
+ESCROW_STRATEGY = linker()
+
+
+def test_parse_contract_fixtures():
+    lines = [
+        "owned/1.0.1.json Owned",
+        "standard-token/1.0.1.json StandardToken 100 name=token scope=module",
+        "escrow/1.0.3.json SafeSendLib scope=session strategy=tests.strategies:lib",
+    ]
+    owned, token, safe_send_lib = parse_contract_fixtures(lines, Path("/assets"))
+    assert (owned.name, owned.scope, owned.strategy) == ("owned", "function", None)
+    assert owned.manifest_path == Path("/assets/owned/1.0.1.json")
+    assert (token.name, token.contract_type, token.args) == (
+        "token",
+        "StandardToken",
+        (100,),
+    )
+    assert token.scope == "module"
+    assert safe_send_lib.name == "safe_send_lib"
+    assert safe_send_lib.scope == "session"
+    assert safe_send_lib.strategy == "tests.strategies:lib"
+
+
+@pytest.mark.parametrize(
+    "lines,match",
+    (
+        (["owned/1.0.1.json"], "Must provide a manifest path"),
+        (["owned/1.0.1.json Owned strategy=strategy"], "Must be <module>:<name>"),
+        (["owned/1.0.1.json Owned", "owned/1.0.2.json Owned"], "Duplicate"),
+    ),
+)
+def test_parse_contract_fixtures_raises_exception(lines, match):
+    with pytest.raises(PytestEthereumError, match=match):
+        parse_contract_fixtures(lines, Path("/assets"))
+
+
+def test_load_strategy():
+    (escrow,) = parse_contract_fixtures(
+        [f"escrow/1.0.3.json Escrow strategy={__name__}:ESCROW_STRATEGY"],
+        Path("/assets"),
+    )
+    assert escrow.load_strategy() is ESCROW_STRATEGY
+
+
+@pytest.mark.parametrize("strategy", ("missing.module:strategy", f"{__name__}:missing"))
+def test_load_strategy_raises_exception(strategy):
+    (escrow,) = parse_contract_fixtures(
+        [f"escrow/1.0.3.json Escrow strategy={strategy}"], Path("/assets")
+    )
+    with pytest.raises(PytestEthereumError, match="Unable to import strategy"):
+        escrow.load_strategy()
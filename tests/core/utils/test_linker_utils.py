@@ -1,11 +1,24 @@
-from eth_utils import remove_0x_prefix, to_hex
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from eth_utils import remove_0x_prefix, to_canonical_address, to_hex
 from eth_utils.toolz import assoc
+from ethpm.exceptions import BytecodeLinkingError
 from ethpm.utils.chains import create_block_uri, get_genesis_block_hash
 import pytest
+from web3 import Web3
 
 from pytest_ethereum._utils.linker import (
+    ManifestBuilder,
+    clear_chain_cache,
     contains_matching_uri,
+    get_chain_cache,
+    get_create_address,
+    get_genesis_hash,
+    get_nonce_manager,
+    get_sender,
     insert_deployment,
+    link_bytecode,
     pluck_matching_uri,
 )
 from pytest_ethereum.exceptions import LinkerError
@@ -81,3 +94,152 @@ def test_insert_deployment(escrow_deployer):
         alt_block_uri: {"alt": {"x": "x"}},
     }
     assert updated_manifest["deployments"] == expected_deployments_data
+
+
+def test_chain_identity_lookups_are_cached(chain_setup, request_counter):
+    w3, match_data, no_match_data, old_chain_uri = chain_setup
+    genesis_hash = get_genesis_hash(w3)
+    assert pluck_matching_uri(match_data, w3) == old_chain_uri
+    assert contains_matching_uri(no_match_data, w3) is False
+    request_counter.clear()
+
+    assert get_genesis_hash(w3) == genesis_hash
+    assert contains_matching_uri(match_data, w3) is True
+    assert pluck_matching_uri(match_data, w3) == old_chain_uri
+    assert contains_matching_uri(no_match_data, w3) is False
+    assert request_counter == []
+
+
+def test_clear_chain_cache():
+    w3 = Web3(Web3.EthereumTesterProvider())
+    genesis_hash = get_genesis_hash(w3)
+    assert get_chain_cache(w3).genesis_hash == genesis_hash
+    w3.provider.ethereum_tester.reset_to_genesis()
+    clear_chain_cache(w3)
+    assert get_chain_cache(w3).genesis_hash is None
+    assert get_genesis_hash(w3) == to_hex(get_genesis_block_hash(w3))
+
+
+def test_manifest_builder_shares_unmodified_data():
+    manifest = {
+        "contract_types": {"A": {"abi": []}, "B": {"abi": []}},
+        "deployments": {"uri": {"A": {"x": "x"}}},
+    }
+    manifest_builder = ManifestBuilder(manifest)
+    manifest_builder.assoc_in(("contract_types", "A", "abi"), ["a"])
+    new_manifest = manifest_builder.assoc_in(("contract_types", "B", "abi"), ["b"])
+    assert new_manifest is not manifest
+    assert new_manifest["contract_types"]["A"]["abi"] == ["a"]
+    assert new_manifest["contract_types"]["B"]["abi"] == ["b"]
+    assert new_manifest["deployments"] is manifest["deployments"]
+    assert manifest["contract_types"] == {"A": {"abi": []}, "B": {"abi": []}}
+
+    deployments_chain_data = manifest_builder.dissoc_in(("deployments", "uri"))
+    assert deployments_chain_data is manifest["deployments"]["uri"]
+    assert new_manifest["deployments"] == {}
+    assert manifest["deployments"] == {"uri": {"A": {"x": "x"}}}
+
+
+def test_manifest_builder_copies_data_once():
+    manifest_builder = ManifestBuilder({"contract_types": {"A": {"abi": []}}})
+    first_manifest = manifest_builder.assoc_in(("contract_types", "A", "abi"), ["a"])
+    contract_types = first_manifest["contract_types"]
+    second_manifest = manifest_builder.assoc_in(("contract_types", "B"), {"abi": []})
+    assert second_manifest is first_manifest
+    assert second_manifest["contract_types"] is contract_types
+
+
+def test_manifest_builder_does_not_modify_built_manifest():
+    manifest_builder = ManifestBuilder({"contract_types": {"A": {"abi": []}}})
+    manifest_builder.assoc_in(("contract_types", "A", "abi"), ["a"])
+    built_manifest = manifest_builder.build()
+    new_manifest = manifest_builder.assoc_in(("contract_types", "A", "abi"), ["b"])
+    assert built_manifest == {"contract_types": {"A": {"abi": ["a"]}}}
+    assert new_manifest == {"contract_types": {"A": {"abi": ["b"]}}}
+
+
+def test_get_create_address(w3):
+    sender = to_canonical_address(w3.eth.accounts[1])
+    nonce = w3.eth.getTransactionCount(w3.eth.accounts[1])
+    predicted_address = get_create_address(sender, nonce)
+    tx_hash = w3.eth.sendTransaction({"from": w3.eth.accounts[1], "data": "0x00"})
+    tx_receipt = w3.eth.waitForTransactionReceipt(tx_hash)
+    assert to_canonical_address(tx_receipt.contractAddress) == predicted_address
+
+
+def test_get_sender(w3):
+    assert get_sender(w3, {"from": w3.eth.accounts[2]}) == to_canonical_address(
+        w3.eth.accounts[2]
+    )
+    assert get_sender(w3, None) == to_canonical_address(w3.eth.coinbase)
+
+
+LINK_REFS = [
+    {"length": 2, "name": "First", "offsets": [1, 5]},
+    {"length": 2, "name": "Second", "offsets": [3]},
+]
+
+
+def test_link_bytecode():
+    bytecode = b"\x60" + b"\0" * 6
+    linked_bytecode = link_bytecode(
+        bytecode, LINK_REFS, {"First": b"\x01\x01", "Second": b"\x02\x02"}
+    )
+    assert linked_bytecode == b"\x60\x01\x01\x02\x02\x01\x01"
+    # Link references to any other linked type are left unlinked
+    assert link_bytecode(bytecode, LINK_REFS, {"Second": b"\x02\x02"}) == (
+        b"\x60\0\0\x02\x02\0\0"
+    )
+
+
+def test_link_bytecode_is_cached():
+    bytecode = b"\x61" + b"\0" * 6
+    addresses = {"First": b"\x01\x01", "Second": b"\x02\x02"}
+    linked_bytecode = link_bytecode(bytecode, LINK_REFS, addresses)
+    assert link_bytecode(bytecode, LINK_REFS, dict(addresses)) is linked_bytecode
+    other_addresses = {**addresses, "Second": b"\x03\x03"}
+    assert link_bytecode(bytecode, LINK_REFS, other_addresses) != linked_bytecode
+
+
+def test_link_bytecode_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr("pytest_ethereum._utils.linker.LINKED_BYTECODE_CACHE_SIZE", 1)
+    monkeypatch.setattr("pytest_ethereum._utils.linker._linked_bytecode", OrderedDict())
+    addresses = {"First": b"\x01\x01"}
+    linked_bytecode = link_bytecode(b"\x62" + b"\0" * 6, LINK_REFS, addresses)
+    link_bytecode(b"\x63" + b"\0" * 6, LINK_REFS, addresses)
+    assert link_bytecode(b"\x62" + b"\0" * 6, LINK_REFS, addresses) is not (
+        linked_bytecode
+    )
+
+
+def test_link_bytecode_raises_exception_when_already_linked():
+    with pytest.raises(BytecodeLinkingError):
+        link_bytecode(b"\x64" + b"\x01" * 6, LINK_REFS, {"First": b"\x01\x01"})
+
+
+def test_nonce_manager(w3):
+    sender = to_canonical_address(w3.eth.accounts[0])
+    nonce_manager = get_nonce_manager(w3)
+    assert get_nonce_manager(w3) is nonce_manager
+    with nonce_manager.reserve(sender) as nonce:
+        assert nonce == w3.eth.getTransactionCount(sender, "pending")
+        with nonce_manager.reserve(sender) as next_nonce:
+            assert next_nonce == nonce + 1
+    # Once released, the pending transaction count of the chain accounts for a nonce
+    w3.eth.sendTransaction({"from": w3.eth.accounts[0], "to": w3.eth.accounts[1]})
+    with nonce_manager.reserve(sender) as next_nonce:
+        assert next_nonce == nonce + 1
+
+
+def test_nonce_manager_reserves_unique_nonces_across_threads(w3):
+    sender = to_canonical_address(w3.eth.accounts[0])
+    nonce_manager = get_nonce_manager(w3)
+    reservations = [nonce_manager.reserve(sender) for _ in range(8)]
+    with ThreadPoolExecutor(8) as executor:
+        nonces = list(
+            executor.map(lambda reservation: reservation.__enter__(), reservations)
+        )
+    pending_nonce = w3.eth.getTransactionCount(sender, "pending")
+    assert sorted(nonces) == list(range(pending_nonce, pending_nonce + 8))
+    for reservation in reservations:
+        reservation.__exit__(None, None, None)
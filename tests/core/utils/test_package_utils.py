@@ -0,0 +1,112 @@
+import json
+
+from eth_utils.toolz import assoc
+from ethpm import ASSETS_DIR, Package
+from ethpm.exceptions import ValidationError
+import pytest
+
+from pytest_ethereum._utils.package import (
+    create_linked_package,
+    create_trusted_package,
+    load_manifest,
+    set_full_validation,
+    validate_bytecode_delta,
+    validate_deployment_delta,
+)
+
+BLOCK_URI = f"blockchain://{'ab' * 32}/block/{'cd' * 32}"
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    owned_manifest = json.loads((ASSETS_DIR / "owned" / "1.0.1.json").read_text())
+    path = tmp_path / "owned.json"
+    path.write_text(json.dumps(owned_manifest))
+    return path
+
+
+def test_load_manifest_is_cached(manifest_path):
+    manifest = load_manifest(manifest_path)
+    assert manifest["package_name"] == "owned"
+    assert load_manifest(manifest_path) is manifest
+
+
+def test_load_manifest_reloads_modified_manifest(manifest_path):
+    manifest = load_manifest(manifest_path)
+    manifest_path.write_text(json.dumps(assoc(manifest, "version", "1.0.10")))
+    reloaded_manifest = load_manifest(manifest_path)
+    assert reloaded_manifest is not manifest
+    assert reloaded_manifest["version"] == "1.0.10"
+
+
+def test_load_manifest_validates_manifest(tmp_path):
+    invalid_manifest_path = tmp_path / "invalid.json"
+    invalid_manifest_path.write_text(json.dumps({"package_name": "invalid"}))
+    with pytest.raises(ValidationError):
+        load_manifest(invalid_manifest_path)
+
+
+def test_create_trusted_package(manifest_path, w3):
+    manifest = load_manifest(manifest_path)
+    package = create_trusted_package(manifest, w3)
+    assert isinstance(package, Package)
+    assert package.w3 is w3
+    assert package.manifest is manifest
+    assert package.name == "owned"
+    assert package.get_contract_factory("Owned").needs_bytecode_linking is False
+
+
+@pytest.fixture
+def full_validation():
+    set_full_validation(True)
+    yield
+    set_full_validation(False)
+
+
+def test_create_linked_package_skips_full_validation(w3):
+    package = create_linked_package({"invalid": "manifest"}, w3)
+    assert package.manifest == {"invalid": "manifest"}
+
+
+def test_create_linked_package_with_full_validation(full_validation, w3):
+    with pytest.raises(ValidationError):
+        create_linked_package({"invalid": "manifest"}, w3)
+
+
+def test_validate_deployment_delta(manifest_path):
+    manifest = load_manifest(manifest_path)
+    deployment_data = {
+        "contract_type": "Owned",
+        "address": "0x" + "01" * 20,
+        "transaction": "0x" + "02" * 32,
+        "block": "0x" + "03" * 32,
+    }
+    validate_deployment_delta(manifest, BLOCK_URI, "Owned", deployment_data)
+
+
+@pytest.mark.parametrize(
+    "deployment_data,match",
+    (
+        ({"contract_type": "Missing"}, "missing references"),
+        ({"contract_type": "Owned", "address": "0x123"}, "does not match"),
+        ({"contract_type": "Owned", "block": 1}, "is not of type"),
+        ({"address": "0x" + "01" * 20}, "is a required property"),
+    ),
+)
+def test_validate_deployment_delta_raises_exception(
+    manifest_path, deployment_data, match
+):
+    manifest = load_manifest(manifest_path)
+    with pytest.raises(ValidationError, match=match):
+        validate_deployment_delta(manifest, BLOCK_URI, "Owned", deployment_data)
+
+
+@pytest.mark.parametrize("bytecode", ("0x", "0x6001"))
+def test_validate_bytecode_delta(bytecode):
+    validate_bytecode_delta(bytecode)
+
+
+@pytest.mark.parametrize("bytecode", ("6001", "0x600", "0x60zz", None))
+def test_validate_bytecode_delta_raises_exception(bytecode):
+    with pytest.raises(ValidationError):
+        validate_bytecode_delta(bytecode)
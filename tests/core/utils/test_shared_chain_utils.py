@@ -0,0 +1,73 @@
+import logging
+from pathlib import Path
+
+from ethpm import ASSETS_DIR
+import pytest
+from web3 import Web3
+
+from pytest_ethereum._utils.package import create_trusted_package, load_manifest
+from pytest_ethereum._utils.shared_chain import (
+    parse_shared_deployments,
+    prewarm_chain_state,
+    restore_chain_state,
+)
+from pytest_ethereum.deployer import Deployer
+
+OWNED_PATH = ASSETS_DIR / "owned" / "1.0.1.json"
+STANDARD_TOKEN_PATH = ASSETS_DIR / "standard-token" / "1.0.1.json"
+
+
+def test_parse_shared_deployments():
+    lines = [
+        "owned/1.0.1.json Owned",
+        "standard-token/1.0.1.json StandardToken 100",
+        "escrow/1.0.3.json Escrow 0xbb9bc244d798123fde783fcc1c72d3bb8c189413",
+    ]
+    assert parse_shared_deployments(lines, Path("/assets")) == [
+        (Path("/assets/owned/1.0.1.json"), "Owned", ()),
+        (Path("/assets/standard-token/1.0.1.json"), "StandardToken", (100,)),
+        (
+            Path("/assets/escrow/1.0.3.json"),
+            "Escrow",
+            ("0xbb9bc244d798123fde783fcc1c72d3bb8c189413",),
+        ),
+    ]
+
+
+@pytest.fixture
+def prewarmed(tmp_path):
+    state_path = tmp_path / "chain.rlp"
+    deployments = [
+        (OWNED_PATH, "Owned", ()),
+        (STANDARD_TOKEN_PATH, "StandardToken", (100,)),
+    ]
+    controller_w3 = Web3(Web3.EthereumTesterProvider())
+    prewarmed = prewarm_chain_state(controller_w3, deployments, state_path)
+    # The controller's chain is reverted to its head after the deployments
+    assert controller_w3.eth.blockNumber == 0
+    return state_path, prewarmed, controller_w3.eth.getBlock(0)
+
+
+def test_restore_chain_state(prewarmed, caplog):
+    caplog.set_level(logging.INFO, logger="pytest_ethereum.deployer")
+    state_path, prewarmed, genesis_block = prewarmed
+    worker_w3 = Web3(Web3.EthereumTesterProvider())
+    restore_chain_state(worker_w3, state_path, prewarmed)
+    assert worker_w3.eth.getBlock("latest") == genesis_block
+
+    token_manifest = load_manifest(STANDARD_TOKEN_PATH)
+    token_deployer = Deployer(
+        create_trusted_package(token_manifest, worker_w3), cache_deployments=True
+    )
+    token_package = token_deployer.deploy("StandardToken", 100)
+    assert "StandardToken restored from deployment cache." in caplog.messages
+    assert token_package.manifest == prewarmed[1]["manifest"]
+    token = token_package.deployments.get_instance("StandardToken")
+    assert token.functions.totalSupply().call() == 100
+
+    # Deployments that were not prewarmed are made as usual
+    caplog.clear()
+    other_token_package = token_deployer.deploy("StandardToken", 200)
+    assert caplog.messages == []
+    other_token = other_token_package.deployments.get_instance("StandardToken")
+    assert other_token.functions.totalSupply().call() == 200